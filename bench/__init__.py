@@ -0,0 +1,12 @@
+"""
+성능 벤치마크 - 전략 핫패스 (지표 / 유니버스 / 백테스트 / 최적화 / 일간 체크)
+============================================================================
+합성 데이터(시드 고정)로 운영 규모(60~400종목, 3~6년 일봉)를 재현해 시간을 잰다.
+결과는 JSON 기준선으로 저장하고, compare로 기준선 대비 회귀를 잡는다.
+기본 출력 bench/baselines/latest.json은 기기별 측정값이라 git에서 제외 (기준선은 각 기기에서 만든다).
+
+  python -m bench run [--sizes 60x3 400x6] [--repeat 5] [--out bench/baselines/latest.json]
+  python -m bench compare 기준.json [현재.json] [--threshold 0.10]
+      현재.json 생략 시 기준선과 같은 크기/시드/반복으로 지금 측정
+      threshold 초과 느려진 케이스가 있으면 종료코드 1
+"""
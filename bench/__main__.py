@@ -0,0 +1,143 @@
+"""
+벤치마크 CLI - run / compare
+============================
+  run      크기별 케이스 측정 → JSON 저장
+  compare  기준선 JSON 대비 min 시간 비교, threshold 초과 회귀 표시 (종료코드 1)
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.cases import CASES, run_size  # noqa: E402
+
+DEFAULT_SIZES = ["60x3", "400x6"]
+DEFAULT_OUT = os.path.join(ROOT, "bench", "baselines", "latest.json")
+
+
+def parse_size(text):
+    """"60x3" → (60, 3)"""
+    n, y = text.lower().split("x")
+    return int(n), int(y)
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_bench(sizes, repeat, seed, cases):
+    results = {}
+    for size in sizes:
+        n, y = parse_size(size)
+        print(f"\n── {n}종목 × {y}년 ──")
+        for case, res in run_size(n, y, seed=seed, repeat=repeat, cases=cases).items():
+            results[f"{case}@{n}x{y}"] = res
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": git_rev(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpu)",
+            "sizes": list(sizes), "repeat": repeat, "seed": seed, "cases": list(cases),
+        },
+        "results": results,
+    }
+
+
+def save(report, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n저장: {path}")
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base, cur, threshold):
+    """min 시간 기준 비교표 출력 → 회귀 케이스 목록"""
+    b, c = base["results"], cur["results"]
+    print(f"\n기준선: {base['meta'].get('created')} ({base['meta'].get('git')})"
+          f"  →  현재: {cur['meta'].get('created')} ({cur['meta'].get('git')})")
+    print(f"\n{'케이스':<28} {'기준(ms)':>11} {'현재(ms)':>11} {'변화':>8}")
+    print("-" * 70)
+    regressions = []
+    for key in b:
+        if key not in c:
+            print(f"{key:<28} {'':>11} {'':>11} {'':>8}  (현재 없음)")
+            continue
+        if "skipped" in b[key] or "skipped" in c[key]:
+            print(f"{key:<28} {'':>11} {'':>11} {'':>8}  (건너뜀)")
+            continue
+        t0, t1 = b[key]["min"], c[key]["min"]
+        change = t1 / t0 - 1 if t0 > 0 else 0.0
+        mark = ""
+        if change > threshold:
+            mark = "  ◀ 회귀"
+            regressions.append(key)
+        elif change < -threshold:
+            mark = "  개선"
+        print(f"{key:<28} {t0*1000:11.2f} {t1*1000:11.2f} {change*100:+7.1f}%{mark}")
+    for key in c:
+        if key not in b:
+            print(f"{key:<28} {'':>11} {'':>11} {'':>8}  (기준선 없음)")
+    print("-" * 70)
+    if regressions:
+        print(f"회귀 {len(regressions)}건 (>{threshold*100:.0f}%): {', '.join(regressions)}")
+    else:
+        print(f"회귀 없음 (임계 {threshold*100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m bench", description="전략 핫패스 벤치마크")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("run", help="측정 후 JSON 저장")
+    p.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="종목수x연수 (예: 60x3 400x6)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES)
+    p.add_argument("--out", default=DEFAULT_OUT)
+
+    p = sub.add_parser("compare", help="기준선 대비 회귀 검사")
+    p.add_argument("baseline")
+    p.add_argument("current", nargs="?", help="생략 시 기준선 설정으로 지금 측정")
+    p.add_argument("--threshold", type=float, default=0.10, help="회귀 판정 비율 (기본 0.10 = 10%%)")
+    p.add_argument("--out", help="지금 측정한 결과 저장 경로")
+
+    args = ap.parse_args(argv)
+    if args.cmd == "run":
+        save(run_bench(args.sizes, args.repeat, args.seed, args.cases), args.out)
+        return 0
+
+    base = load(args.baseline)
+    if args.current:
+        cur = load(args.current)
+    else:
+        m = base["meta"]
+        cur = run_bench(m["sizes"], m["repeat"], m["seed"], m.get("cases", CASES))
+        if args.out:
+            save(cur, args.out)
+    return 1 if compare(base, cur, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+벤치마크 케이스 - 크기(종목 수 × 연수)별 핫패스 시간 측정
+========================================================
+  calc_channel        종목 1개 전체 기간 채널 (BTC 열)
+  channel_precompute  Signals 생성 (유니버스 전 종목 채널 + 신호 행렬)
+  universe            annual_universe (전년 평균 거래대금 상위 60)
+  run_backtest        bt_engine.run 1회 (backtest_dynamic_v2 설정, 전체 기간)
+  run_funding         run_backtest + 펀딩비 부과 (전 종목 8시간마다 합성 펀딩 기록)
+  run_opt             vbt_optimize.run_opt 1회 (라이브 파라미터)
+  daily_check         bybit_main_v2.daily_check (유니버스 갱신 포함, 가짜 API)
+  daily_check_scan    daily_check (유니버스 캐시 적중 → 후보 스캔만)
+  ── 전 종목 (TOP_N 제한 없음 = USDT 퍼페추얼 전체 규모) ──
+  backtest_all        유니버스 + Signals + bt_engine.run (전 종목, 전체 기간)
+  live_universe_all   update_universe 처음부터 (전 종목 일봉 조회, 조회 지연 LIVE_LATENCY)
+  live_scan_all       daily_check 스캔 단계 (워밍업 선행분 + 마감 봉 1개씩, 조회 지연 LIVE_LATENCY)
+
+daily_check 계열은 DRY_RUN + sleep 제거 + 텔레그램/DB 끔 → 순수 처리 시간.
+live_* 는 요청 속도 제한(API_RATE) 대기와 조회 지연을 그대로 둔다 → 라이브 소요 시간 추정.
+requests / pybit은 봇 안에서 지연 import라 가짜 API로는 설치 없이도 돈다.
+"""
+import os
+import sys
+import json
+import time
+import types
+import pickle
+import logging
+import tempfile
+import importlib
+
+import numpy as np
+
+import bt_engine
+from bt_engine import Signals, annual_universe, universe_coins
+
+from bench.synth import make_market, to_mcap
+from bench.fake_api import FakeBybitAPI
+
+CASES = ("calc_channel", "channel_precompute", "universe", "run_backtest", "run_funding",
+         "run_opt", "daily_check", "daily_check_scan",
+         "backtest_all", "live_universe_all", "live_scan_all")
+TOP_N = 60
+EXCLUDE = {"BTCUSDT", "ETHUSDT"}
+LIVE_LATENCY = 0.03   # 시세 조회 1회 왕복 (초) 가정
+
+
+def timeit(fn, repeat, setup=None):
+    """repeat회 실행 → {"min", "median", "runs"} (초). setup은 측정 밖에서 매회 호출"""
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    return {"min": min(runs), "median": float(np.median(runs)), "runs": runs}
+
+
+def _silent_bot(base_dir, api, sleep=False):
+    """bybit_main_v2를 임시 디렉터리 + 가짜 API로 import (주문/알림/대기 없음, sleep=True면 대기 유지)"""
+    os.environ["BYBIT_BASE_DIR"] = base_dir
+    os.environ["BYBIT_DRY_RUN"] = "1"
+    sys.modules.pop("bybit_main_v2", None)
+    bot = importlib.import_module("bybit_main_v2")
+    bot.api = api
+    bot.DRY_RUN = True
+    bot.tg_send = lambda msg: None
+    bot.time = types.SimpleNamespace(time=time.time, perf_counter=time.perf_counter,
+                                     monotonic=time.monotonic,
+                                     sleep=time.sleep if sleep else (lambda s: None))
+    bot.db_logger = types.SimpleNamespace(
+        log_trade=lambda **k: None, upsert_position=lambda **k: None,
+        remove_position=lambda *a: None, log_timings=lambda *a: None)
+    bot.log.setLevel(logging.WARNING)
+    return bot
+
+
+def run_size(n_symbols, years, seed=42, repeat=5, cases=CASES, say=print):
+    """크기 하나에 대해 cases 측정 → {케이스: 결과 dict}"""
+    import backtest_dynamic_v2 as bv2
+    out = {}
+    md = make_market(n_symbols, years, seed)
+    end_year = md.dates[-1].year
+    start_year = end_year - years + 1
+    start = f"{start_year}-01-01"
+    say(f"  데이터: {len(md)}종목 × {len(md.dates)}일 ({md.dates[0].date()} ~ {md.dates[-1].date()})")
+
+    def record(name, res):
+        out[name] = res
+        if "skipped" in res:
+            say(f"    {name:<20} 건너뜀: {res['skipped']}")
+        else:
+            say(f"    {name:<20} min {res['min']*1000:9.2f}ms  median {res['median']*1000:9.2f}ms")
+
+    if "calc_channel" in cases:
+        btc = md.close["BTCUSDT"].to_numpy()
+        record("calc_channel", timeit(lambda: bt_engine.calc_channel(btc), repeat * 10))
+
+    universe, _ = annual_universe(md.close, md.volume, start_year, end_year,
+                                  top_n=TOP_N, exclude=EXCLUDE)
+    coins = universe_coins(universe, md.close.columns)
+    if "universe" in cases:
+        record("universe", timeit(lambda: annual_universe(
+            md.close, md.volume, start_year, end_year, top_n=TOP_N, exclude=EXCLUDE), repeat))
+
+    if "channel_precompute" in cases:
+        record("channel_precompute", timeit(lambda: Signals(md, coins), repeat))
+
+    if "run_backtest" in cases or "run_funding" in cases:
+        sig = Signals(md, coins)
+
+        def backtest(funding=None):
+            bt_engine.run(sig, universe, bv2.STRATS, max_pos=bv2.MAX_POS, leverage=bv2.LEVERAGE,
+                          cash_ratio=bv2.CASH_RATIO, mdd_thresh=bv2.MDD_DEPLOY_THRESH,
+                          cost=bv2.COST_PER_SIDE, initial_capital=bv2.INITIAL_CAPITAL,
+                          sizing="dynamic", funding=funding, start=start)
+        if "run_backtest" in cases:
+            record("run_backtest", timeit(backtest, repeat))
+        if "run_funding" in cases:
+            day0 = int(md.dates[0].timestamp())
+            ts = np.arange(day0, day0 + len(md.dates) * 86400, 8 * 3600)
+            rng = np.random.default_rng(0)
+            fr = bt_engine.FundingRates(ts, md.symbols, rng.normal(1e-4, 2e-4, (len(ts), len(md))))
+            funding = bt_engine.daily_funding(fr, sig.dates, sig.coins)
+            record("run_funding", timeit(lambda: backtest(funding), repeat))
+
+    if "backtest_all" in cases:
+        def backtest_all():
+            u, _ = annual_universe(md.close, md.volume, start_year, end_year,
+                                   top_n=len(md.symbols), exclude=EXCLUDE)
+            s = Signals(md, universe_coins(u, md.close.columns))
+            bt_engine.run(s, u, bv2.STRATS, max_pos=bv2.MAX_POS, leverage=bv2.LEVERAGE,
+                          cash_ratio=bv2.CASH_RATIO, mdd_thresh=bv2.MDD_DEPLOY_THRESH,
+                          cost=bv2.COST_PER_SIDE, initial_capital=bv2.INITIAL_CAPITAL,
+                          sizing="dynamic", start=start)
+        record("backtest_all", timeit(backtest_all, repeat))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if "run_opt" in cases:
+            import vbt_optimize as vo
+            pkl = os.path.join(tmp, "mcap.pkl")
+            with open(pkl, "wb") as f:
+                pickle.dump(to_mcap(md), f)
+            # 합성 데이터 전체 기간을 쓰도록 시작일만 바꿔서 준비
+            vo.START_DATE = start
+            vo.FUNDING_STORE = None
+            vo._prepared = False
+            vo.prepare_data(pkl, verbose=False)
+            strats = vo.make_strats()
+            record("run_opt", timeit(lambda: vo.run_opt(strats), repeat))
+
+        bot_cases = [c for c in ("daily_check", "daily_check_scan") if c in cases]
+        if bot_cases:
+            try:
+                bot = _silent_bot(tmp, FakeBybitAPI(md))
+            except ImportError as e:
+                for c in bot_cases:
+                    record(c, {"skipped": f"bybit_main_v2 import 실패 ({e})"})
+                bot_cases = []
+
+        def fresh_state():
+            for fp in (bot.STATE_F, bot.TURNOVER_F):   # 유니버스 갱신을 매번 처음부터
+                if os.path.exists(fp):
+                    os.remove(fp)
+
+        if "daily_check" in bot_cases:
+            record("daily_check", timeit(bot.daily_check, repeat, setup=fresh_state))
+
+        if "daily_check_scan" in bot_cases:
+            fresh_state()
+            bot.daily_check()
+            state = bot.load_state()
+            cached = {"positions": {}, "universe": state["universe"],
+                      "last_universe_year": state["last_universe_year"]}
+
+            def cached_state():
+                with open(bot.STATE_F, "w", encoding="utf-8") as f:
+                    json.dump(cached, f)
+            record("daily_check_scan", timeit(bot.daily_check, repeat, setup=cached_state))
+
+        live_cases = [c for c in ("live_universe_all", "live_scan_all") if c in cases]
+        if live_cases:
+            live_dir = os.path.join(tmp, "live")
+            os.makedirs(live_dir, exist_ok=True)
+            try:
+                live = _silent_bot(live_dir, FakeBybitAPI(md, latency=LIVE_LATENCY), sleep=True)
+            except ImportError as e:
+                for c in live_cases:
+                    record(c, {"skipped": f"bybit_main_v2 import 실패 ({e})"})
+                live_cases = []
+        if live_cases:
+            live.TOP_N = 0
+
+            def fresh_universe():
+                for fp in (live.STATE_F, live.TURNOVER_F):
+                    if os.path.exists(fp):
+                        os.remove(fp)
+
+            def build_universe():
+                state = {}
+                live.update_universe(state)
+                return state["universe"]
+
+            if "live_universe_all" in live_cases:
+                record("live_universe_all", timeit(build_universe, repeat, setup=fresh_universe))
+
+            if "live_scan_all" in live_cases:
+                instruments = live.api.get_instruments()
+                syms = build_universe()
+                # 워밍업은 마감 전 → 마지막 완결 봉 하나 전까지로 선행분을 만든다
+                closed = live.closed_klines
+                live.closed_klines = lambda sym, n: closed(sym, n + 1)[:-1]
+                try:
+                    pre = live._warmup()["pre"]
+                finally:
+                    live.closed_klines = closed
+                say(f"    (전 종목 스캔: {len(syms)}종목, 워커 {live.SCAN_WORKERS}, "
+                    f"초당 {live.API_RATE:.0f}회, 조회 지연 {LIVE_LATENCY * 1000:.0f}ms)")
+                syms = [s for s in syms if instruments[s]["status"] == "Trading"]
+                record("live_scan_all", timeit(
+                    lambda: live.pmap(lambda s: live.scan_features(s, pre.get(s)), syms), repeat))
+    return out
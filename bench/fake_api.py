@@ -0,0 +1,156 @@
+"""
+가짜 바이비트 API - 네트워크 없이 daily_check를 돌리기 위한 최소 구현
+====================================================================
+  FakeSession    pybit HTTP 중 봇이 쓰는 메서드만 (V5 응답 형태 그대로)
+  FakeBybitAPI   bybit_api.BybitAPI와 같은 메서드 (session = FakeSession)
+
+합성 MarketData의 마지막 봉이 오늘(UTC)이 되도록 날짜를 밀어서 내보낸다
+→ update_universe의 "전년" 구간, 상장일 필터가 실제처럼 동작.
+주문은 체결만 흉내 내고 호출 수만 센다 (잔고/포지션 변화 없음).
+latency: 시세 조회마다 대기(초) → 스레드 병렬 스캔을 실제 REST 왕복처럼 측정.
+"""
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+
+class FakeSession:
+    def __init__(self, md, equity=10000.0, today=None, latency=0.0):
+        today = (pd.Timestamp(today) if today else pd.Timestamp(time.time(), unit="s")).normalize()
+        shift = today - md.dates[-1]
+        self.equity = equity
+        self.latency = latency
+        self.calls = Counter()
+        self._ts = {}
+        self._ohlcv = {}
+        for sym in md.symbols:
+            c = md.close[sym]
+            ok = c.notna().to_numpy()
+            if not ok.any():
+                continue
+            cl = c.to_numpy(dtype=float)[ok]
+            vol = md.volume[sym].to_numpy(dtype=float)[ok]
+            self._ts[sym] = (md.dates[ok] + shift).as_unit("ms").asi8
+            # [open, high, low, close, volume, turnover] — open은 종가로 대체
+            self._ohlcv[sym] = np.column_stack([
+                cl, md.high[sym].to_numpy(dtype=float)[ok],
+                md.low[sym].to_numpy(dtype=float)[ok], cl, vol, cl * vol,
+            ])
+
+    @staticmethod
+    def _ok(result):
+        return {"retCode": 0, "retMsg": "OK", "result": result}
+
+    # ── 시세 ──
+    def get_kline(self, category, symbol, interval="D", limit=200, start=None, end=None):
+        self.calls["get_kline"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        ts = self._ts.get(symbol)
+        if ts is None:
+            return self._ok({"symbol": symbol, "category": category, "list": []})
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side="right"))
+        lo = max(lo, hi - limit)
+        rows = [[str(t)] + [repr(v) for v in vals]  # 최신순, 문자열 (실제 응답과 동일)
+                for t, vals in zip(ts[lo:hi][::-1].tolist(), self._ohlcv[symbol][lo:hi][::-1].tolist())]
+        return self._ok({"symbol": symbol, "category": category, "list": rows})
+
+    def get_tickers(self, category, symbol=None):
+        self.calls["get_tickers"] += 1
+        syms = [symbol] if symbol else list(self._ts)
+        out = []
+        for s in syms:
+            last = self._ohlcv[s][-1]
+            out.append({"symbol": s, "lastPrice": repr(float(last[3])), "turnover24h": repr(float(last[5]))})
+        return self._ok({"category": category, "list": out})
+
+    def get_instruments_info(self, category):
+        self.calls["get_instruments_info"] += 1
+        items = [{
+            "symbol": s, "status": "Trading", "launchTime": str(ts[0]),
+            "lotSizeFilter": {"minOrderQty": "0.001", "qtyStep": "0.001"},
+            "priceFilter": {"tickSize": "0.0001"},
+        } for s, ts in self._ts.items()]
+        return self._ok({"category": category, "list": items})
+
+    # ── 계좌 ──
+    def get_wallet_balance(self, accountType="UNIFIED"):
+        self.calls["get_wallet_balance"] += 1
+        eq = str(self.equity)
+        return self._ok({"list": [{
+            "totalEquity": eq,
+            "coin": [{"coin": "USDT", "walletBalance": eq, "equity": eq}],
+        }]})
+
+    def get_positions(self, category, settleCoin="USDT"):
+        self.calls["get_positions"] += 1
+        return self._ok({"list": []})
+
+    # ── 주문 ──
+    def set_leverage(self, category, symbol, buyLeverage, sellLeverage):
+        self.calls["set_leverage"] += 1
+        return self._ok({})
+
+    def place_order(self, category, symbol, side, orderType, qty, **kwargs):
+        self.calls["place_order"] += 1
+        return self._ok({"orderId": f"fake-{self.calls['place_order']}"})
+
+
+class FakeBybitAPI:
+    """bybit_api.BybitAPI 대체 (같은 메서드, 같은 반환 형태)"""
+
+    def __init__(self, md, equity=10000.0, today=None, latency=0.0):
+        self.session = FakeSession(md, equity, today, latency)
+        self.category = "linear"
+
+    def get_klines(self, symbol, interval="D", limit=50):
+        r = self.session.get_kline(category=self.category, symbol=symbol,
+                                   interval=interval, limit=limit)
+        return list(reversed(r["result"]["list"]))
+
+    def get_ticker(self, symbol):
+        return self.session.get_tickers(category=self.category, symbol=symbol)["result"]["list"][0]
+
+    def get_tickers_all(self):
+        return self.session.get_tickers(category=self.category)["result"]["list"]
+
+    def get_balance(self):
+        return self.session.equity
+
+    def get_equity(self):
+        r = self.session.get_wallet_balance(accountType="UNIFIED")
+        return float(r["result"]["list"][0]["totalEquity"])
+
+    def get_positions(self):
+        self.session.get_positions(category=self.category, settleCoin="USDT")
+        return []
+
+    def set_leverage(self, symbol, leverage=2):
+        self.session.set_leverage(category=self.category, symbol=symbol,
+                                  buyLeverage=str(leverage), sellLeverage=str(leverage))
+
+    def open_long(self, symbol, qty):
+        return self.session.place_order(category=self.category, symbol=symbol,
+                                        side="Buy", orderType="Market", qty=qty)
+
+    def open_short(self, symbol, qty):
+        return self.session.place_order(category=self.category, symbol=symbol,
+                                        side="Sell", orderType="Market", qty=qty)
+
+    def close_position(self, symbol, side, qty):
+        close_side = "Sell" if side == "Buy" else "Buy"
+        return self.session.place_order(category=self.category, symbol=symbol,
+                                        side=close_side, orderType="Market",
+                                        qty=qty, reduceOnly=True)
+
+    def get_instruments(self):
+        r = self.session.get_instruments_info(category=self.category)
+        return {item["symbol"]: {
+            "min_qty": float(item["lotSizeFilter"]["minOrderQty"]),
+            "qty_step": float(item["lotSizeFilter"]["qtyStep"]),
+            "tick_size": float(item["priceFilter"]["tickSize"]),
+            "status": item["status"],
+        } for item in r["result"]["list"]}
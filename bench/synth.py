@@ -0,0 +1,74 @@
+"""
+합성 시장 데이터 - 시드 고정, 운영 유니버스 규모
+================================================
+  make_market(n_symbols, years, seed)  → MarketData (BTC/ETH + C000USDT ...)
+  to_mcap(md) / to_api_cache(md)       → 기존 pkl 형식 (prepare_data / load_cache_data 입력)
+
+같은 (n_symbols, years, seed)면 항상 같은 행렬 → 벤치마크 간 비교 가능.
+종목 절반은 기간 중간에 상장 (앞부분 NaN) → 유니버스/지표의 결측 처리 경로도 탄다.
+"""
+import numpy as np
+import pandas as pd
+
+from bt_engine.data import MarketData
+
+END_DATE = "2025-12-31"
+
+
+def make_market(n_symbols=60, years=3, seed=42, end=END_DATE):
+    """n_symbols개 알트 + BTC/ETH 일봉 (years년 + 지표 워밍업 1년)"""
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(end=pd.Timestamp(end), periods=365 * (years + 1), freq="D")
+    T = len(idx)
+    syms = ["BTCUSDT", "ETHUSDT"] + [f"C{i:03d}USDT" for i in range(n_symbols)]
+    N = len(syms)
+
+    # 상장일: 앞 절반은 처음부터, 나머지는 전체 기간의 앞 2/3 안에서 무작위
+    listed = np.zeros(N, dtype=int)
+    late = np.arange(N) >= 2 + n_symbols // 2
+    listed[late] = rng.integers(0, T * 2 // 3, late.sum())
+
+    # 로그수익률 = 잡음 + 종목별 주기의 추세 구간 (채널 돌파 신호가 나오도록)
+    t = np.arange(T)[:, None]
+    period = 20 + np.arange(N) % 7
+    r = rng.normal(0.0005, 0.04, (T, N)) + 0.01 * np.sin(t / period)
+    close = 10.0 * (np.arange(N) + 1) * np.exp(np.cumsum(r, axis=0))
+    high = close * (1 + np.abs(rng.normal(0, 0.02, (T, N))))
+    low = close * (1 - np.abs(rng.normal(0, 0.02, (T, N))))
+    volume = rng.lognormal(10, 0.6, (T, N)) * (1 + 0.5 * (np.arange(N) % 5))
+
+    before = t < listed
+    frames = []
+    for a in (close, volume, high, low):
+        a[before] = np.nan
+        frames.append(pd.DataFrame(a, index=idx, columns=syms))
+    return MarketData(*frames)
+
+
+def to_mcap(md):
+    """MarketData → {"data": {sym: OHLCV DataFrame}} (load_mcap_pkl 형식)"""
+    data = {}
+    for sym in md.symbols:
+        c = md.close[sym].dropna()
+        ix = c.index
+        data[sym] = pd.DataFrame({
+            "Open": c, "High": md.high[sym].loc[ix], "Low": md.low[sym].loc[ix],
+            "Close": c, "Volume": md.volume[sym].loc[ix],
+        }, index=ix)
+    return {"data": data}
+
+
+def to_api_cache(md):
+    """MarketData → {sym: kline DataFrame} (bt_cache.pkl 형식)"""
+    cache = {}
+    for sym in md.symbols:
+        c = md.close[sym].dropna()
+        ix = c.index
+        v = md.volume[sym].loc[ix]
+        cache[sym] = pd.DataFrame({
+            "ts": ix.as_unit("ms").asi8, "open": c.values,
+            "high": md.high[sym].loc[ix].values, "low": md.low[sym].loc[ix].values,
+            "close": c.values, "volume": v.values, "turnover": (c * v).values,
+            "date": ix.strftime("%Y-%m-%d"),
+        })
+    return cache
@@ -0,0 +1,185 @@
+"""
+라이브 봇 메트릭 - Prometheus 텍스트 형식 HTTP 엔드포인트
+========================================================
+표준 라이브러리만 사용 (prometheus_client 불필요). 데몬 스레드의 HTTP 서버가
+GET /metrics 요청마다 현재 값을 텍스트로 내보낸다. 갱신/출력은 락 하나로 보호
+→ 매매 루프는 값만 더하고 바로 돌아간다.
+
+  bot_metrics.start_server(9108)                  # 127.0.0.1:9108/metrics
+  bot_metrics.api_call("get_kline", 0.21, False)  # BybitAPI hook
+  bot_metrics.observe_run(timing_run)             # daily_check 단계별 소요
+  bot_metrics.job_run("daily_check", 0.01, 42.0, "ok")  # Scheduler hook
+  bot_metrics.STATE_SAVE.observe(sec) / EQUITY.set(v) / POSITIONS.set(n)
+
+주문 지연(bybit_order_latency_seconds)은 시장가 place_order 요청→응답 왕복.
+V5 응답 시점에 체결이 끝난 것으로 보고 별도 체결 조회는 하지 않는다.
+"""
+import time
+import threading
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DURATION_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1200)
+DELAY_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 60)
+
+_lock = threading.Lock()
+_registry = []
+
+
+def _fmt_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+        _registry.append(self)
+
+    def render(self):
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        out += self._samples()
+        return out
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount=1.0):
+        with _lock:
+            self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def _samples(self):
+        return [f"{self.name}{_fmt_labels(self.labels, k)} {v}" for k, v in self.values.items()]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *label_values):
+        with _lock:
+            self.values[label_values] = float(value)
+
+    def _samples(self):
+        return [f"{self.name}{_fmt_labels(self.labels, k)} {v}" for k, v in self.values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *label_values):
+        with _lock:
+            h = self.values.get(label_values)
+            if h is None:
+                h = self.values[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for j, b in enumerate(self.buckets):
+                if value <= b:
+                    h[0][j] += 1
+            h[1] += value
+            h[2] += 1
+
+    def _samples(self):
+        out = []
+        for k, (counts, total, n) in self.values.items():
+            for b, c in zip(self.buckets, counts):
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels + ('le',), k + (b,))} {c}")
+            out.append(f"{self.name}_bucket{_fmt_labels(self.labels + ('le',), k + ('+Inf',))} {n}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, k)} {total}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, k)} {n}")
+        return out
+
+
+# ─── 봇 메트릭 ───────────────────────────────────────────────
+API_LATENCY = Histogram("bybit_api_request_duration_seconds", "바이비트 API 호출 소요 (메서드별)", ("endpoint",))
+API_REQUESTS = Counter("bybit_api_requests_total", "바이비트 API 호출 수", ("endpoint",))
+API_ERRORS = Counter("bybit_api_errors_total", "바이비트 API 예외 수", ("endpoint",))
+ORDERS = Counter("bybit_orders_total", "시장가 주문 수 (결과별)", ("result",))
+ORDER_LATENCY = Histogram("bybit_order_latency_seconds", "주문 요청→응답 (시장가 체결 기준)")
+PHASE_DURATION = Histogram("bot_phase_duration_seconds", "daily_check 단계별 소요", ("phase",),
+                           buckets=DURATION_BUCKETS)
+RUN_DURATION = Histogram("bot_daily_check_duration_seconds", "daily_check 전체 소요",
+                         buckets=DURATION_BUCKETS)
+STATE_SAVE = Histogram("bot_state_save_duration_seconds", "state.json 저장 소요",
+                       buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0))
+JOB_DURATION = Histogram("bot_job_duration_seconds", "스케줄 작업 소요", ("job",),
+                         buckets=DURATION_BUCKETS)
+JOB_DELAY = Histogram("bot_job_start_delay_seconds", "스케줄 작업 시작 지연 (예정 시각 대비)", ("job",),
+                      buckets=DELAY_BUCKETS)
+JOB_RUNS = Counter("bot_job_runs_total", "스케줄 작업 실행 수 (결과별)", ("job", "result"))
+EQUITY = Gauge("bot_equity_usdt", "마지막 조회 총자산 (USDT)")
+POSITIONS = Gauge("bot_open_positions", "보유 포지션 수")
+LAST_RUN = Gauge("bot_last_daily_check_timestamp_seconds", "마지막 daily_check 종료 시각 (epoch)")
+
+
+def api_call(endpoint, sec, error=False):
+    """BybitAPI hook - 호출 수/지연/오류, place_order는 주문 메트릭도"""
+    API_REQUESTS.inc(endpoint)
+    API_LATENCY.observe(sec, endpoint)
+    if error:
+        API_ERRORS.inc(endpoint)
+    if endpoint in ("place_order", "place_batch_order"):
+        ORDERS.inc("error" if error else "ok")
+        if not error:
+            ORDER_LATENCY.observe(sec)
+
+
+def job_run(name, delay, sec, result):
+    """Scheduler hook - 작업별 실행 수 / 시작 지연 / 소요 (건너뜀은 횟수만)"""
+    JOB_RUNS.inc(name, result)
+    if result != "skipped":
+        JOB_DELAY.observe(delay, name)
+        JOB_DURATION.observe(sec, name)
+
+
+def observe_run(run):
+    """timing.Run (daily_check 1회) → 단계별 / 전체 소요"""
+    for kind, name, calls, total, _, _ in run.rows():
+        if kind == "phase":
+            PHASE_DURATION.observe(total, name)
+        elif kind == "run":
+            RUN_DURATION.observe(total)
+    LAST_RUN.set(time.time())
+
+
+def render():
+    with _lock:
+        lines = []
+        for m in _registry:
+            lines += m.render()
+    return "\n".join(lines) + "\n"
+
+
+# ─── HTTP 서버 ───────────────────────────────────────────────
+def start_server(port, host="127.0.0.1"):
+    """데몬 스레드로 /metrics 서버 시작 → ThreadingHTTPServer"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # 서버 켤 때만 import
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass  # 스크레이프마다 trading.log에 남기지 않음
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    t = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    t.start()
+    return server
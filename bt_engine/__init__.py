@@ -0,0 +1,37 @@
+"""
+통합 백테스트 엔진 - 바이비트 채널 돌파 복합 전략
+================================================
+데이터 소스 / 유니버스 / 지표 / 일일 루프 / 출력을 한 곳에 모았다.
+backtest*.py 스크립트는 설정 상수 + 이 패키지 호출만 남은 CLI 래퍼.
+
+  md = data.load_api_cache("bt_cache.pkl")          # 또는 load_mcap_pkl / load_columnar
+  universe, _ = annual_universe(md.close, md.volume, 2023, 2025, top_n=60, exclude=EXCLUDE)
+  # 또는 rolling_universe(md.close, md.volume, "2023-01-01", freq="quarter") → {분기 시작일: [...]}
+  # 시점 기준 후보: symbols=InstrumentRegistry("instruments.db").tradable (상장폐지 종목 포함)
+  sig = Signals(md, universe_coins(universe, md.close.columns))
+  # 저메모리: Signals(md.astype(np.float32), coins, dtype=np.float32) → 행렬 메모리 약 절반
+  dates, equity, trades = run(sig, universe, STRATS, sizing="dynamic", ...)
+
+sizing: "fixed" | "dynamic" | "dynamic_resize"
+intraday_max_loss / intraday_max_profit: 장중 고가/저가 안전장치 (None이면 끔)
+minute=MinuteStore(경로): 안전장치를 분봉 시간 순서로 판정 (보유 종목-일만 읽음)
+funding=funding_matrix(경로, sig): 보유 포지션 펀딩비 부과 (저장소는 funding_ingest.py)
+"""
+from . import data
+from .data import MarketData, load_api_cache, load_mcap_pkl, load_columnar, save_columnar
+from .universe import TurnoverIndex, annual_universe, rolling_universe, universe_coins
+from .signals import Signals, calc_channel
+from .core import run, SIZING_POLICIES
+from .minute import MinuteStore
+from .instruments import InstrumentRegistry
+from .funding import FundingRates, load_funding, save_funding, daily_funding, funding_matrix
+from .report import print_results, print_performance
+
+__all__ = [
+    "data", "MarketData", "load_api_cache", "load_mcap_pkl", "load_columnar", "save_columnar",
+    "TurnoverIndex", "annual_universe", "rolling_universe", "universe_coins",
+    "Signals", "calc_channel",
+    "run", "SIZING_POLICIES", "MinuteStore", "InstrumentRegistry",
+    "FundingRates", "load_funding", "save_funding", "daily_funding", "funding_matrix",
+    "print_results", "print_performance",
+]
@@ -0,0 +1,278 @@
+"""
+일일 루프 - 모든 백테스트 스크립트가 공유하는 단일 구현
+======================================================
+하루 순서 (라이브 daily_check와 동일):
+  자산 평가 → MDD 기반 현금비율 → [장중 안전장치] → BTC 필터 청산
+  → SL/TP/TIME 청산 → 후보 선정 (-score, 유니버스 순위) → 사이징/진입 → 자산 기록
+
+사이징 정책 (sizing):
+  "fixed"           슬롯당 투자금 / max_pos 고정 (backtest.py)
+  "dynamic"         신규 진입 시 투자금 / (보유 + 신규), 기존 포지션은 유지 (v2 계열)
+  "dynamic_resize"  dynamic + 기존 포지션도 같은 크기로 리사이징, 청산만 있던 날은
+                    남은 포지션을 확대 (backtest_dynamic.py)
+
+장중 안전장치: intraday_max_loss / intraday_max_profit = {전략: 비율 or None}
+  기본: 일봉 고가/저가로 도달 여부 판정, 도달 시 해당 비율로 청산 (종가 청산보다 먼저)
+        → 손절/익절이 같은 날 둘 다 닿으면 손절로 본다 (순서를 알 수 없음)
+  minute (MinuteStore): 보유 중인 종목-일만 분봉을 읽어 guard_every_min분마다 현재가로 판정
+        (라이브 모니터와 같은 방식) → 먼저 닿은 쪽, 체크 시점 가격으로 청산.
+        분봉이 없는 종목-일은 일봉 근사로 대체
+
+펀딩: funding = daily_funding(FundingRates, sig.dates, sig.coins) [일수, 종목] 행렬
+  매일 첫 단계에서 보유 포지션 전체에 한 번에 부과 (현금 차감, 거래기록 "funding"에 누적)
+  → None이면 기존과 같은 결과 (편도 비용만)
+"""
+import numpy as np
+
+from trade_book import PositionBook, TradeLog
+from .universe import universe_schedule
+
+SIZING_POLICIES = ("fixed", "dynamic", "dynamic_resize")
+
+
+def _blocked(btc_filter, is_bull):
+    return (btc_filter == "bull" and not is_bull) or (btc_filter == "bear" and is_bull)
+
+
+def run(sig, universe, strats, max_pos=4, leverage=3, cash_ratio=0.50,
+        mdd_thresh=-0.35, cost=0.001, initial_capital=10000.0, sizing="dynamic",
+        intraday_max_loss=None, intraday_max_profit=None, minute=None, guard_every_min=5,
+        funding=None, start=None, end=None, i_start=None, i_end=None, min_history=80,
+        btc_reason="BTC", log=None):
+    """
+    sig: Signals, universe: {year: [종목, ...]} 또는 {기간 시작일: [종목, ...]} (리스트 순서 = 우선순위)
+    strats: {키: {signal, direction, btc_filter, sl, tp, hold_days, r2_thresh, vol_mult}}
+            sl은 부호 무관 (손절폭)
+    start/end: 날짜 문자열 구간 (end 포함), i_start/i_end: 인덱스 구간 [i_start, i_end)
+    min_history: 시작 인덱스 하한 (지표 워밍업)
+    minute: bt_engine.minute.MinuteStore (장중 안전장치 분봉 판정, None이면 일봉 근사)
+    funding: [일수, 종목] 봉별 펀딩비 합 (bt_engine.funding.daily_funding, None이면 부과 안 함)
+    btc_reason: BTC 필터 청산 사유 ("{filter}" → bull/bear 치환)
+    log: logging.Logger (유니버스 갱신 / MDD 전량투입 / 월초 진행 상황)
+    반환: (dates_used, equity ndarray, trades TRADE_DTYPE 배열)
+    """
+    if sizing not in SIZING_POLICIES:
+        raise ValueError(f"sizing: {sizing} (허용: {SIZING_POLICIES})")
+
+    dates = sig.dates
+    coins = sig.coins
+    col_of = sig.col_of
+    price = sig.close
+    n_cols = len(coins)
+
+    if i_start is None:
+        i_start = 0 if start is None else int(dates.searchsorted(np.datetime64(start)))
+    if i_end is None:
+        i_end = len(dates) if end is None else int(dates.searchsorted(np.datetime64(end), side="right"))
+    first = max(min_history, i_start)
+    last = min(i_end, len(dates))
+
+    strat_keys = list(strats)
+    cfgs = [strats[k] for k in strat_keys]
+    sl = [-abs(c["sl"]) for c in cfgs]
+    tp = [c["tp"] for c in cfgs]
+    hold = [c["hold_days"] for c in cfgs]
+    btcf = [c["btc_filter"] for c in cfgs]
+    sdir = [-1.0 if c["direction"] == "short" else 1.0 for c in cfgs]
+    trig = [sig.triggers(c) for c in cfgs]
+
+    guard = intraday_max_loss is not None or intraday_max_profit is not None
+    if guard:
+        g_loss = [(intraday_max_loss or {}).get(k) for k in strat_keys]
+        g_profit = [(intraday_max_profit or {}).get(k) for k in strat_keys]
+        high, low = sig.high, sig.low
+        day_sec = sig.dates.values.astype("M8[s]").astype(np.int64)  # 봉 시작 (UTC 자정) epoch 초
+        n_minute = n_daily = 0
+
+    cash = initial_capital
+    peak_equity = initial_capital
+    mdd_deployed = False
+    book = PositionBook(max_pos)
+    trades = TradeLog()
+    equity_curve = np.empty(max(0, last - first))
+    u_starts, u_members = universe_schedule(universe, dates.values)
+    period_of = np.searchsorted(u_starts, np.arange(len(dates)), side="right") - 1
+    current_period = None
+    univ_mask = np.zeros(n_cols, dtype=bool)
+    rank = np.full(n_cols, 999)
+    d64 = dates.values.astype("M8[D]")
+
+    def close_slot(slot, exit_price, pnl, reason, i):
+        nonlocal cash
+        cash += book.margin[slot] + book.notional[slot] * pnl
+        cash -= book.notional[slot] * cost
+        eidx = int(book.entry_idx[slot])
+        trades.append(
+            coins[book.col[slot]], strat_keys[book.strat[slot]], book.direction[slot],
+            reason, pnl, i - eidx, eidx, i, book.entry_price[slot], exit_price,
+            len(book), d64[eidx], d64[i], book.funding[slot],
+        )
+        book.close(slot)
+
+    def resize(per_slot):
+        nonlocal cash
+        for slot in book.slots():
+            new_notional = per_slot * leverage
+            cash += book.margin[slot] - per_slot
+            cash -= abs(new_notional - book.notional[slot]) * cost
+            book.margin[slot] = per_slot
+            book.notional[slot] = new_notional
+
+    for i in range(first, last):
+        period = period_of[i]
+        if period != current_period:
+            current_period = period
+            members = u_members[period] if period >= 0 else []
+            univ_mask[:] = False
+            rank[:] = 999
+            for r, c in enumerate(members):
+                if c in col_of:
+                    univ_mask[col_of[c]] = True
+                    rank[col_of[c]] = r
+            if log:
+                log.info(f"[{dates[i].date()}] 유니버스 갱신: {len(members)}종목 (상위: {members[:5]})")
+
+        row = price[i]
+        if funding is not None and len(book):
+            cash -= book.charge_funding(funding[i], row)
+        if not sig.state_ok[i]:
+            equity_curve[i - first] = book.equity(cash, row)
+            continue
+        is_bull = bool(sig.bull[i])
+
+        # ── MDD 기반 현금비율 ──
+        equity = book.equity(cash, row)
+        if equity > peak_equity:
+            peak_equity = equity
+            mdd_deployed = False
+        current_mdd = equity / peak_equity - 1 if peak_equity > 0 else 0
+        if mdd_thresh is not None and current_mdd <= mdd_thresh and not mdd_deployed:
+            mdd_deployed = True
+            if log:
+                log.info(f"[{dates[i].date()}] MDD {current_mdd*100:.1f}% → 현금 전량투입!")
+        effective_cash_ratio = 0.0 if mdd_deployed else cash_ratio
+
+        # ── 장중 안전장치 (고가/저가) ──
+        if guard:
+            for slot in book.slots():
+                sid = book.strat[slot]
+                ml, mp = g_loss[sid], g_profit[sid]
+                if ml is None and mp is None:
+                    continue
+                c = book.col[slot]
+                ep = book.entry_price[slot]
+                px = None if minute is None else minute.check_prices(coins[c], day_sec[i], guard_every_min)
+                if px is not None:
+                    n_minute += 1
+                    pnl = book.direction[slot] * (px.astype(float) / ep - 1)
+                    hit = np.zeros(len(pnl), dtype=bool)
+                    if ml is not None:
+                        hit |= pnl <= ml
+                    if mp is not None:
+                        hit |= pnl >= mp
+                    if hit.any():
+                        k = int(hit.argmax())
+                        reason = "MAXLOSS" if ml is not None and pnl[k] <= ml else "MAXPROFIT"
+                        close_slot(slot, float(px[k]), float(pnl[k]), reason, i)
+                    continue
+                hi, lo = high[i, c], low[i, c]
+                if np.isnan(hi) or np.isnan(lo):
+                    continue
+                n_daily += 1
+                if book.direction[slot] > 0:
+                    worst, best = lo / ep - 1, hi / ep - 1
+                else:
+                    worst, best = -(hi / ep - 1), -(lo / ep - 1)
+                if ml is not None and worst <= ml:
+                    close_slot(slot, ep * (1 + ml * book.direction[slot]), ml, "MAXLOSS", i)
+                elif mp is not None and best >= mp:
+                    close_slot(slot, ep * (1 + mp * book.direction[slot]), mp, "MAXPROFIT", i)
+        n_before = len(book)
+
+        # ── BTC 필터 청산 ──
+        for slot in book.slots():
+            f = btcf[book.strat[slot]]
+            if _blocked(f, is_bull):
+                cur = row[book.col[slot]]
+                if np.isnan(cur):
+                    continue
+                pnl = book.direction[slot] * (cur / book.entry_price[slot] - 1)
+                close_slot(slot, cur, pnl, btc_reason.format(filter=f), i)
+
+        # ── SL/TP/TIME 청산 ──
+        for slot in book.slots():
+            sid = book.strat[slot]
+            cur = row[book.col[slot]]
+            if np.isnan(cur):
+                continue
+            pnl = book.direction[slot] * (cur / book.entry_price[slot] - 1)
+            if pnl <= sl[sid]:
+                close_slot(slot, cur, pnl, "SL", i)
+            elif pnl >= tp[sid]:
+                close_slot(slot, cur, pnl, "TP", i)
+            elif i - book.entry_idx[slot] >= hold[sid]:
+                close_slot(slot, cur, pnl, "TIME", i)
+
+        # ── 후보 선정 ──
+        equity = book.equity(cash, row)
+        avail_slots = max_pos - len(book)
+        selected = []
+        if avail_slots > 0:
+            open_mask = univ_mask.copy()
+            open_mask[list(book.cols())] = False
+            cand_cols, cand_sid = [], []
+            for sid in range(len(cfgs)):
+                if _blocked(btcf[sid], is_bull):
+                    continue
+                c = np.flatnonzero(trig[sid][i] & open_mask)
+                if len(c):
+                    cand_cols.append(c)
+                    cand_sid.append(np.full(len(c), sid))
+            if cand_cols:
+                cc = np.concatenate(cand_cols)
+                cs = np.concatenate(cand_sid)
+                order = np.lexsort((rank[cc], -sig.score[i, cc]))
+                seen = set()
+                for k in order:
+                    c = int(cc[k])
+                    if c in seen:
+                        continue
+                    seen.add(c)
+                    selected.append((c, int(cs[k])))
+                    if len(selected) >= avail_slots:
+                        break
+
+        # ── 사이징 / 진입 ──
+        if selected:
+            invest_capital = equity * (1 - effective_cash_ratio)
+            if sizing == "fixed":
+                per_slot = invest_capital / max_pos
+            else:
+                per_slot = invest_capital / min(len(book) + len(selected), max_pos)
+                if sizing == "dynamic_resize":
+                    resize(per_slot)
+            order_usdt = per_slot * leverage
+            margin = per_slot
+
+            for c, sid in selected:
+                if len(book) >= max_pos:
+                    break
+                if cash < margin + order_usdt * cost:
+                    break
+                cash -= margin
+                cash -= order_usdt * cost
+                book.open(c, row[c], i, sid, sdir[sid], order_usdt, margin)
+
+        elif sizing == "dynamic_resize" and n_before > len(book) > 0:
+            # 청산만 있던 날: 남은 포지션 확대
+            resize(book.equity(cash, row) * (1 - effective_cash_ratio) / len(book))
+
+        equity = book.equity(cash, row)
+        equity_curve[i - first] = equity
+
+        if log and i > first and dates[i].day == 1:
+            log.info(f"[{dates[i].date()}] 자산=${equity:,.0f} 포지션={len(book)} 거래={len(trades)}건")
+
+    if guard and minute is not None and log:
+        log.info(f"장중 안전장치 판정: 분봉 {n_minute}건 / 일봉 근사 {n_daily}건 (종목-일)")
+    return dates[first:last], equity_curve, trades.to_array()
@@ -0,0 +1,219 @@
+"""
+데이터 소스 → MarketData (날짜 × 종목 정렬 행렬)
+================================================
+  API 캐시     bt_cache.pkl  {sym: DataFrame(date, open, high, low, close, volume, ...)}
+  mcap pickle  {"data": {sym: DataFrame(Open, High, Low, Close, Volume)}}
+  컬럼 저장소  디렉터리에 필드별 .npy (+ dates/symbols), np.load mmap으로 바로 사용
+
+엔진은 MarketData만 본다. 어떤 소스든 같은 행렬로 바뀐 뒤에는 결과가 같다.
+md.astype(np.float32): 가격/거래량을 float32로 (메모리 절반, 지표 계산은 Signals가 float64로)
+"""
+import os
+import time
+import pickle
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("close", "volume", "high", "low")
+
+
+class MarketData:
+    """정렬된 일봉 행렬 묶음 (index = DatetimeIndex, columns = 종목)"""
+
+    def __init__(self, close, volume, high=None, low=None):
+        self.close = close
+        self.volume = volume
+        self.high = high
+        self.low = low
+
+    @property
+    def dates(self):
+        return self.close.index
+
+    @property
+    def symbols(self):
+        return list(self.close.columns)
+
+    def __len__(self):
+        return len(self.close.columns)
+
+    @property
+    def nbytes(self):
+        """행렬 데이터 바이트 수 (인덱스 제외)"""
+        return sum(f.to_numpy(copy=False).nbytes for f in (self.close, self.volume, self.high, self.low)
+                   if f is not None)
+
+    def astype(self, dtype):
+        """모든 필드를 dtype으로 (이미 같으면 그대로 공유)"""
+        cast = lambda f: None if f is None else f.astype(dtype)
+        return MarketData(cast(self.close), cast(self.volume), cast(self.high), cast(self.low))
+
+
+def _frames(close_d, volume_d, high_d, low_d):
+    close = pd.DataFrame(close_d).sort_index()
+    volume = pd.DataFrame(volume_d).sort_index()
+    high = pd.DataFrame(high_d).sort_index().reindex_like(close) if high_d else None
+    low = pd.DataFrame(low_d).sort_index().reindex_like(close) if low_d else None
+    return MarketData(close, volume, high, low)
+
+
+# ─── API 캐시 (bt_cache.pkl) ─────────────────────────────────
+def from_api_cache(cache):
+    """{sym: kline DataFrame} → MarketData (빈 종목 제외)"""
+    close_d, volume_d, high_d, low_d = {}, {}, {}, {}
+    for sym, df in cache.items():
+        if df.empty:
+            continue
+        s = df.set_index("date").sort_index()
+        s.index = pd.to_datetime(s.index)
+        close_d[sym] = s["close"]
+        volume_d[sym] = s["volume"]
+        if "high" in s.columns:
+            high_d[sym] = s["high"]
+            low_d[sym] = s["low"]
+    return _frames(close_d, volume_d, high_d, low_d)
+
+
+def load_api_cache(path):
+    with open(path, "rb") as f:
+        return from_api_cache(pickle.load(f))
+
+
+def download_klines(session, symbol, start_date, end_date, interval="D", log=None):
+    """바이비트 일봉 다운로드 (end에서 역방향 페이징, 최대 20회)"""
+    start_ms = int(pd.Timestamp(start_date).timestamp() * 1000)
+    end_ms = int(pd.Timestamp(end_date).timestamp() * 1000)
+
+    all_rows = []
+    fetch_end = end_ms
+    for _ in range(20):
+        try:
+            resp = session.get_kline(
+                category="linear", symbol=symbol,
+                interval=interval, limit=200,
+                start=start_ms, end=fetch_end,
+            )
+            rows = resp["result"]["list"]
+            if not rows:
+                break
+            all_rows.extend(rows)
+            # 바이비트는 최신순 반환 → 마지막이 가장 오래된 것
+            earliest_ts = min(int(r[0]) for r in rows)
+            if earliest_ts <= start_ms:
+                break
+            fetch_end = earliest_ts - 1
+            time.sleep(0.05)
+        except Exception as e:
+            if log:
+                log.warning(f"  {symbol} 다운로드 실패: {e}")
+            break
+
+    if not all_rows:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(all_rows, columns=["ts", "open", "high", "low", "close", "volume", "turnover"])
+    df["ts"] = df["ts"].astype(int)
+    for col in ["open", "high", "low", "close", "volume", "turnover"]:
+        df[col] = df[col].astype(float)
+    df["date"] = pd.to_datetime(df["ts"], unit="ms").dt.strftime("%Y-%m-%d")
+    df = df.drop_duplicates(subset=["date"]).sort_values("date").reset_index(drop=True)
+    return df
+
+
+def list_symbols(session, exclude=(), min_list_days=0):
+    """거래 중인 USDT 퍼페추얼 종목 (상장 min_list_days일 미만 제외)"""
+    instruments = session.get_instruments_info(category="linear")
+    min_launch_ms = int(time.time() * 1000) - min_list_days * 86400 * 1000
+    symbols = []
+    for item in instruments["result"]["list"]:
+        sym = item["symbol"]
+        if not sym.endswith("USDT") or sym in exclude:
+            continue
+        if item.get("status") != "Trading":
+            continue
+        lt = int(item.get("launchTime", "0") or "0")
+        if lt > min_launch_ms:
+            continue
+        symbols.append(sym)
+    return symbols
+
+
+def fetch_api_cache(session, symbols, start_date, end_date, cache_file, log=None):
+    """모든 종목 + BTC 일봉을 캐시 파일에 채워 반환 (없는 종목만 다운로드)"""
+    say = log.info if log else (lambda *a: None)
+    if os.path.exists(cache_file):
+        say(f"캐시 로드: {cache_file}")
+        with open(cache_file, "rb") as f:
+            cache = pickle.load(f)
+        cached = set(cache)
+        missing = [s for s in symbols if s not in cached]
+        if "BTCUSDT" not in cached:
+            missing.append("BTCUSDT")
+        if not missing:
+            say(f"캐시 완전 적중: {len(cache)}종목")
+            return cache
+        say(f"추가 다운로드 필요: {len(missing)}종목")
+    else:
+        cache = {}
+        missing = list(symbols) + ["BTCUSDT"]
+
+    # 다운로드 시작일: 전년 유니버스 계산 위해 1년+90일 여유
+    dl_start = (pd.Timestamp(start_date) - pd.Timedelta(days=455)).strftime("%Y-%m-%d")
+    total = len(missing)
+    for i, sym in enumerate(missing):
+        if (i + 1) % 10 == 0 or i == 0:
+            say(f"  다운로드: {i+1}/{total} ({sym})")
+        df = download_klines(session, sym, dl_start, end_date, log=log)
+        if not df.empty:
+            cache[sym] = df
+        time.sleep(0.08)
+
+    with open(cache_file, "wb") as f:
+        pickle.dump(cache, f)
+    say(f"캐시 저장: {len(cache)}종목 → {cache_file}")
+    return cache
+
+
+# ─── mcap pickle (bybit_futures_top150_mcap_v3.pkl) ──────────
+def from_mcap(raw):
+    """{"data": {sym: OHLCV DataFrame}} → MarketData"""
+    close_d, volume_d, high_d, low_d = {}, {}, {}, {}
+    for sym, df in raw["data"].items():
+        close_d[sym] = df["Close"]
+        volume_d[sym] = df["Volume"]
+        if "High" in df.columns:
+            high_d[sym] = df["High"]
+            low_d[sym] = df["Low"]
+    return _frames(close_d, volume_d, high_d, low_d)
+
+
+def load_mcap_pkl(path):
+    with open(path, "rb") as f:
+        return from_mcap(pickle.load(f))
+
+
+# ─── 컬럼 저장소 ─────────────────────────────────────────────
+def save_columnar(md, path):
+    """필드별 [날짜, 종목] float64 .npy + dates.npy + symbols.npy"""
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "dates.npy"), md.dates.values.astype("M8[D]"))
+    np.save(os.path.join(path, "symbols.npy"), np.array(md.symbols))
+    for name in FIELDS:
+        frame = getattr(md, name)
+        if frame is not None:
+            np.save(os.path.join(path, f"{name}.npy"), frame.to_numpy(dtype=float))
+
+
+def load_columnar(path, mmap=True):
+    """save_columnar 디렉터리 → MarketData (mmap이면 필요한 페이지만 읽음)"""
+    mode = "r" if mmap else None
+    dates = pd.DatetimeIndex(np.load(os.path.join(path, "dates.npy")))
+    symbols = list(np.load(os.path.join(path, "symbols.npy")))
+    frames = {}
+    for name in FIELDS:
+        fp = os.path.join(path, f"{name}.npy")
+        if os.path.exists(fp):
+            frames[name] = pd.DataFrame(np.load(fp, mmap_mode=mode), index=dates,
+                                        columns=symbols, copy=False)
+    return MarketData(frames["close"], frames["volume"], frames.get("high"), frames.get("low"))
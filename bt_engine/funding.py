@@ -0,0 +1,108 @@
+"""
+펀딩비 저장소 - 퍼페추얼 펀딩 기록 (보통 8시간마다) → 백테스트 보유 비용
+========================================================================
+컬럼 저장소 (save_columnar와 같은 방식, np.load mmap):
+  {root}/ts.npy        펀딩 시각 int64 epoch 초 (전 종목 합집합, 오름차순)
+  {root}/symbols.npy   종목
+  {root}/rate.npy      [시각, 종목] float64 펀딩비 (해당 시각 기록이 없으면 NaN)
+1h / 4h 주기 종목도 같은 행렬에 들어간다 (시각 행이 늘어날 뿐). 쓰기는 funding_ingest.py.
+
+백테스트 적용 (bt_engine.run(funding=...)):
+  daily_funding()이 펀딩 시각을 일봉에 배정해 [일수, 종목] 합계 행렬을 만든다.
+  봉 i = [d_i, d_i + 1일) → 시각 t가 d_i < t ≤ d_i + 1일이면 봉 i에 배정
+  (진입 / 청산이 봉 마감 직후라 진입 시각의 펀딩은 안 내고 청산 시각의 펀딩은 낸다 — 라이브와 같음)
+  엔진은 매일 보유 포지션에 방향 × 펀딩비 × 포지션 가치(진입 금액 × 종가 / 진입가)를 한 번에 부과
+  → 롱은 양(+)의 펀딩비를 내고 숏은 받는다. 장중 안전장치로 청산된 날도 그날 펀딩은 다 낸 것으로 본다.
+"""
+import os
+
+import numpy as np
+
+DAY_SEC = 86400
+
+
+class FundingRates:
+    """[시각, 종목] 펀딩비 행렬 (ts 오름차순)"""
+
+    def __init__(self, ts, symbols, rate):
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.symbols = list(symbols)
+        self.rate = rate
+        self.col_of = {s: j for j, s in enumerate(self.symbols)}
+
+    def __len__(self):
+        return len(self.ts)
+
+    def series(self, symbol):
+        """종목 1개 → (ts, rate) 기록 있는 시각만 / 없는 종목이면 빈 배열"""
+        j = self.col_of.get(symbol)
+        if j is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        r = np.asarray(self.rate[:, j])
+        ok = ~np.isnan(r)
+        return self.ts[ok], r[ok]
+
+    def last_ts(self, symbol):
+        ts, _ = self.series(symbol)
+        return int(ts[-1]) if len(ts) else None
+
+
+def merge(fr, new):
+    """기존 FundingRates(None 가능) + {종목: (ts, rate)} → 새 FundingRates (같은 시각은 새 값)"""
+    series = {} if fr is None else {s: fr.series(s) for s in fr.symbols}
+    for sym, (ts, rate) in new.items():
+        ts = np.asarray(ts, dtype=np.int64)
+        rate = np.asarray(rate, dtype=np.float64)
+        if sym in series:
+            ts = np.concatenate([ts, series[sym][0]])
+            rate = np.concatenate([rate, series[sym][1]])
+        ts, idx = np.unique(ts, return_index=True)       # 앞쪽(새 값)이 남는다
+        series[sym] = (ts, rate[idx])
+    symbols = sorted(series)
+    all_ts = np.unique(np.concatenate([series[s][0] for s in symbols])) if symbols \
+        else np.empty(0, dtype=np.int64)
+    rate = np.full((len(all_ts), len(symbols)), np.nan)
+    for j, s in enumerate(symbols):
+        ts, r = series[s]
+        rate[all_ts.searchsorted(ts), j] = r
+    return FundingRates(all_ts, symbols, rate)
+
+
+def save_funding(fr, path):
+    os.makedirs(path, exist_ok=True)
+    for name, arr in (("ts", fr.ts), ("symbols", np.array(fr.symbols)), ("rate", np.asarray(fr.rate))):
+        tmp = os.path.join(path, f".{name}.tmp.npy")
+        np.save(tmp, arr)
+        os.replace(tmp, os.path.join(path, f"{name}.npy"))
+
+
+def load_funding(path, mmap=True):
+    """저장소 → FundingRates / None (없으면)"""
+    if not os.path.exists(os.path.join(path, "rate.npy")):
+        return None
+    return FundingRates(np.load(os.path.join(path, "ts.npy")),
+                        [str(s) for s in np.load(os.path.join(path, "symbols.npy"))],
+                        np.load(os.path.join(path, "rate.npy"), mmap_mode="r" if mmap else None))
+
+
+def funding_matrix(path, sig):
+    """저장소 경로 + Signals → run(funding=...) 행렬 / None (저장소 없음 → 펀딩 미적용)"""
+    fr = load_funding(path) if path else None
+    return None if fr is None else daily_funding(fr, sig.dates, sig.coins)
+
+
+def daily_funding(fr, dates, coins):
+    """FundingRates → [len(dates), len(coins)] 봉별 펀딩비 합 (기록 없음 = 0)"""
+    day_sec = np.asarray(dates, dtype="M8[D]").astype("M8[s]").astype(np.int64)
+    out = np.zeros((len(day_sec), len(coins)))
+    cols = [fr.col_of.get(c, -1) for c in coins]
+    have = [j for j, c in enumerate(cols) if c >= 0]
+    if not have or not len(fr) or not len(day_sec):
+        return out
+    k = day_sec.searchsorted(fr.ts, side="left") - 1          # d_k < t
+    ok = (k >= 0) & (fr.ts <= day_sec[np.maximum(k, 0)] + DAY_SEC)
+    rate = np.asarray(fr.rate)[np.ix_(ok, [cols[j] for j in have])]
+    sub = np.zeros((len(day_sec), len(have)))
+    np.add.at(sub, k[ok], np.nan_to_num(rate))
+    out[:, have] = sub
+    return out
@@ -0,0 +1,230 @@
+"""
+종목 레지스트리 - 상장 / 상장폐지일 + 최소수량 / 틱사이즈 이력 (시점 기준 조회)
+=============================================================================
+거래소 목록은 "지금 Trading인 종목"만 주고 상장일 필터도 오늘 기준이라
+과거 유니버스에 생존 편향이 생기고 연구 중에도 API를 불러야 한다.
+레지스트리는 get_instruments_info 스냅샷을 날짜와 함께 SQLite 한 파일에 쌓는다.
+
+  instruments  종목당 1행: 상장일(launchTime), 상장폐지일(첫 거래 불가일, NULL = 상장 중),
+               처음 / 마지막으로 본 날, 출처 (api / bars)
+  specs        [valid_from, valid_to) 버전: 상태 / 최소수량 / 수량 단위 / 틱사이즈 / 최대수량
+               값이 바뀐 스냅샷에서만 새 버전 (valid_to NULL = 현재)
+
+조회는 오프라인: 열 때 전부 메모리 배열로 올려 tradable(day)가 비교 몇 번 (질의당 O(종목)).
+  reg = InstrumentRegistry("instruments.db")
+  reg.record(items, "2025-06-01")            # get_instruments_info list (스냅샷)
+  reg.tradable("2024-01-01", min_days=150)   # 그날 거래 가능 + 상장 150일 이상
+  reg.spec("SOLUSDT", "2024-01-01")          # 그날의 최소수량 / 틱사이즈
+  annual_universe(..., symbols=reg.tradable) # 연도별 시점 기준 후보 (bt_engine.universe)
+"""
+import os
+import sqlite3
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS instruments (
+    symbol      TEXT PRIMARY KEY,
+    launch_day  TEXT,
+    delist_day  TEXT,
+    first_seen  TEXT,
+    last_seen   TEXT,
+    source      TEXT
+);
+CREATE TABLE IF NOT EXISTS specs (
+    symbol      TEXT NOT NULL,
+    valid_from  TEXT NOT NULL,
+    valid_to    TEXT,
+    status      TEXT,
+    min_qty     REAL,
+    qty_step    REAL,
+    tick_size   REAL,
+    max_qty     REAL,
+    PRIMARY KEY (symbol, valid_from)
+);
+CREATE INDEX IF NOT EXISTS specs_open ON specs (symbol, valid_to);
+"""
+SPEC_FIELDS = ("status", "min_qty", "qty_step", "tick_size", "max_qty")
+GONE = ("Closed", "Delivering", "Settling")       # 상장폐지(진행) 상태
+
+
+def _day(ms):
+    """epoch ms 문자열 / 정수 → "YYYY-MM-DD" (0 / 빈 값이면 None)"""
+    ms = int(ms or 0)
+    return str(np.datetime64(ms // 86400000, "D")) if ms > 0 else None
+
+
+def _spec(item):
+    lot = item.get("lotSizeFilter", {})
+    num = lambda v: float(v) if v not in (None, "") else None
+    return (item.get("status"), num(lot.get("minOrderQty")), num(lot.get("qtyStep")),
+            num(item.get("priceFilter", {}).get("tickSize")), num(lot.get("maxOrderQty")))
+
+
+class InstrumentRegistry:
+    """SQLite 레지스트리 + 시점 조회용 메모리 인덱스"""
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self._load()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    # ─── 메모리 인덱스 ──
+    def _load(self):
+        rows = self.conn.execute(
+            "SELECT symbol, launch_day, delist_day FROM instruments ORDER BY symbol").fetchall()
+        self.symbols = [r[0] for r in rows]
+        self.col_of = {s: j for j, s in enumerate(self.symbols)}
+        self.launch = np.array([r[1] or "NaT" for r in rows], dtype="M8[D]")
+        self.delist = np.array([r[2] or "NaT" for r in rows], dtype="M8[D]")
+        self._specs = {}
+        for row in self.conn.execute(
+                f"SELECT symbol, valid_from, valid_to, {', '.join(SPEC_FIELDS)} FROM specs "
+                "ORDER BY symbol, valid_from"):
+            self._specs.setdefault(row[0], []).append(row[1:])
+        # 상태 이력에서 거래 불가 구간 (Trading 아닌 버전) → tradable()에서 제외
+        self._halted = {s: [(np.datetime64(v[0]), np.datetime64(v[1]) if v[1] else None)
+                            for v in vs if v[2] != "Trading"]
+                        for s, vs in self._specs.items()}
+        self._halted = {s: v for s, v in self._halted.items() if v}
+
+    # ─── 조회 ──
+    def tradable_mask(self, day, min_days=0):
+        """종목 배열(self.symbols) 순서 bool — 상장일 + min_days ≤ day < 상장폐지일"""
+        d = np.datetime64(day, "D")
+        ok = ~np.isnat(self.launch) & (self.launch + np.timedelta64(min_days, "D") <= d)
+        ok &= np.isnat(self.delist) | (d < self.delist)
+        for s, spans in self._halted.items():
+            j = self.col_of.get(s)
+            if j is not None and ok[j] and any(a <= d and (b is None or d < b) for a, b in spans):
+                ok[j] = False
+        return ok
+
+    def tradable(self, day, min_days=0, suffix="USDT", exclude=()):
+        """day에 거래 가능한 종목 (상장 min_days일 이상, suffix로 끝나는 것만)"""
+        ok = self.tradable_mask(day, min_days)
+        return [s for s, k in zip(self.symbols, ok)
+                if k and s.endswith(suffix) and s not in exclude]
+
+    def listed_between(self, start, end, suffix="USDT", exclude=()):
+        """[start, end] 중 하루라도 상장돼 있던 종목 (데이터 다운로드 대상)"""
+        a, b = np.datetime64(start, "D"), np.datetime64(end, "D")
+        ok = ~np.isnat(self.launch) & (self.launch <= b) & (np.isnat(self.delist) | (self.delist > a))
+        return [s for s, k in zip(self.symbols, ok)
+                if k and s.endswith(suffix) and s not in exclude]
+
+    def spec(self, symbol, day):
+        """day 시점 {status, min_qty, qty_step, tick_size, max_qty} / None (기록 없음)"""
+        d = str(np.datetime64(day, "D"))
+        for v in reversed(self._specs.get(symbol, [])):
+            if v[0] <= d and (v[1] is None or d < v[1]):
+                return dict(zip(SPEC_FIELDS, v[2:]))
+        return None
+
+    def info(self, symbol):
+        row = self.conn.execute("SELECT * FROM instruments WHERE symbol=?", (symbol,)).fetchone()
+        if row is None:
+            return None
+        cols = [c[0] for c in self.conn.execute("SELECT * FROM instruments LIMIT 0").description]
+        return dict(zip(cols, row))
+
+    # ─── 기록 ──
+    def record(self, items, day, complete=True):
+        """
+        get_instruments_info list 스냅샷 (day 기준) 반영 → 바뀐 종목 수
+        complete: 목록이 거래 중인 종목 전체면 True → 레지스트리에 거래 중인데 목록에 없는 종목은
+                  day부터 상장폐지로 기록 (목록에 Closed 등으로 있으면 deliveryTime 날짜)
+        """
+        day = str(np.datetime64(day, "D"))
+        seen = set()
+        changed = 0
+        with self.conn:
+            for it in items:
+                sym = it["symbol"]
+                seen.add(sym)
+                spec = _spec(it)
+                delist = _day(it.get("deliveryTime")) if spec[0] in GONE else None
+                if spec[0] in GONE and delist is None:
+                    delist = day
+                self.conn.execute(
+                    """INSERT INTO instruments (symbol, launch_day, delist_day, first_seen, last_seen, source)
+                       VALUES (?, ?, ?, ?, ?, 'api')
+                       ON CONFLICT(symbol) DO UPDATE SET
+                       launch_day=COALESCE(excluded.launch_day, launch_day),
+                       delist_day=excluded.delist_day,
+                       first_seen=MIN(first_seen, excluded.first_seen),
+                       last_seen=MAX(last_seen, excluded.last_seen), source='api'""",
+                    (sym, _day(it.get("launchTime")), delist, day, day))
+                changed += self._set_spec(sym, day, spec)
+            if complete:
+                # 상장 중 + 현재 사양이 Trading(또는 기록 없음)인데 목록에 없는 종목
+                gone = self.conn.execute(
+                    """SELECT i.symbol FROM instruments i
+                       LEFT JOIN specs s ON s.symbol = i.symbol AND s.valid_to IS NULL
+                       WHERE i.delist_day IS NULL AND (s.status IS NULL OR s.status = 'Trading')"""
+                ).fetchall()
+                for (sym,) in gone:
+                    if sym in seen:
+                        continue
+                    self.conn.execute("UPDATE instruments SET delist_day=? WHERE symbol=?", (day, sym))
+                    self.conn.execute("UPDATE specs SET valid_to=? WHERE symbol=? AND valid_to IS NULL",
+                                      (day, sym))
+                    changed += 1
+        self._load()
+        return changed
+
+    def _set_spec(self, sym, day, spec):
+        """열린 버전과 다르면 day에 닫고 새 버전 → 1 / 같으면 0"""
+        cur = self.conn.execute(
+            f"SELECT valid_from, {', '.join(SPEC_FIELDS)} FROM specs "
+            "WHERE symbol=? AND valid_to IS NULL", (sym,)).fetchone()
+        if cur is not None and tuple(cur[1:]) == spec:
+            return 0
+        if cur is not None and cur[0] > day:
+            return 0                                        # 더 최근 스냅샷이 이미 있음
+        if cur is not None:
+            if cur[0] == day:
+                self.conn.execute("DELETE FROM specs WHERE symbol=? AND valid_from=?", (sym, day))
+            else:
+                self.conn.execute("UPDATE specs SET valid_to=? WHERE symbol=? AND valid_to IS NULL",
+                                  (day, sym))
+        self.conn.execute(
+            f"INSERT INTO specs (symbol, valid_from, valid_to, {', '.join(SPEC_FIELDS)}) "
+            "VALUES (?, ?, NULL, ?, ?, ?, ?, ?)", (sym, day, *spec))
+        return 1
+
+    def seed_from_bars(self, md, end_gap=7):
+        """
+        레지스트리에 없는 종목을 일봉으로 보충 (과거 캐시에만 있는 상장폐지 종목)
+        상장일 = 첫 봉, 마지막 봉이 데이터 끝보다 end_gap일 넘게 이르면 그 다음날을 상장폐지일로
+        → 보충한 종목 수
+        """
+        last_day = md.dates[-1]
+        n = 0
+        with self.conn:
+            for sym in md.symbols:
+                if sym in self.col_of:
+                    continue
+                s = md.close[sym].dropna()
+                if s.empty:
+                    continue
+                first, last = s.index[0], s.index[-1]
+                delist = str((last + np.timedelta64(1, "D")).date()) \
+                    if (last_day - last).days > end_gap else None
+                self.conn.execute(
+                    "INSERT INTO instruments (symbol, launch_day, delist_day, first_seen, last_seen, source) "
+                    "VALUES (?, ?, ?, ?, ?, 'bars')",
+                    (sym, str(first.date()), delist, str(first.date()), str(last.date())))
+                n += 1
+        if n:
+            self._load()
+        return n
@@ -0,0 +1,132 @@
+"""
+분봉 저장소 - 장중 안전장치(max_loss / max_profit)를 시간 순서로 판정하기 위한 1m/5m 봉
+=====================================================================================
+레이아웃 (종목 × 월 청크):
+  {root}/{종목}/{YYYY-MM}/{열}.npy   원본 열 - 진행 중인 달 (증분 동기화가 이어 붙임), mmap
+  {root}/{종목}/{YYYY-MM}.npz        압축 청크 - 끝난 달 (pack_month), 읽을 때 달 단위로 풀어 캐시
+  ts     정수 epoch 초 (봉 시작, 오름차순)   압축: 차분 → 대부분 60/300이라 거의 0바이트
+  open / high / low / close / volume   float32   압축: 바이트 셔플(자리별로 모음) 후 deflate
+
+열린 달은 최근 max_open개만 유지하고, 하루 구간은 ts의 searchsorted로 잘라 읽는다
+→ 포지션이 없는 종목 / 날짜는 디스크를 건드리지 않는다. 쓰기는 minute_ingest.py.
+"""
+import os
+import shutil
+from collections import OrderedDict
+
+import numpy as np
+
+COLUMNS = ("ts", "open", "high", "low", "close", "volume")
+DAY_SEC = 86400
+
+
+def month_key(ts_sec):
+    """epoch 초 → "YYYY-MM" (UTC)"""
+    return str(np.datetime64(int(ts_sec), "s").astype("M8[M]"))
+
+
+def _dtype(name):
+    return np.int64 if name == "ts" else np.float32
+
+
+def write_month(root, symbol, ym, cols, compress=False):
+    """{열: 배열} → 원본 열 {root}/{symbol}/{ym}/ 또는 compress=True면 압축 청크 {ym}.npz"""
+    cols = {k: np.asarray(v, dtype=_dtype(k)) for k, v in cols.items() if k in COLUMNS}
+    raw = os.path.join(root, symbol, ym)
+    if compress:
+        os.makedirs(os.path.join(root, symbol), exist_ok=True)
+        packed = {}
+        for k, a in cols.items():
+            if k == "ts":
+                a = np.diff(a, prepend=np.int64(0))
+            # 자리(바이트)별로 모으면 상위 바이트가 거의 같아서 deflate가 잘 듣는다
+            packed[k] = np.ascontiguousarray(a).view(np.uint8).reshape(-1, a.itemsize).T
+        tmp = os.path.join(root, symbol, f".{ym}.tmp.npz")
+        np.savez_compressed(tmp, **packed)
+        os.replace(tmp, os.path.join(root, symbol, f"{ym}.npz"))
+        shutil.rmtree(raw, ignore_errors=True)
+        return
+    os.makedirs(raw, exist_ok=True)
+    for k, a in cols.items():
+        tmp = os.path.join(raw, f".{k}.tmp.npy")
+        np.save(tmp, a)
+        os.replace(tmp, os.path.join(raw, f"{k}.npy"))  # 중단돼도 열 단위로는 온전
+
+
+def read_month(root, symbol, ym, mmap=True):
+    """한 달 → {열: 배열} / None. 원본 열은 mmap, 압축 청크는 풀어서 반환"""
+    raw = os.path.join(root, symbol, ym)
+    if os.path.exists(os.path.join(raw, "ts.npy")):
+        return {k: np.load(os.path.join(raw, f"{k}.npy"), mmap_mode="r" if mmap else None)
+                for k in COLUMNS if os.path.exists(os.path.join(raw, f"{k}.npy"))}
+    fp = os.path.join(root, symbol, f"{ym}.npz")
+    if not os.path.exists(fp):
+        return None
+    cols = {}
+    with np.load(fp) as z:
+        for k in z.files:
+            a = np.ascontiguousarray(z[k].T).view(_dtype(k)).ravel()
+            cols[k] = np.cumsum(a) if k == "ts" else a
+    return cols
+
+
+def month_names(root, symbol):
+    """저장된 달 "YYYY-MM" 목록 (원본 / 압축 구분 없이, 오름차순)"""
+    path = os.path.join(root, symbol)
+    if not os.path.isdir(path):
+        return []
+    return sorted({n[:-4] if n.endswith(".npz") else n for n in os.listdir(path)
+                   if not n.startswith(".")})
+
+
+class MinuteStore:
+    """분봉 저장소 읽기 (종목 × 월 단위, 최근 max_open개 캐시)"""
+
+    def __init__(self, root, max_open=64):
+        self.root = root
+        self.max_open = max_open
+        self._open = OrderedDict()   # (종목, 월) → {열: mmap} | None (없는 월)
+        self.days_read = 0           # day()로 읽은 종목-일 수 (분봉 판정 횟수 집계용)
+
+    def symbols(self):
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def months(self, symbol):
+        return month_names(self.root, symbol)
+
+    def _month(self, symbol, ym):
+        key = (symbol, ym)
+        if key in self._open:
+            self._open.move_to_end(key)
+            return self._open[key]
+        cols = read_month(self.root, symbol, ym)
+        self._open[key] = cols
+        if len(self._open) > self.max_open:
+            self._open.popitem(last=False)
+        return cols
+
+    def day(self, symbol, day_start, fields=("close",)):
+        """day_start(epoch 초, UTC 자정)부터 24시간 → (ts, *fields) / None (분봉 없음)"""
+        cols = self._month(symbol, month_key(day_start))
+        if cols is None:
+            return None
+        ts = cols["ts"]
+        a, b = np.searchsorted(ts, [day_start, day_start + DAY_SEC])
+        if a == b:
+            return None
+        self.days_read += 1
+        return (np.asarray(ts[a:b]),) + tuple(np.asarray(cols[f][a:b]) for f in fields)
+
+    def check_prices(self, symbol, day_start, every_min=5):
+        """
+        장중 체크 시점 가격 (라이브 모니터처럼 every_min분마다 현재가)
+        → 체크 시각에 끝나는 봉의 종가 배열 (시간순) / None (분봉 없음)
+        """
+        got = self.day(symbol, day_start)
+        if got is None:
+            return None
+        ts, close = got
+        bar_min = max(1, int(np.diff(ts).min() // 60)) if len(ts) > 1 else 1  # 1m / 5m 저장소 모두
+        if every_min > bar_min:
+            close = close[(ts // 60 + bar_min) % every_min == 0]
+        return close if len(close) else None
@@ -0,0 +1,139 @@
+"""
+결과 출력 - 스크립트별 기존 출력 형식 그대로
+============================================
+  print_results      backtest.py / backtest_dynamic.py 형식 (월별 수익률 막대)
+  print_performance  backtest_dynamic_v2 계열 형식 (연도별 + 전략별 사유)
+"""
+import sys
+
+import numpy as np
+
+import metrics
+
+
+def _utf8_stdout():
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+
+
+def print_results(trades, dates, equity, strats, initial_capital, leverage, cash_ratio,
+                  title="백테스트 결과 - 바이비트 채널 돌파 복합 전략 v3"):
+    _utf8_stdout()
+    print("\n" + "=" * 70)
+    print(f"  {title}")
+    print("=" * 70)
+
+    if len(equity) == 0:
+        print("데이터 없음")
+        return
+
+    eq_dates = np.asarray(dates, dtype="M8[D]")
+    eq = np.asarray(equity, dtype=float)
+    final_equity = eq[-1]
+    total_ret = (final_equity / initial_capital - 1) * 100
+
+    # CAGR / MDD (달력일 기준 연수, 시작자본 기준)
+    years = int((eq_dates[-1] - eq_dates[0]).astype(int)) / 365.0
+    st = metrics.equity_stats(eq, initial=initial_capital, years=years)
+    cagr = st["cagr"] if years > 0 and final_equity > 0 else 0
+    mdd = st["mdd"]
+
+    # 거래 통계
+    ts = metrics.trade_stats(trades, strat_keys=tuple(strats),
+                             win_if_zero=True, reason_prefix=True)
+    n_trades = ts["n"]
+    if n_trades > 0:
+        win_rate = ts["win_rate"]
+        avg_pnl = ts["avg_pnl"] * 100
+        avg_win = ts["avg_win"] * 100 if ts["wins"] > 0 else 0
+        avg_loss = ts["avg_loss"] * 100 if (n_trades - ts["wins"]) > 0 else 0
+        strat_stats = ts["by_strat"]
+        reason_stats = ts["by_reason"]
+    else:
+        win_rate = avg_pnl = avg_win = avg_loss = 0
+        strat_stats = {}
+        reason_stats = {}
+
+    print(f"\n  기간: {eq_dates[0]} ~ {eq_dates[-1]} ({len(eq)}일)")
+    print(f"  시작자본: ${initial_capital:,.0f}")
+    print(f"  최종자산: ${final_equity:,.0f}")
+    print(f"  총수익률: {total_ret:+.1f}%")
+    print(f"  CAGR:     {cagr:+.1f}%")
+    print(f"  MDD:      {mdd:.1f}%")
+    print(f"  레버리지:  {leverage}x | 현금비율: {cash_ratio*100:.0f}%")
+    print(f"\n  총 거래: {n_trades}건")
+    print(f"  승률:   {win_rate:.1f}%")
+    print(f"  평균수익: {avg_pnl:+.2f}%")
+    print(f"  평균이익: {avg_win:+.2f}% | 평균손실: {avg_loss:+.2f}%")
+
+    if strat_stats:
+        print(f"\n  ── 전략별 ──")
+        for sk, ss in strat_stats.items():
+            cfg = strats[sk]
+            print(f"  {sk}({cfg['name']}): {ss['count']}건 승률{ss['win_rate']:.0f}% 평균{ss['avg_pnl']*100:+.2f}%")
+
+    if reason_stats:
+        print(f"\n  ── 청산 사유별 ──")
+        for r, rs in sorted(reason_stats.items()):
+            avg = rs["pnl_sum"] / rs["count"] * 100
+            print(f"  {r}: {rs['count']}건 평균{avg:+.2f}%")
+
+    # 월별 수익률
+    months, monthly_ret = metrics.monthly_returns(eq, eq_dates)
+
+    print(f"\n  ── 월별 수익률 ──")
+    for month, ret in zip(months.astype(str), monthly_ret):
+        if not np.isnan(ret):
+            bar = "█" * max(0, int(ret / 2)) if ret >= 0 else "▓" * max(0, int(-ret / 2))
+            print(f"  {month}: {ret:+6.1f}% {bar}")
+
+    print("\n" + "=" * 70)
+
+
+def print_performance(equity_curve, trades, dates_used, strats, leverage, max_pos,
+                      cash_ratio, mdd_thresh, initial_capital, cost,
+                      title="채널 돌파 복합 전략 - 달러추적 (3배, 동적1/n)"):
+    _utf8_stdout()
+    eq = np.asarray(equity_curve, dtype=float)
+    cn = eq / eq[0]
+    st = metrics.equity_stats(cn, ddof=1)
+    final = cn[-1]
+    cagr, mdd, calmar, sharpe = st["cagr"], st["mdd"], st["calmar"], st["sharpe"]
+
+    ts = metrics.trade_stats(trades)
+    n_trades = ts["n"]
+    wins = ts["wins"]
+
+    print()
+    print("=" * 70)
+    print(f"  {title}")
+    print("=" * 70)
+    print(f"  레버리지:    {leverage}x")
+    print(f"  포지션:      동적 1/n (최대 {max_pos}슬롯)")
+    print(f"  현금:        {cash_ratio*100:.0f}% (MDD {mdd_thresh*100:.0f}%→전량투입)")
+    print(f"  시작자본:    ${initial_capital:,.0f}")
+    print(f"  최종자산:    ${eq[-1]:,.0f}")
+    print(f"  CAGR:        {cagr:+,.1f}%")
+    print(f"  MDD:         {mdd:.1f}%")
+    print(f"  Calmar:      {calmar:.2f}")
+    print(f"  Sharpe:      {sharpe:.2f}")
+    print(f"  배수:        {final:,.0f}x")
+    print(f"  수수료:      편도 {cost*100:.2f}%")
+
+    print(f"\n  연도별:")
+    print("  " + "-" * 50)
+    for year, y_ret, y_mdd in zip(*metrics.period_table(cn, dates_used, "Y")):
+        print(f"    {year}:  {y_ret:+9.1f}%   MDD {y_mdd:6.1f}%")
+
+    if n_trades > 0:
+        print(f"\n  거래: {n_trades}건  승률 {wins/n_trades*100:.0f}%")
+        print(f"\n  전략별:")
+        for sk, s in ts["by_strat"].items():
+            print(f"    {sk}({strats[sk]['name']}): {s['count']}건, "
+                  f"승률 {s['win_rate']:.0f}%, "
+                  f"이익 {s['avg_win']*100:+.1f}%, "
+                  f"손실 {s['avg_loss']*100:+.1f}%, "
+                  f"보유 {s['avg_held']:.1f}일")
+            print(f"      {s['reasons']}")
+
+    print("=" * 70)
@@ -0,0 +1,133 @@
+"""
+채널 지표 / 진입 신호 행렬
+==========================
+선형회귀 채널을 종목별 루프 대신 슬라이딩 윈도 [일수, 20] 한 번의 연산으로 계산한다.
+윈도마다 기존 루프와 같은 순서로 더하므로 결과는 비트 단위로 동일.
+
+Signals는 전략 파라미터와 무관한 행렬(채널, 거래량 배수, 점수, 돌파 여부)을
+한 번만 만들어 두고, 전략별 진입 행렬은 triggers()에서 임계값 비교만 한다
+→ 파라미터 스윕에서 run() 호출당 지표 재계산 없음.
+
+dtype=np.float32: 가격 / 지표 / 점수 행렬을 float32로 보관 (메모리 절반).
+회귀 합산과 돌파 판정은 종목별 float64로 한 뒤 저장할 때만 줄인다
+→ 돌파 여부는 float64 모드와 같고, 임계값 비교 / 점수 순위만 float32 반올림의 영향을 받는다
+(precision_check.py로 거래 일치 확인).
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+CHANNEL_PERIOD = 20
+CHANNEL_STD = 2.0
+SIGNALS = ("upper_break", "lower_break", "upper_touch")
+
+
+def calc_channel(prices, period=CHANNEL_PERIOD, std_mult=CHANNEL_STD):
+    """종가 1차원 → (upper, lower, r2). 윈도에 NaN이 있으면 NaN."""
+    prices = np.asarray(prices, dtype=float)
+    n = len(prices)
+    upper = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    r2 = np.full(n, np.nan)
+    if n < period:
+        return upper, lower, r2
+
+    x = np.arange(period)
+    x_mean = x.mean()
+    x_var = ((x - x_mean) ** 2).sum()
+
+    win = sliding_window_view(prices, period)
+    ok = ~np.isnan(win).any(axis=1)
+    y = win[ok]
+    y_mean = y.mean(axis=1)
+    dy = y - y_mean[:, None]
+    slope = ((x - x_mean) * dy).sum(axis=1) / x_var
+    intercept = y_mean - slope * x_mean
+    trend = slope[:, None] * x + intercept[:, None]
+    resid = y - trend
+    std_r = resid.std(axis=1)
+    ss_res = (resid ** 2).sum(axis=1)
+    ss_tot = (dy ** 2).sum(axis=1)
+
+    idx = np.flatnonzero(ok) + period - 1
+    upper[idx] = trend[:, -1] + std_mult * std_r
+    lower[idx] = trend[:, -1] - std_mult * std_r
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2[idx] = np.where(ss_tot > 0, 1 - ss_res / np.where(ss_tot > 0, ss_tot, 1), 0)
+    return upper, lower, r2
+
+
+class Signals:
+    """
+    coins 열에 대한 [일수, 종목] 지표/신호 행렬.
+      close, high, low    가격 (high/low는 장중 안전장치용, 없으면 None)
+      upper, lower, r2    채널
+      vr                  거래량 / 20일 평균
+      score               r2 × vr × max(mom5, 1%)  (진입 우선순위)
+      raw[signal]         채널 돌파/터치 여부 (지표 유효 조건 포함)
+      bull, state_ok      BTC SMA20 > SMA50, SMA50 산출 가능 여부
+    dtype: 행렬 보관 정밀도 (np.float64 기본 / np.float32)
+    """
+
+    def __init__(self, md, coins, btc_symbol="BTCUSDT",
+                 period=CHANNEL_PERIOD, std_mult=CHANNEL_STD, dtype=np.float64):
+        self.coins = list(coins)
+        self.col_of = {c: j for j, c in enumerate(self.coins)}
+        self.dates = md.dates
+        self.dtype = np.dtype(dtype)
+
+        close = md.close[self.coins]
+        volume = md.volume[self.coins]
+        self.close = close.to_numpy(dtype=self.dtype)
+        self.high = md.high[self.coins].to_numpy(dtype=self.dtype) if md.high is not None else None
+        self.low = md.low[self.coins].to_numpy(dtype=self.dtype) if md.low is not None else None
+
+        T, N = self.close.shape
+        self.upper = np.empty((T, N), dtype=self.dtype)
+        self.lower = np.empty((T, N), dtype=self.dtype)
+        self.r2 = np.empty((T, N), dtype=self.dtype)
+        self.vr = np.empty((T, N), dtype=self.dtype)
+        self.score = np.empty((T, N), dtype=self.dtype)
+        self.raw = {s: np.zeros((T, N), dtype=bool) for s in SIGNALS}
+
+        # 거래량 이동평균 / 모멘텀은 float64 임시 행렬로 (생성자 안에서만 쓰고 버린다)
+        vol64 = volume.astype(np.float64)
+        vol_ma = vol64.rolling(period).mean().to_numpy()
+        mom5 = close.astype(np.float64).pct_change(5).to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vr = vol64.to_numpy() / vol_ma
+        mom5 = np.where(np.isnan(mom5), 0.01, mom5)
+        vol_ok = ~np.isnan(vol_ma) & (np.nan_to_num(vol_ma) > 0)
+
+        # 채널 / 돌파 판정은 종목(열)별 float64 → 보관 dtype으로 저장
+        for j in range(N):
+            cur = self.close[:, j].astype(np.float64)
+            upper, lower, r2 = calc_channel(cur, period, std_mult)
+            self.upper[:, j], self.lower[:, j], self.r2[:, j] = upper, lower, r2
+            self.score[:, j] = r2 * vr[:, j] * np.maximum(mom5[:, j], 0.01)
+
+            prev = np.full(T, np.nan)
+            prev[1:] = cur[:-1]
+            valid = ~np.isnan(upper) & ~np.isnan(r2) & ~np.isnan(prev) & ~np.isnan(cur) & vol_ok[:, j]
+            self.raw["upper_break"][:, j] = valid & (prev <= upper) & (cur > upper)
+            self.raw["lower_break"][:, j] = valid & (prev >= lower) & (cur < lower)
+            self.raw["upper_touch"][:, j] = valid & (prev < upper) & (cur >= upper)
+        self.vr[:] = vr
+
+        # BTC 이동평균은 BTC 자체 봉 기준 (다른 종목에만 있는 날짜가 창을 끊지 않도록)
+        btc = md.close[btc_symbol].dropna().astype(np.float64)
+        sma20 = btc.rolling(20).mean().reindex(self.dates)
+        sma50 = btc.rolling(50).mean().reindex(self.dates)
+        self.bull = (sma20 > sma50).to_numpy()
+        self.state_ok = sma50.notna().to_numpy()
+
+    @property
+    def nbytes(self):
+        """보관 중인 행렬 바이트 수"""
+        arrays = [self.close, self.high, self.low, self.upper, self.lower, self.r2,
+                  self.vr, self.score, *self.raw.values()]
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def triggers(self, cfg):
+        """전략 설정 → [일수, 종목] 진입 신호 (R² / 거래량 임계값 적용)"""
+        with np.errstate(invalid="ignore"):
+            return self.raw[cfg["signal"]] & (self.r2 > cfg["r2_thresh"]) & (self.vr > cfg["vol_mult"])
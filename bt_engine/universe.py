@@ -0,0 +1,161 @@
+"""
+유니버스 - 구간 평균 거래대금 상위 N
+====================================
+TurnoverIndex: 종목별 일간 거래대금(close × volume) 누적합 / 유효 일수 누적합을 한 번 만들어 두고
+  "[start, end) 구간 평균 거래대금, 유효 일수 ≥ K인 종목 상위 N"을 행 두 개 차이로 답한다 (질의당 O(종목)).
+  → 연간 / 분기 / 월간 유니버스를 다시 계산 없이 만들고, 라이브 update_universe도 같은 코드를 쓴다.
+
+annual_universe: 매년 전년(1/1~12/31) 평균 거래대금 상위 N (기존 방식)
+  min_days:      전년 유효 일수 하한 (기본 100)
+  fallback_days: 전년 일수가 부족한 종목은 당해 1월 1일 이전 전체 데이터로 대체,
+                 그 일수가 fallback_days 이상이면 포함 (backtest.py 방식, None이면 제외)
+  symbols:       후보 종목 제한 (거래소 상장 목록 등). 함수면 기간 시작일마다 symbols(날짜) →
+                 시점 기준 후보 (InstrumentRegistry.tradable → 상장폐지 종목 포함, 생존 편향 없음)
+rolling_universe: freq("year" / "quarter" / "month") 시작일마다 직전 window_days일 평균 상위 N
+  → {기간 시작 Timestamp: [종목...]} (bt_engine.run은 연도 키 / 날짜 키 모두 받는다)
+"""
+import numpy as np
+import pandas as pd
+
+FREQS = {"year": "YS", "quarter": "QS", "month": "MS"}
+
+
+class TurnoverIndex:
+    """[일수, 종목] 거래대금 (NaN = 데이터 없음) → 누적합 / 유효 일수 누적합"""
+
+    def __init__(self, turnover, dates, symbols):
+        tv = np.asarray(turnover, dtype=np.float64)
+        valid = np.isfinite(tv)
+        self.dates = np.asarray(dates, dtype="M8[D]")
+        self.symbols = list(symbols)
+        self.col_of = {s: j for j, s in enumerate(self.symbols)}
+        self.csum = np.zeros((len(tv) + 1, tv.shape[1]))
+        np.cumsum(np.where(valid, tv, 0.0), axis=0, out=self.csum[1:])
+        self.ccount = np.zeros((len(tv) + 1, tv.shape[1]), dtype=np.int32)
+        np.cumsum(valid, axis=0, out=self.ccount[1:])
+
+    @classmethod
+    def from_frames(cls, close, volume):
+        # float32 데이터도 곱은 float64로 (순위가 보관 정밀도에 따라 바뀌지 않도록)
+        tv = close.to_numpy(dtype=np.float64) * volume.to_numpy(dtype=np.float64)
+        return cls(tv, close.index.values, close.columns)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def row(self, day):
+        """day 이전 행 수 (= 구간 [row(a), row(b))로 [a, b) 날짜 선택)"""
+        return int(self.dates.searchsorted(np.datetime64(day, "D")))
+
+    def window(self, start, end):
+        """[start, end) 날짜 구간 → (평균 거래대금, 유효 일수, 구간 행 수). start None이면 처음부터"""
+        a = 0 if start is None else self.row(start)
+        b = self.row(end)
+        cnt = self.ccount[b] - self.ccount[a]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg = (self.csum[b] - self.csum[a]) / cnt
+        return avg, cnt, b - a
+
+    def rank(self, avg, ok, top_n=60, exclude=(), symbols=None):
+        """평균 거래대금 avg 중 ok인 종목 상위 top_n (내림차순)"""
+        ok = ok & np.isfinite(avg)
+        if exclude:
+            ok[[self.col_of[s] for s in exclude if s in self.col_of]] = False
+        if symbols is not None:
+            keep = np.zeros(len(ok), dtype=bool)
+            keep[[self.col_of[s] for s in symbols if s in self.col_of]] = True
+            ok &= keep
+        idx = np.flatnonzero(ok)
+        if len(idx) > top_n:
+            idx = idx[np.argpartition(-avg[idx], top_n - 1)[:top_n]]
+        idx = idx[np.argsort(-avg[idx], kind="stable")]
+        return [self.symbols[j] for j in idx]
+
+    def top(self, end, days=365, start=None, top_n=60, min_days=100, exclude=(), symbols=None):
+        """end 직전 days일 (또는 [start, end)) 평균 거래대금, 유효 일수 ≥ min_days 상위 top_n"""
+        if start is None:
+            start = np.datetime64(end, "D") - days
+        avg, cnt, _ = self.window(start, end)
+        return self.rank(avg, cnt >= min_days, top_n, exclude, symbols)
+
+
+def _candidates(symbols, day):
+    """symbols: None / 리스트 / 날짜 → 리스트 함수"""
+    return symbols(np.datetime64(day, "D")) if callable(symbols) else symbols
+
+
+def annual_universe(close, volume, start_year, end_year, top_n=60, exclude=(),
+                    min_days=100, fallback_days=None, symbols=None, index=None):
+    """→ ({year: [종목...]}, {year: {종목: 순위}}). index: 이미 만든 TurnoverIndex 재사용"""
+    ti = index if index is not None else TurnoverIndex.from_frames(close, volume)
+
+    universe = {}
+    universe_rank = {}
+    for y in range(start_year, end_year + 1):
+        jan1 = np.datetime64(f"{y}-01-01")
+        avg, cnt, n_rows = ti.window(np.datetime64(f"{y - 1}-01-01"), jan1)
+        b_avg, b_cnt, b_rows = ti.window(None, jan1)
+        if n_rows == 0 and fallback_days is None:
+            avg, cnt, n_rows = b_avg, b_cnt, b_rows
+        if n_rows == 0 and (fallback_days is None or b_rows == 0):
+            universe[y] = []
+            universe_rank[y] = {}
+            continue
+
+        ok = cnt >= min_days
+        if fallback_days is not None:
+            fb = ~ok & (b_cnt >= fallback_days)
+            avg = np.where(fb, b_avg, avg)
+            ok |= fb
+
+        coins = ti.rank(avg, ok, top_n, exclude, _candidates(symbols, jan1))
+        universe[y] = coins
+        universe_rank[y] = {c: i for i, c in enumerate(coins)}
+    return universe, universe_rank
+
+
+def rolling_universe(close, volume, start, end=None, freq="quarter", window_days=365,
+                     top_n=60, exclude=(), min_days=100, symbols=None, index=None):
+    """freq 기간 시작일마다 직전 window_days일 평균 거래대금 상위 N
+    → ({기간 시작 Timestamp: [종목...]}, {기간 시작: {종목: 순위}})"""
+    if freq not in FREQS:
+        raise ValueError(f"freq: {freq} (허용: {tuple(FREQS)})")
+    ti = index if index is not None else TurnoverIndex.from_frames(close, volume)
+    end = close.index[-1] if end is None else pd.Timestamp(end)
+    starts = pd.date_range(pd.Timestamp(start), end, freq=FREQS[freq])
+    if len(starts) == 0 or starts[0] > pd.Timestamp(start):
+        starts = pd.DatetimeIndex([pd.Timestamp(start)]).append(starts)
+
+    universe = {}
+    universe_rank = {}
+    for p in starts:
+        coins = ti.top(p.to_datetime64(), window_days, top_n=top_n, min_days=min_days,
+                       exclude=exclude, symbols=_candidates(symbols, p.to_datetime64()))
+        universe[p] = coins
+        universe_rank[p] = {c: i for i, c in enumerate(coins)}
+    return universe, universe_rank
+
+
+def universe_schedule(universe, dates):
+    """유니버스 dict → (시작 행 배열, 멤버 리스트) — 연도(int) 키 / 날짜 키 모두.
+    연도 키는 없는 해가 빈 유니버스, 날짜 키는 다음 키 전까지 유지"""
+    days = np.asarray(dates, dtype="M8[D]")
+    if not len(days):
+        return np.empty(0, dtype=np.int64), []
+    if all(isinstance(k, (int, np.integer)) for k in universe):
+        y0, y1 = int(str(days[0])[:4]), int(str(days[-1])[:4])
+        keys = range(y0, y1 + 1)
+        starts = [int(days.searchsorted(np.datetime64(f"{y}-01-01"))) for y in keys]
+        return np.array(starts), [universe.get(y, []) for y in keys]
+    keys = sorted(universe, key=pd.Timestamp)
+    starts = [0] + [int(days.searchsorted(pd.Timestamp(k).to_datetime64().astype("M8[D]")))
+                    for k in keys]
+    return np.array(starts), [[]] + [universe[k] for k in keys]
+
+
+def universe_coins(universe, columns):
+    """전 기간 유니버스 합집합 ∩ 데이터 보유 종목 (정렬)"""
+    coins = set()
+    for c in universe.values():
+        coins.update(c)
+    return sorted(coins & set(columns))
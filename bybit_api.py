@@ -2,22 +2,63 @@
 바이비트 V5 선물 API 클라이언트
 - USDT 퍼페추얼 (linear)
 - pybit 공식 SDK 사용
+- hook(endpoint, 소요초, 오류여부): 세션 메서드 호출마다 콜백 (타이밍 집계용)
+- endpoint: 기본 URL 교체 (로컬 시뮬레이터 python -m sim 등)
 """
+import time
 import logging
 from pybit.unified_trading import HTTP
 
 log = logging.getLogger(__name__)
 
 
+class HookedSession:
+    """pybit HTTP 래퍼 - 메서드 호출마다 hook(메서드명, 소요초, 예외 여부)"""
+
+    def __init__(self, session, hook):
+        self._session = session
+        self._hook = hook
+
+    def __getattr__(self, name):
+        attr = getattr(self._session, name)
+        if not callable(attr):
+            return attr
+        hook = self._hook
+
+        def call(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                r = attr(*args, **kwargs)
+            except Exception:
+                hook(name, time.perf_counter() - t0, True)
+                raise
+            hook(name, time.perf_counter() - t0, False)
+            return r
+        return call
+
+
 class BybitAPI:
-    def __init__(self, api_key: str, api_secret: str, testnet: bool = False):
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = False, hook=None,
+                 endpoint: str = None):
         self.session = HTTP(
             api_key=api_key,
             api_secret=api_secret,
             testnet=testnet,
         )
+        if endpoint:
+            self.session.endpoint = endpoint.rstrip("/")
+        if hook is not None:
+            self.session = HookedSession(self.session, hook)
         self.category = "linear"
 
+    @classmethod
+    def from_session(cls, session, hook=None):
+        """pybit HTTP와 같은 메서드를 가진 세션으로 생성 (sim.LocalSession 등)"""
+        api = cls.__new__(cls)
+        api.session = HookedSession(session, hook) if hook is not None else session
+        api.category = "linear"
+        return api
+
     # ── 시세 ──────────────────────────────────────────────────
 
     def get_klines(self, symbol: str, interval: str = "D", limit: int = 50) -> list:
@@ -71,23 +112,31 @@ class BybitAPI:
         return 0.0
 
     def get_positions(self) -> list:
-        """보유 포지션 조회"""
-        r = self.session.get_positions(
-            category=self.category,
-            settleCoin="USDT",
-        )
+        """보유 포지션 전체 조회 (USDT 정산 전 종목, 페이지당 200건 → 보통 1회 호출)"""
         positions = []
-        for p in r["result"]["list"]:
-            size = float(p["size"])
-            if size > 0:
-                positions.append({
-                    "symbol": p["symbol"],
-                    "side": p["side"],  # Buy or Sell
-                    "size": size,
-                    "entry_price": float(p["avgPrice"]),
-                    "unrealised_pnl": float(p["unrealisedPnl"]),
-                    "leverage": p["leverage"],
-                })
+        cursor = ""
+        while True:
+            r = self.session.get_positions(
+                category=self.category,
+                settleCoin="USDT",
+                limit=200,
+                cursor=cursor,
+            )
+            rows = r["result"]["list"]
+            for p in rows:
+                size = float(p["size"])
+                if size > 0:
+                    positions.append({
+                        "symbol": p["symbol"],
+                        "side": p["side"],  # Buy or Sell
+                        "size": size,
+                        "entry_price": float(p["avgPrice"]),
+                        "unrealised_pnl": float(p["unrealisedPnl"]),
+                        "leverage": p["leverage"],
+                    })
+            cursor = r["result"].get("nextPageCursor") or ""
+            if not cursor or len(rows) < 200:
+                break
         return positions
 
     # ── 주문 ──────────────────────────────────────────────────
@@ -18,8 +18,13 @@ v1 대비 변경:
   시장필터: BTC SMA20 > SMA50
   유니버스: 거래대금 상위 60 (BTC/ETH 제외, 상장 150일 미만 제외)
 
-일정 (24/7):
-  00:05 UTC → 일간 체크 (시그널 생성 + 진입/청산 + 리사이즈)
+일정 (24/7, scheduler.Scheduler - UTC 정시 기상):
+  23:55 UTC    → 워밍업 (종목정보 / 유니버스 / 마지막 봉 제외 일봉 + 채널 부분합 선행)
+  00:00:15 UTC → 일간 체크 (시그널 생성 + 진입/청산 + 리사이즈), 재시작 시 놓친 회차 즉시 실행
+                 워밍업분이 있으면 종목당 마감 봉 1개만 조회해 채널 완성
+                 주문 전에 거래소 포지션을 일괄 조회해 state.json과 대조 / 복구
+  00:10 UTC    → 상태 출력
+  BYBIT_MONITOR_MIN > 0 → 장중 SL/TP 모니터 (기본 끔: v2는 종가 기준 청산만, 백테스트 동일)
 """
 
 import os
@@ -28,31 +33,39 @@ import json
 import time
 import math
 import logging
-import schedule
-import requests
-import numpy as np
-import pandas as pd
+import threading
 from datetime import datetime, timezone, timedelta
 import db_logger
+import timing
+import bot_metrics
+import scheduler
 
-from bybit_api import BybitAPI
+# numpy / requests / pybit(BybitAPI)는 쓰는 함수 안에서 import
+# → --status / --state / --report / --health 는 표준 라이브러리만으로 바로 뜬다
 
 # ── 설정 ─────────────────────────────────────────────────────────────────────
 
 API_KEY    = os.environ.get("BYBIT_API_KEY", "")
 API_SECRET = os.environ.get("BYBIT_API_SECRET", "")
 TESTNET    = os.environ.get("BYBIT_TESTNET", "0") == "1"
+ENDPOINT   = os.environ.get("BYBIT_ENDPOINT", "")  # 로컬 시뮬레이터 등 (비우면 pybit 기본)
 
 LEVERAGE   = 2
 MAX_POS    = 4
 CASH_RATIO = 0.40
 MDD_DEPLOY_THRESH = -0.35  # MDD -35% 도달 시 현금 전량투입
-TOP_N      = 60
+TOP_N      = int(os.environ.get("BYBIT_TOP_N", "60"))  # 0이면 후보 전체 (USDT 퍼페추얼 ~400)
 MIN_LIST_DAYS = 150  # 상장 150일 미만 종목 제외
+UNIVERSE_MIN_DAYS = 100  # 평균 거래대금 구간 유효 일수 하한
+UNIVERSE_FREQ = os.environ.get("BYBIT_UNIVERSE_FREQ", "year")  # year | quarter | month
 EXCLUDE    = {"BTCUSDT", "ETHUSDT"}
 
 RESIZE_MIN_DELTA_USDT = 5.0   # $5 미만 리사이즈 차이는 무시
 RESIZE_WAIT_SEC       = 60    # 리사이즈 간 대기 시간 (초)
+RECONCILE_RECHECK_SEC = 3     # 포지션 대조: 거래소에 없는 포지션 재조회 전 대기 (초)
+
+SCAN_WORKERS = int(os.environ.get("BYBIT_SCAN_WORKERS", "8"))  # 종목별 시세 조회 동시 스레드
+API_RATE     = float(os.environ.get("BYBIT_API_RATE", "100"))  # 시세 조회 초당 상한 (IP 한도 600/5초)
 
 STRATS = {
     "A": {
@@ -83,12 +96,20 @@ STRATS = {
 
 CHANNEL_PERIOD = 20
 CHANNEL_STD    = 2.0
+DAY_MS         = 86400 * 1000
 
 BASE_DIR  = os.environ.get("BYBIT_BASE_DIR", "/root/bybit_strategy")
 STATE_F   = f"{BASE_DIR}/state.json"
 LOG_F     = f"{BASE_DIR}/trading.log"
 
 DRY_RUN   = os.environ.get("BYBIT_DRY_RUN", "0") == "1"
+METRICS_PORT = int(os.environ.get("BYBIT_METRICS_PORT", "9108"))  # 0이면 /metrics 끔
+DAILY_AT  = os.environ.get("BYBIT_DAILY_AT", "00:00:15")    # 일봉 마감 직후 (UTC)
+WARMUP_AT = os.environ.get("BYBIT_WARMUP_AT", "23:55")      # 마감 전 선행 준비 (UTC)
+MONITOR_MIN = int(os.environ.get("BYBIT_MONITOR_MIN", "0"))  # 0이면 장중 모니터 끔
+SCHED_F   = f"{BASE_DIR}/schedule.json"
+TURNOVER_F = f"{BASE_DIR}/turnover.npz"   # 유니버스용 일간 거래대금 (종목 × 일, 증분 저장)
+INSTRUMENTS_DB = f"{BASE_DIR}/instruments.db"  # 종목 레지스트리 (상장 / 상장폐지 / 사양 이력, 연구용)
 
 # ── 텔레그램 ─────────────────────────────────────────────────────────────────
 
@@ -103,6 +124,7 @@ def tg_send(msg: str):
         if not chat_id:
             continue
         try:
+            import requests
             requests.post(
                 f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage",
                 json={"chat_id": chat_id, "text": msg, "parse_mode": "HTML"},
@@ -113,23 +135,56 @@ def tg_send(msg: str):
 
 # ── 로깅 ─────────────────────────────────────────────────────────────────────
 
-os.makedirs(BASE_DIR, exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_F, encoding="utf-8"),
-        logging.StreamHandler(sys.stdout),
-    ],
-)
 log = logging.getLogger(__name__)
 
+
+def setup_logging(to_file: bool = True):
+    """진입점에서 호출 (import만으로는 trading.log를 열지 않음). to_file=False면 콘솔만"""
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if to_file:
+        os.makedirs(BASE_DIR, exist_ok=True)
+        handlers.insert(0, logging.FileHandler(LOG_F, encoding="utf-8"))
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=handlers,
+    )
+
 # ── API 클라이언트 ────────────────────────────────────────────────────────────
 
-api = BybitAPI(API_KEY, API_SECRET, testnet=TESTNET)
+def _job_hook(name: str, delay: float, sec: float, result: str):
+    """Scheduler hook → 로그 + 메트릭"""
+    bot_metrics.job_run(name, delay, sec, result)
+    if result != "skipped":
+        log.info(f"작업 {name}: {result} (시작 지연 {delay*1000:.0f}ms, 소요 {sec:.1f}초)")
+
+
+def _api_hook(endpoint: str, sec: float, error: bool):
+    """API 호출마다: 단계 타이밍 + Prometheus 메트릭"""
+    timing.api_call(endpoint, sec, error)
+    bot_metrics.api_call(endpoint, sec, error)
+
+
+class _LazyAPI:
+    """첫 사용 때 BybitAPI 생성 — pybit import와 인증 세션은 API를 쓰는 명령에서만"""
+    _api = None
+
+    def __getattr__(self, name):
+        if self._api is None:
+            from bybit_api import BybitAPI
+            self._api = BybitAPI(API_KEY, API_SECRET, testnet=TESTNET, hook=_api_hook,
+                                 endpoint=ENDPOINT or None)
+        return getattr(self._api, name)
+
+
+api = _LazyAPI()
 
 # ── 상태 관리 ─────────────────────────────────────────────────────────────────
 
+# daily_check / monitor 동시 실행 방지 (둘 다 state.json을 읽고 고쳐 씀)
+STATE_LOCK = threading.Lock()
+
+
 def load_state() -> dict:
     if os.path.exists(STATE_F):
         with open(STATE_F, encoding="utf-8") as f:
@@ -142,8 +197,11 @@ def load_state() -> dict:
 
 
 def save_state(s: dict):
+    t0 = time.perf_counter()
     with open(STATE_F, "w", encoding="utf-8") as f:
         json.dump(s, f, ensure_ascii=False, indent=2)
+    bot_metrics.STATE_SAVE.observe(time.perf_counter() - t0)
+    bot_metrics.POSITIONS.set(len(s.get("positions", {})))
 
 
 # ── 유틸 ─────────────────────────────────────────────────────────────────────
@@ -161,6 +219,16 @@ def days_since(date_str: str) -> int:
     return (now_utc() - entry).days
 
 
+def next_daily_run() -> datetime:
+    """다음 daily_check 예정 시각 (UTC) — 워밍업이 어느 날 실행분을 준비하는지"""
+    now = now_utc()
+    run = now.replace(hour=0, minute=0, second=0, microsecond=0) \
+        + timedelta(seconds=scheduler.parse_at(DAILY_AT))
+    if run <= now:
+        run += timedelta(days=1)
+    return run
+
+
 def round_qty(qty: float, step: float) -> str:
     """수량을 step 단위로 내림"""
     if step <= 0:
@@ -197,6 +265,7 @@ def get_effective_cash_ratio(state: dict, equity: float) -> float:
 
 def calc_channel(closes: list[float]) -> dict | None:
     """최근 CHANNEL_PERIOD개 종가로 선형회귀 채널 계산"""
+    import numpy as np
     n = len(closes)
     if n < CHANNEL_PERIOD:
         return None
@@ -227,13 +296,100 @@ def calc_channel(closes: list[float]) -> dict | None:
     }
 
 
+# 선형회귀 부분합: 워밍업 때 앞 CHANNEL_PERIOD-1개 종가로 합을 만들어 두고
+# 마감 직후 마지막 종가 하나만 더해 calc_channel과 같은 채널을 얻는다.
+# 합은 알려진 종가 평균(c0) 기준으로 두어 고가 종목에서도 자릿수 손실이 없게 한다.
+_X_MEAN = (CHANNEL_PERIOD - 1) / 2
+_X_VAR = CHANNEL_PERIOD * (CHANNEL_PERIOD ** 2 - 1) / 12  # Σ(x - x̄)², x = 0..n-1
+
+
+def channel_partial(closes: list[float]) -> dict | None:
+    """마지막 봉을 뺀 CHANNEL_PERIOD-1개 종가 → 부분합"""
+    import numpy as np
+    y = np.asarray(closes[-(CHANNEL_PERIOD - 1):], dtype=float)
+    if len(y) < CHANNEL_PERIOD - 1 or np.isnan(y).any():
+        return None
+    c0 = float(y.mean())
+    z = y - c0
+    x = np.arange(CHANNEL_PERIOD - 1)
+    return {"c0": c0, "sz": float(z.sum()), "sxz": float((x * z).sum()), "szz": float((z * z).sum())}
+
+
+def finish_channel(part: dict, last_close: float) -> dict:
+    """부분합 + 마감 종가 → calc_channel과 같은 {upper, lower, r2}"""
+    n = CHANNEL_PERIOD
+    zl = last_close - part["c0"]
+    sz = part["sz"] + zl
+    sxz = part["sxz"] + (n - 1) * zl
+    szz = part["szz"] + zl * zl
+    z_mean = sz / n
+    slope = (sxz - _X_MEAN * sz) / _X_VAR
+    ss_tot = szz - n * z_mean * z_mean
+    ss_res = max(ss_tot - slope * slope * _X_VAR, 0.0)
+    std_r = math.sqrt(ss_res / n)
+    trend = part["c0"] + z_mean + slope * (n - 1 - _X_MEAN)
+    return {
+        "upper": trend + CHANNEL_STD * std_r,
+        "lower": trend - CHANNEL_STD * std_r,
+        "r2": 1 - ss_res / ss_tot if ss_tot > 0 else 0,
+    }
+
+
+class _RateLimit:
+    """스레드 공용 초당 요청 상한 — 대기는 모듈 time.sleep 경유 (멀티계정 / 벤치에서 대체)"""
+
+    def __init__(self, per_sec: float):
+        self.interval = 1.0 / per_sec if per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            t = max(now, self._next)
+            self._next = t + self.interval
+        if t > now:
+            time.sleep(t - now)
+
+
+_rate = _RateLimit(API_RATE)
+
+
+def pmap(fn, items, workers: int | None = None) -> list:
+    """종목별 조회를 SCAN_WORKERS 스레드로 → 결과 리스트 (입력 순서, 실패는 None)"""
+    items = list(items)
+    workers = SCAN_WORKERS if workers is None else workers
+
+    def call(x):
+        try:
+            return fn(x)
+        except Exception as e:
+            log.debug(f"{x} 조회 실패: {e}")
+            return None
+
+    if workers <= 1 or len(items) <= 1:
+        return [call(x) for x in items]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(min(workers, len(items))) as ex:
+        return list(ex.map(call, items))
+
+
+def closed_klines(symbol: str, limit: int) -> list:
+    """완결된 일봉만 최근 limit개 (오래된순) — 진행 중인 당일 봉은 빼서 백테스트와 같은 봉을 쓴다"""
+    _rate.wait()
+    klines = api.get_klines(symbol, interval="D", limit=limit + 1)
+    cutoff = int(time.time() * 1000) - DAY_MS
+    return [k for k in klines if int(k[0]) <= cutoff][-limit:]
+
+
 # ── BTC 시장 필터 ─────────────────────────────────────────────────────────────
 
 def get_btc_market_state():
     """BTC SMA20 > SMA50 → True(강세) / False(약세) / None(조회실패)"""
+    import numpy as np
     for attempt in range(3):
         try:
-            klines = api.get_klines("BTCUSDT", interval="D", limit=55)
+            klines = closed_klines("BTCUSDT", 55)
             closes = [float(k[4]) for k in klines]
             if len(closes) < 50:
                 log.warning(f"BTC 일봉 부족: {len(closes)}개 (시도 {attempt+1}/3)")
@@ -256,21 +412,131 @@ def get_btc_market_state():
 
 # ── 유니버스 ──────────────────────────────────────────────────────────────────
 
-def update_universe(state: dict) -> list[str]:
-    """전년 평균 거래대금 상위 TOP_N 종목 선정 (연 1회 갱신) — 백테스트 동일"""
-    today = today_str()
-    current_year = today[:4]
+def universe_period(day: str) -> tuple[str, str, str]:
+    """기준일 → (기간 라벨, 평균 구간 시작일, 끝일 미포함) — bt_engine 유니버스와 같은 구간
+    year: 전년 1/1~12/31 (annual_universe), quarter / month: 기간 시작 직전 365일 (rolling_universe)"""
+    d = datetime.strptime(day, "%Y-%m-%d")
+    if UNIVERSE_FREQ == "year":
+        return day[:4], f"{d.year - 1}-01-01", f"{d.year}-01-01"
+    if UNIVERSE_FREQ == "quarter":
+        start = d.replace(month=(d.month - 1) // 3 * 3 + 1, day=1)
+        label = f"{d.year}-Q{(d.month - 1) // 3 + 1}"
+    elif UNIVERSE_FREQ == "month":
+        start = d.replace(day=1)
+        label = start.strftime("%Y-%m")
+    else:
+        raise ValueError(f"BYBIT_UNIVERSE_FREQ: {UNIVERSE_FREQ} (year / quarter / month)")
+    return label, (start - timedelta(days=365)).strftime("%Y-%m-%d"), start.strftime("%Y-%m-%d")
+
+
+def _epoch_day(day: str) -> int:
+    return int(datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()) // 86400
+
+
+def load_turnover() -> dict:
+    """turnover.npz → {종목: {epoch 일: 거래대금}}"""
+    import numpy as np
+    if not os.path.exists(TURNOVER_F):
+        return {}
+    try:
+        with np.load(TURNOVER_F) as z:
+            days, syms, tv = z["days"], z["symbols"], z["tv"]
+    except Exception as e:
+        log.warning(f"거래대금 저장소 읽기 실패 → 새로 받음: {e}")
+        return {}
+    store = {}
+    for j, sym in enumerate(syms.tolist()):
+        ok = np.isfinite(tv[:, j])
+        store[sym] = dict(zip(days[ok].tolist(), tv[ok, j].tolist()))
+    return store
+
+
+def turnover_matrix(store: dict, symbols: list, first_day: int, end_day: int):
+    """{종목: {일: 거래대금}} → ([일수, 종목] 배열 NaN=없음, 날짜 배열) — [first_day, end_day)"""
+    import numpy as np
+    tv = np.full((max(0, end_day - first_day), len(symbols)), np.nan)
+    for j, sym in enumerate(symbols):
+        for d, v in store.get(sym, {}).items():
+            if first_day <= d < end_day:
+                tv[d - first_day, j] = v
+    return tv, np.arange(first_day, end_day).astype("M8[D]")
+
+
+def save_turnover(store: dict, keep_from: int):
+    """keep_from(epoch 일) 이전은 버리고 저장 (다음 기간 구간에 필요한 만큼만 유지)"""
+    import numpy as np
+    syms = sorted(s for s, v in store.items() if any(d >= keep_from for d in v))
+    last = max((d for s in syms for d in store[s]), default=keep_from - 1)
+    tv, dates = turnover_matrix(store, syms, keep_from, last + 1)
+    tmp = f"{TURNOVER_F}.tmp.npz"
+    np.savez(tmp, days=dates.astype(np.int64), symbols=np.array(syms, dtype=str), tv=tv)
+    os.replace(tmp, TURNOVER_F)
+
+
+def fetch_turnover(sym: str, from_day: int, end_day: int) -> dict:
+    """일봉으로 [from_day, end_day) 일간 거래대금 (close × volume) → {epoch 일: 값}"""
+    start_ms, end_ms = from_day * DAY_MS, end_day * DAY_MS - 1
+    out = {}
+    fetch_end = end_ms
+    for _ in range((end_day - from_day) // 200 + 2):
+        _rate.wait()
+        resp = api.session.get_kline(
+            category="linear", symbol=sym,
+            interval="D", limit=200,
+            start=start_ms, end=fetch_end,
+        )
+        rows = resp["result"]["list"]
+        if not rows:
+            break
+        for k in rows:
+            ts = int(k[0])
+            if start_ms <= ts <= end_ms:
+                out[ts // DAY_MS] = float(k[4]) * float(k[5])
+        earliest = int(rows[-1][0])
+        if earliest <= start_ms:
+            break
+        fetch_end = earliest - 1
+    return out
+
+
+@timing.timed("record_instruments")
+def record_instruments(result: dict, day: str):
+    """get_instruments_info 결과 → 종목 레지스트리 스냅샷 (실패해도 유니버스 갱신은 계속)"""
+    try:
+        from bt_engine.instruments import InstrumentRegistry
+        reg = InstrumentRegistry(INSTRUMENTS_DB)
+        try:
+            # 다음 페이지가 없으면 거래 중인 종목 전체 → 빠진 종목은 상장폐지로 기록
+            n = reg.record(result["list"], day, complete=not result.get("nextPageCursor"))
+        finally:
+            reg.close()
+        if n:
+            log.info(f"  종목 레지스트리: {n}건 변경")
+    except Exception as e:
+        log.warning(f"종목 레지스트리 기록 실패: {e}")
+
+
+@timing.timed("update_universe")
+def update_universe(state: dict, day: str | None = None) -> list[str]:
+    """평균 거래대금 상위 TOP_N 종목 선정 (UNIVERSE_FREQ 기간마다 갱신) — 백테스트 동일
+    day: 기준일 (기본 오늘, 워밍업은 다음 실행일)
+    일간 거래대금은 turnover.npz에 쌓아 두고 구간에서 빠진 날만 받는다 → bt_engine TurnoverIndex로 순위"""
+    label, win_start, win_end = universe_period(day or today_str())
     if (state.get("universe") and state.get("last_universe_year")
-            and current_year == state.get("last_universe_year")):
+            and label == state.get("last_universe_year")):
         return state["universe"]
 
-    log.info("유니버스 갱신 중 (전년 평균 거래대금 기준)...")
+    log.info(f"유니버스 갱신 중 ({win_start} ~ {win_end} 일평균 거래대금 기준)...")
     try:
+        from bt_engine.universe import TurnoverIndex
+
         instruments = api.session.get_instruments_info(category="linear")
-        now_ms = int(time.time() * 1000)
-        min_launch_ms = now_ms - MIN_LIST_DAYS * 86400 * 1000
+        record_instruments(instruments["result"], day or today_str())
+        # 상장일 필터도 기준일 기준 (워밍업은 다음 실행일) — 백테스트 레지스트리 조회와 같은 기준
+        min_launch_ms = (_epoch_day(day or today_str()) - MIN_LIST_DAYS) * DAY_MS
 
         candidates = []
+        launch_day = {}
         for item in instruments["result"]["list"]:
             sym = item["symbol"]
             if not sym.endswith("USDT") or sym in EXCLUDE:
@@ -281,56 +547,35 @@ def update_universe(state: dict) -> list[str]:
             if lt > min_launch_ms:
                 continue
             candidates.append(sym)
+            launch_day[sym] = lt // DAY_MS
 
         log.info(f"  후보 종목: {len(candidates)}개 (D{MIN_LIST_DAYS} 필터 후)")
 
-        prev_year = str(int(current_year) - 1)
-        start_ms = int(pd.Timestamp(f"{prev_year}-01-01").timestamp() * 1000)
-        end_ms = int(pd.Timestamp(f"{prev_year}-12-31").timestamp() * 1000)
-
-        avg_turnover = {}
-        for i, sym in enumerate(candidates):
-            try:
-                all_klines = []
-                fetch_end = end_ms
-                for _ in range(3):
-                    resp = api.session.get_kline(
-                        category="linear", symbol=sym,
-                        interval="D", limit=200,
-                        start=start_ms, end=fetch_end,
-                    )
-                    rows = resp["result"]["list"]
-                    if not rows:
-                        break
-                    all_klines.extend(rows)
-                    earliest = int(rows[-1][0])
-                    if earliest <= start_ms:
-                        break
-                    fetch_end = earliest - 1
-                    time.sleep(0.03)
-
-                tv_sum = 0.0
-                tv_count = 0
-                for k in all_klines:
-                    ts = int(k[0])
-                    if start_ms <= ts <= end_ms:
-                        close_p = float(k[4])
-                        vol = float(k[5])
-                        tv_sum += close_p * vol
-                        tv_count += 1
-                if tv_count >= 100:
-                    avg_turnover[sym] = tv_sum / tv_count
-            except Exception:
-                pass
-            if (i + 1) % 50 == 0:
-                log.info(f"  ... {i+1}/{len(candidates)}")
-            time.sleep(0.05)
-
-        ranked = sorted(avg_turnover.items(), key=lambda x: -x[1])
-        universe = [sym for sym, _ in ranked[:TOP_N]]
+        first_day, end_day = _epoch_day(win_start), _epoch_day(win_end)
+        store = load_turnover()
+        todo = []
+        for sym in candidates:
+            have = store.setdefault(sym, {})
+            # 구간 시작(또는 상장일)부터 빈틈없이 저장된 날 다음부터만 받는다
+            d = max(first_day, launch_day[sym])
+            while d < end_day and d in have:
+                d += 1
+            if d < end_day:
+                todo.append((sym, d))
+        got = pmap(lambda t: fetch_turnover(t[0], t[1], end_day), todo)
+        for (sym, _), rows in zip(todo, got):
+            if rows:
+                store[sym].update(rows)
+        log.info(f"  일봉 조회 {len(todo)}/{len(candidates)}종목 (나머지는 저장분)")
+
+        tv, dates = turnover_matrix(store, candidates, first_day, end_day)
+        ti = TurnoverIndex(tv, dates, candidates)
+        universe = ti.top(win_end, start=win_start, top_n=TOP_N or len(candidates),
+                          min_days=UNIVERSE_MIN_DAYS)
+        save_turnover(store, keep_from=first_day)
 
         state["universe"] = universe
-        state["last_universe_year"] = current_year
+        state["last_universe_year"] = label
         save_state(state)
         log.info(f"유니버스: {len(universe)}종목 (상위: {universe[:5]})")
         return universe
@@ -341,6 +586,7 @@ def update_universe(state: dict) -> list[str]:
 
 # ── 포지션 리사이즈 (핵심 신규 기능) ─────────────────────────────────────────
 
+@timing.timed("resize_positions")
 def resize_positions(state: dict, instruments: dict, target_n: int, reason: str = "리사이즈"):
     """
     기존 포지션을 1/target_n 비중으로 리사이즈.
@@ -452,6 +698,7 @@ def resize_positions(state: dict, instruments: dict, target_n: int, reason: str
 
 # ── 포지션 청산 ───────────────────────────────────────────────────────────────
 
+@timing.timed("close_pos")
 def close_pos(symbol: str, state: dict, reason: str):
     """포지션 청산"""
     pos = state["positions"].get(symbol)
@@ -537,35 +784,246 @@ def close_pos(symbol: str, state: dict, reason: str):
     del state["positions"][symbol]
 
 
-# ── 일간 체크 (00:05 UTC) ────────────────────────────────────────────────────
+# ── 포지션 대조 ───────────────────────────────────────────────────────────────
+
+@timing.timed("reconcile_positions")
+def reconcile_positions(state: dict, instruments: dict) -> set[str]:
+    """
+    거래소 포지션(일괄 조회 1회)과 state["positions"]를 종목 / 방향 / 수량으로 대조 → 복구 + 알림
+    state.json만 믿으면 부분 체결 / 수동 매매 뒤 close_pos가 틀린 수량으로 reduceOnly를 보낸다.
+      - 거래소에 없음 / 반대 방향  → 재조회해도 없으면 로컬에서 제거 (수동 청산, 강제 청산 등)
+                                    (일시적인 빈 / 부분 응답으로 실제 포지션 정보를 지우지 않도록)
+      - 수량 다름                → 로컬 수량을 거래소 수량으로 (수량 단위 절반 이내 차이는 알림 없이)
+      - 로컬에 없는 거래소 포지션 → 미관리: 건드리지 않고 알림만
+    → 미관리 종목 set (신규 진입 제외용). 드라이런 / 조회 실패면 대조 없이 빈 set
+    """
+    if DRY_RUN:
+        return set()
+
+    def fetch():
+        try:
+            return {(p["symbol"], p["side"]): p for p in api.get_positions()}
+        except Exception as e:
+            log.error(f"포지션 대조 조회 실패: {e} → state.json 기준 진행")
+            tg_send(f"⚠️ <b>포지션 조회 실패</b>\n{e}\nstate.json 기준으로 진행합니다.")
+            return None
+
+    live = fetch()
+    if live is None:
+        return set()
+    positions = state["positions"]
+    missing = [(sym, pos["side"]) for sym, pos in positions.items() if (sym, pos["side"]) not in live]
+    confirmed = set()  # 두 번 연속 없는 포지션만 제거 (재조회 실패면 지우지 않는다)
+    if missing:
+        time.sleep(RECONCILE_RECHECK_SEC)
+        again = fetch()
+        if again is not None:
+            confirmed = {k for k in missing if k not in again}
+            live.update({k: again[k] for k in missing if k in again})
+
+    issues = []
+    for sym in list(positions.keys()):
+        pos = positions[sym]
+        p = live.pop((sym, pos["side"]), None)
+        if p is None and (sym, pos["side"]) not in confirmed:
+            issues.append(f"{sym} {pos['side']} {pos['qty']}: 거래소 응답에 없음 (재조회 실패) → 유지")
+            continue
+        if p is None:
+            where = "반대 방향 보유" if any(s == sym for s, _ in live) else "거래소에 없음"
+            issues.append(f"{sym} {pos['side']} {pos['qty']}: {where} → 로컬 제거")
+            del positions[sym]
+            try:
+                db_logger.remove_position(sym)
+            except Exception as e:
+                log.warning(f"DB 포지션 삭제 실패: {e}")
+            continue
+
+        size = p["size"]
+        if size == pos["qty"]:
+            continue
+        step = instruments.get(sym, {}).get("qty_step", 0.001)
+        if abs(size - pos["qty"]) > step / 2:
+            issues.append(f"{sym} {pos['side']} 수량 {pos['qty']} → {size} (거래소 기준)")
+            try:
+                db_logger.upsert_position(
+                    symbol=sym, side=pos["side"], entry_price=pos["entry_price"],
+                    qty=size, sl_price=pos.get("sl_price"), tp_price=pos.get("tp_price"),
+                    strategy=pos["strat"], entry_time=pos.get("entry_date", "")
+                )
+            except Exception as e:
+                log.warning(f"DB 포지션 기록 실패: {e}")
+        pos["qty"] = size
+
+    for (sym, side), p in live.items():
+        issues.append(f"{sym} {side} {p['size']}: state에 없음 → 미관리 (신규 진입 제외)")
+
+    save_state(state)
+    if issues:
+        for msg in issues:
+            log.warning(f"포지션 불일치: {msg}")
+        tg_send("⚠️ <b>포지션 불일치</b>\n" + "\n".join(issues))
+    else:
+        log.info(f"포지션 대조: {len(positions)}개 일치")
+    return {sym for sym, _ in live}
+
+
+# ── 스캔 지표 / 워밍업 ────────────────────────────────────────────────────────
+
+_warm = None  # warmup() 결과 → 다음 daily_check가 한 번 쓰고 비움
+
+
+def scan_features(sym: str, pre: dict | None = None):
+    """
+    종목 1개 스캔 지표 → (r2, upper, lower, prev_close, curr_close, vol_ratio, mom5) / None(스킵)
+    pre: 워밍업 선행분 — 마감 봉 1개만 조회해 부분합으로 채널 완성
+         (봉이 이어지지 않으면 전체 조회로 대체)
+    """
+    channel = None
+    if pre is not None:
+        last = closed_klines(sym, 1)
+        if last and int(last[0][0]) == pre["ts"] + DAY_MS:
+            closes = pre["closes"] + [float(last[0][4])]
+            volumes = pre["volumes"] + [float(last[0][5])]
+            channel = finish_channel(pre["part"], closes[-1])
+            vol_ma = (pre["vol_sum"] + volumes[-1]) / CHANNEL_PERIOD
+    if channel is None:
+        klines = closed_klines(sym, 25)
+        if len(klines) < CHANNEL_PERIOD + 1:
+            return None
+        closes = [float(k[4]) for k in klines]
+        volumes = [float(k[5]) for k in klines]
+        channel = calc_channel(closes)
+        if channel is None:
+            return None
+        vol_ma = sum(volumes[-CHANNEL_PERIOD:]) / CHANNEL_PERIOD
+
+    if vol_ma <= 0:
+        return None
+    curr_close = closes[-1]
+    mom5 = curr_close / closes[-6] - 1 if len(closes) >= 6 else 0.01
+    return (channel["r2"], channel["upper"], channel["lower"],
+            closes[-2], curr_close, volumes[-1] / vol_ma, mom5)
+
+
+def warmup():
+    """마감 전 선행 준비 (WARMUP_AT) — 타이밍 실행 1회"""
+    global _warm
+    timing.start("warmup")
+    try:
+        _warm = _warmup()
+    except Exception as e:
+        _warm = None
+        log.error(f"워밍업 실패: {e}")
+    finally:
+        run = timing.finish()
+        if run is not None:
+            log.info(f"워밍업 타이밍: {run.summary()}")
+            try:
+                db_logger.log_timings(run.run_id, run.rows())
+            except Exception as e:
+                log.warning(f"DB 타이밍 기록 실패: {e}")
+
+
+def _warmup() -> dict:
+    """
+    다음 daily_check용: 종목정보, 유니버스(다음 실행일 기간), 종목별 완결 일봉 24개 + 채널 부분합.
+    자산은 마감 후 평가가 필요해서 선행하지 않는다.
+    """
+    run_day = next_daily_run().strftime("%Y-%m-%d")
+    state = load_state()
+
+    timing.phase("instruments")
+    instruments = api.get_instruments()
+
+    timing.phase("universe")
+    universe = update_universe(state, day=run_day)
+
+    timing.phase("klines")
+
+    def prepare(sym):
+        klines = closed_klines(sym, 24)
+        if len(klines) < CHANNEL_PERIOD:
+            return None
+        closes = [float(k[4]) for k in klines]
+        volumes = [float(k[5]) for k in klines]
+        part = channel_partial(closes)
+        if part is None:
+            return None
+        return {
+            "ts": int(klines[-1][0]), "closes": closes, "volumes": volumes,
+            "part": part, "vol_sum": sum(volumes[-(CHANNEL_PERIOD - 1):]),
+        }
+
+    syms = [s for s in universe if s in instruments and instruments[s]["status"] == "Trading"]
+    pre = {s: p for s, p in zip(syms, pmap(prepare, syms)) if p is not None}
+
+    log.info(f"워밍업: {len(pre)}/{len(universe)}종목 선행 ({run_day} 실행용)")
+    return {"day": run_day, "instruments": instruments, "pre": pre}
+
+
+# ── 일간 체크 (00:00:15 UTC) ────────────────────────────────────────────────────
 
 def daily_check():
+    """일간 체크 1회 = 타이밍 실행 1회 (단계별/API별 소요 → DB + 로그)"""
+    timing.start("daily_check")
+    try:
+        _daily_check()
+    finally:
+        run = timing.finish()
+        if run is not None:
+            log.info(f"타이밍: {run.summary()}")
+            bot_metrics.observe_run(run)
+            try:
+                db_logger.log_timings(run.run_id, run.rows())
+            except Exception as e:
+                log.warning(f"DB 타이밍 기록 실패: {e}")
+
+
+def _daily_check():
     log.info("=" * 60)
     log.info("  일간 체크 시작 (v2: weight=1/n)")
     log.info("=" * 60)
 
     state = load_state()
 
+    # 워밍업분은 오늘 실행용일 때만 한 번 사용
+    global _warm
+    warm, _warm = _warm, None
+    if warm and warm["day"] != today_str():
+        log.warning(f"워밍업 날짜 불일치 ({warm['day']}) → 전체 조회")
+        warm = None
+
     # 1. BTC 시장 상태
+    timing.phase("btc")
     is_bull = get_btc_market_state()
 
     # 2. 유니버스 갱신
+    timing.phase("universe")
     universe = update_universe(state)
     if not universe:
         log.warning("유니버스 비어있음 → 스킵")
         return
 
     # 3. 종목 정보 (최소수량 등)
-    try:
-        instruments = api.get_instruments()
-    except Exception as e:
-        log.error(f"종목 정보 조회 실패: {e}")
-        return
+    timing.phase("instruments")
+    if warm:
+        instruments = warm["instruments"]
+    else:
+        try:
+            instruments = api.get_instruments()
+        except Exception as e:
+            log.error(f"종목 정보 조회 실패: {e}")
+            return
+
+    # 3b. 포지션 대조: 청산 / 리사이즈 주문 수량을 거래소 기준으로 맞춘 뒤 진행
+    timing.phase("reconcile")
+    n_before_close = len(state["positions"])  # 외부 청산분도 포지션 수 변화 → 리사이즈
+    unmanaged = reconcile_positions(state, instruments)
 
     # ─────────────────────────────────────────────────────────
     # 4. 청산 단계
     # ─────────────────────────────────────────────────────────
-    n_before_close = len(state["positions"])
+    timing.phase("close")
 
     # 4a. BTC 필터 청산
     if is_bull is None:
@@ -617,74 +1075,44 @@ def daily_check():
     # ─────────────────────────────────────────────────────────
     # 5. 후보 스캔 (진입 전에 먼저 스캔하여 final_n 결정)
     # ─────────────────────────────────────────────────────────
+    timing.phase("scan")
     avail_slots = MAX_POS - n_after_close
     candidates = []
-    held_symbols = set(state["positions"].keys())
+    held_symbols = set(state["positions"].keys()) | unmanaged
     # 유니버스 순위 (거래대금 순) — 유저코드 tiebreaker용
     universe_rank = {sym: i for i, sym in enumerate(universe)}
 
     if avail_slots > 0:
-        for sym in universe:
-            if sym in held_symbols:
+        scan_syms = [sym for sym in universe if sym not in held_symbols
+                     and sym in instruments and instruments[sym]["status"] == "Trading"]
+        pre_of = warm["pre"] if warm else {}
+        # 조회는 종목별 병렬 (요청 속도는 _rate 공용 제한), 신호 판정은 유니버스 순서대로
+        feats = pmap(lambda sym: scan_features(sym, pre_of.get(sym)), scan_syms)
+        for sym, feat in zip(scan_syms, feats):
+            if feat is None:
                 continue
-            if sym not in instruments or instruments[sym]["status"] != "Trading":
-                continue
-
-            try:
-                klines = api.get_klines(sym, interval="D", limit=25)
-                if len(klines) < CHANNEL_PERIOD + 1:
-                    continue
-
-                closes = [float(k[4]) for k in klines]
-                volumes = [float(k[5]) for k in klines]
+            r2, upper, lower, prev_close, curr_close, vol_ratio, mom5 = feat
 
-                channel = calc_channel(closes)
-                if channel is None:
+            for sk, cfg in STRATS.items():
+                btcf = cfg["btc_filter"]
+                if (btcf == "bull" and not is_bull) or (btcf == "bear" and is_bull):
                     continue
-
-                r2 = channel["r2"]
-                upper = channel["upper"]
-                lower = channel["lower"]
-
-                prev_close = closes[-2]
-                curr_close = closes[-1]
-
-                vol_ma = np.mean(volumes[-CHANNEL_PERIOD:])
-                if vol_ma <= 0:
+                if r2 <= cfg["r2_thresh"] or vol_ratio <= cfg["vol_mult"]:
                     continue
-                vol_ratio = volumes[-1] / vol_ma
-
-                if len(closes) >= 6:
-                    mom5 = curr_close / closes[-6] - 1
-                else:
-                    mom5 = 0.01
-
-                for sk, cfg in STRATS.items():
-                    btcf = cfg["btc_filter"]
-                    if (btcf == "bull" and not is_bull) or (btcf == "bear" and is_bull):
-                        continue
-                    if r2 <= cfg["r2_thresh"] or vol_ratio <= cfg["vol_mult"]:
-                        continue
-
-                    triggered = False
-                    sig = cfg["signal"]
-                    if sig == "upper_break" and prev_close <= upper and curr_close > upper:
-                        triggered = True
-                    elif sig == "lower_break" and prev_close >= lower and curr_close < lower:
-                        triggered = True
-                    elif sig == "upper_touch" and prev_close < upper and curr_close >= upper:
-                        triggered = True
-
-                    if triggered:
-                        score = r2 * vol_ratio * max(mom5, 0.01)
-                        rank = universe_rank.get(sym, 999)
-                        candidates.append((sym, sk, score, rank))
 
-            except Exception as e:
-                log.debug(f"{sym} 스캔 실패: {e}")
-                continue
+                triggered = False
+                sig = cfg["signal"]
+                if sig == "upper_break" and prev_close <= upper and curr_close > upper:
+                    triggered = True
+                elif sig == "lower_break" and prev_close >= lower and curr_close < lower:
+                    triggered = True
+                elif sig == "upper_touch" and prev_close < upper and curr_close >= upper:
+                    triggered = True
 
-            time.sleep(0.1)
+                if triggered:
+                    score = r2 * vol_ratio * max(mom5, 0.01)
+                    rank = universe_rank.get(sym, 999)
+                    candidates.append((sym, sk, score, rank))
 
     # 점수순 → 거래대금순 정렬 (유저코드 동일: -score, rank)
     candidates.sort(key=lambda x: (-x[2], x[3]))
@@ -704,6 +1132,7 @@ def daily_check():
     # ─────────────────────────────────────────────────────────
     # 6. 리사이즈 단계
     # ─────────────────────────────────────────────────────────
+    timing.phase("resize")
     final_n = n_after_close + new_entries_count
 
     if final_n > 0 and n_after_close > 0:
@@ -717,6 +1146,7 @@ def daily_check():
     # ─────────────────────────────────────────────────────────
     # 7. 신규 진입
     # ─────────────────────────────────────────────────────────
+    timing.phase("entry")
     if new_entries_count > 0:
         # 최신 자산 조회 (리사이즈 후 변동)
         try:
@@ -829,6 +1259,7 @@ def daily_check():
     #    - MDD 복구 후 현금 40% 복구 역할
     #    - MDD 투입 상태(mdd_deployed)면 스킵
     # ─────────────────────────────────────────────────────────
+    timing.phase("rebalance")
     today = now_utc()
     last_rebal = state.get("last_rebal_month", "")
     current_month = today.strftime("%Y-%m")
@@ -849,6 +1280,7 @@ def daily_check():
     log.info("=" * 60)
 
     # 텔레그램 일간 리포트
+    timing.phase("report")
     try:
         equity = api.get_equity()
     except Exception:
@@ -858,16 +1290,8 @@ def daily_check():
 
 # ── 일간 리포트 ───────────────────────────────────────────────────────────────
 
-def send_daily_report(state: dict, is_bull: bool, equity: float):
-    """텔레그램 일간 리포트 — 1/n 비중 기반 가상 누적수익률"""
-    positions = state.get("positions", {})
-    trade_log = state.get("trade_log", [])
-
-    if "start_date" not in state:
-        state["start_date"] = today_str()
-        save_state(state)
-
-    # ── 가상 누적수익률 (복리, 1/n 비중) ──
+def trade_nav(trade_log: list):
+    """청산 기록 → (가상 NAV, 고점 NAV, MDD%) — 복리, 1/n 비중"""
     nav = 1.0
     peak_nav = 1.0
     mdd = 0.0
@@ -881,6 +1305,22 @@ def send_daily_report(state: dict, is_bull: bool, equity: float):
         dd = (nav / peak_nav - 1) * 100
         if dd < mdd:
             mdd = dd
+    return nav, peak_nav, mdd
+
+
+def send_daily_report(state: dict, is_bull: bool, equity: float):
+    """텔레그램 일간 리포트 — 1/n 비중 기반 가상 누적수익률"""
+    positions = state.get("positions", {})
+    trade_log = state.get("trade_log", [])
+    if equity:
+        bot_metrics.EQUITY.set(equity)
+
+    if "start_date" not in state:
+        state["start_date"] = today_str()
+        save_state(state)
+
+    # ── 가상 누적수익률 (복리, 1/n 비중) ──
+    nav, peak_nav, mdd = trade_nav(trade_log)
 
     # 미체결 포지션 평가손익 반영
     open_nav = nav
@@ -954,6 +1394,10 @@ def send_daily_report(state: dict, is_bull: bool, equity: float):
                 f"  • {sym} {sk}{dir_tag} ${pos_size:,.1f} ({held}일)"
             )
 
+    run = timing.current()
+    if run is not None:
+        lines += ["", run.summary()]
+
     tg_send("\n".join(lines))
 
 
@@ -1015,12 +1459,66 @@ def print_status():
             f"SL=${pos['sl_price']:.4f} TP=${pos['tp_price']:.4f} "
             f"보유 {held}일/{cfg['hold_days']}일"
         )
+    log.info(f"유니버스 {len(state.get('universe', []))}종목 "
+             f"({state.get('last_universe_year', '-')} 기준)")
+
+
+def print_report():
+    """청산 기록 요약 (API 없이 state.json만) — 일간 리포트의 실현분"""
+    trade_log = load_state().get("trade_log", [])
+    n = len(trade_log)
+    if not n:
+        print("청산 기록 없음")
+        return
+    nav, _, mdd = trade_nav(trade_log)
+    wins = sum(1 for t in trade_log if t.get("pnl", 0) >= 0)
+    print(f"청산 {n}건 | 승률 {wins / n * 100:.0f}% | 실현 누적 {(nav - 1) * 100:+.1f}% | MDD {mdd:.1f}%")
+    by_strat = {}
+    for t in trade_log:
+        s = by_strat.setdefault(t.get("strat", "?"), [0, 0, 0.0])
+        s[0] += 1
+        s[1] += t.get("pnl", 0) >= 0
+        s[2] += t.get("pnl", 0)
+    for sk, (cnt, w, pnl) in sorted(by_strat.items()):
+        print(f"  {sk}: {cnt}건 승률 {w / cnt * 100:.0f}% 평균 {pnl / cnt:+.2f}%")
+    for t in trade_log[-5:]:
+        print(f"  {t.get('date', '-')} {t.get('symbol', '?')} {t.get('strat', '?')} "
+              f"{t.get('pnl', 0):+.2f}% ({t.get('reason', '')})")
+
+
+def print_state(key: str | None = None) -> int:
+    """저장된 state.json 출력 (API 없이). key: 그 항목만 (positions / universe / trade_log ...)"""
+    state = load_state()
+    if not os.path.exists(STATE_F):
+        print(f"{STATE_F} 없음 (기본 상태)")
+    if key is not None:
+        if key not in state:
+            print(f"없는 항목: {key} (있는 항목: {', '.join(state)})")
+            return 1
+        state = state[key]
+    print(json.dumps(state, ensure_ascii=False, indent=2))
+    return 0
+
+
+def health_check(max_hours: float = 26) -> int:
+    """daily_check 마지막 정상 실행이 max_hours 이내면 0, 아니면 1 (cron / 모니터링용)"""
+    try:
+        with open(SCHED_F, encoding="utf-8") as f:
+            last = float(json.load(f)["daily_check"])
+    except (OSError, ValueError, KeyError):
+        print(f"UNKNOWN: {SCHED_F} 에 daily_check 기록 없음")
+        return 1
+    age = (time.time() - last) / 3600
+    ok = age <= max_hours
+    print(f"{'OK' if ok else 'STALE'}: daily_check 마지막 실행 "
+          f"{datetime.fromtimestamp(last, timezone.utc):%Y-%m-%d %H:%M:%S} UTC ({age:.1f}시간 전)")
+    return 0 if ok else 1
 
 
 # ── 테스트 모드 ───────────────────────────────────────────────────────────────
 
 def run_test():
-    """python bybit_main.py --test"""
+    """python bybit_main_v2.py --test"""
     log.info("===== 바이비트 API 테스트 =====")
 
     log.info("[1] 잔고 조회")
@@ -1071,7 +1569,7 @@ def run_test():
 # ── 드라이런 ──────────────────────────────────────────────────────────────────
 
 def run_dry():
-    """python bybit_main.py --dry  —  시그널 생성만 (주문 없음)"""
+    """python bybit_main_v2.py --dry  —  시그널 생성만 (주문 없음)"""
     global DRY_RUN
     DRY_RUN = True
     log.info("===== 드라이런 모드 =====")
@@ -1097,34 +1595,54 @@ def main():
     for sk, cfg in STRATS.items():
         log.info(f"  {sk}: {cfg['name']} SL={cfg['sl']*100:.0f}% TP={cfg['tp']*100:.0f}% {cfg['hold_days']}일")
 
-    # 시작 시 한 번 실행
-    daily_check()
+    if METRICS_PORT > 0:
+        try:
+            bot_metrics.start_server(METRICS_PORT)
+            log.info(f"  메트릭: http://127.0.0.1:{METRICS_PORT}/metrics")
+        except OSError as e:
+            log.warning(f"메트릭 서버 시작 실패 (port={METRICS_PORT}): {e}")
+
+    # 스케줄 등록 (UTC) — 일간 체크는 놓친 회차가 있으면 (첫 시작 포함) 바로 실행
+    sched = scheduler.Scheduler(state_file=SCHED_F, hook=_job_hook)
+    sched.daily("warmup", WARMUP_AT, warmup, lock=STATE_LOCK)
+    sched.daily("daily_check", DAILY_AT, daily_check, catch_up=True, lock=STATE_LOCK)
+    sched.daily("print_status", "00:10", print_status)
+    if MONITOR_MIN > 0:  # daily_check/warmup이 STATE_LOCK을 쥔 동안엔 회차를 건너뛴다
+        sched.every("monitor", MONITOR_MIN * 60, monitor, lock=STATE_LOCK, wait_lock=False)
     print_status()
 
-    # 스케줄 등록 (UTC) — 하루 1회
-    schedule.every().day.at("00:05").do(daily_check)
-    schedule.every().day.at("00:10").do(print_status)
-
     log.info("스케줄:")
-    log.info("  00:05 UTC → 일간 체크 (시그널 + 진입/청산 + 리사이즈)")
+    for line in sched.summary():
+        log.info(f"  {line}")
 
-    while True:
-        try:
-            schedule.run_pending()
-        except Exception as e:
-            log.error(f"루프 오류: {e}")
-        time.sleep(10)
+    try:
+        sched.run()
+    except KeyboardInterrupt:
+        sched.stop()
+        log.info("종료")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--test":
-            run_test()
-        elif sys.argv[1] == "--dry":
-            run_dry()
-        elif sys.argv[1] == "--status":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else None
+    if cmd in ("--status", "--state", "--report", "--health"):
+        # 가벼운 명령: 로그 파일 / API 세션 / numpy 없이
+        setup_logging(to_file=False)
+        if cmd == "--status":
             print_status()
+        elif cmd == "--state":
+            sys.exit(print_state(sys.argv[2] if len(sys.argv) > 2 else None))
+        elif cmd == "--report":
+            print_report()
         else:
-            print("사용법: python bybit_main.py [--test|--dry|--status]")
-    else:
+            sys.exit(health_check(float(sys.argv[2]) if len(sys.argv) > 2 else 26))
+    elif cmd == "--test":
+        setup_logging()
+        run_test()
+    elif cmd == "--dry":
+        setup_logging()
+        run_dry()
+    elif cmd is None:
+        setup_logging()
         main()
+    else:
+        print("사용법: python bybit_main_v2.py [--test|--dry|--status|--state [항목]|--report|--health [시간]]")
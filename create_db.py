@@ -34,9 +34,16 @@ c.execute("""CREATE TABLE IF NOT EXISTS alert_log (
     level TEXT NOT NULL, source TEXT, message TEXT NOT NULL, sent INTEGER DEFAULT 0
 )""")
 
+c.execute("""CREATE TABLE IF NOT EXISTS timings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL,
+    calls INTEGER, total_sec REAL, max_sec REAL, errors INTEGER DEFAULT 0
+)""")
+
 c.execute("CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades(symbol)")
 c.execute("CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp)")
 c.execute("CREATE INDEX IF NOT EXISTS idx_daily_date ON daily_performance(date)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_timings_run ON timings(run_id)")
 
 conn.commit()
 tables = c.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
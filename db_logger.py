@@ -70,3 +70,22 @@ def log_alert(level, source, message):
     )
     conn.commit()
     conn.close()
+
+_TIMINGS_DDL = """CREATE TABLE IF NOT EXISTS timings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL,
+    calls INTEGER, total_sec REAL, max_sec REAL, errors INTEGER DEFAULT 0
+)"""
+
+def log_timings(run_id, rows):
+    """timing.Run.rows() → timings 테이블 (kind: run/phase/span/api)"""
+    conn = _conn()
+    conn.execute(_TIMINGS_DDL)
+    ts = datetime.now(timezone.utc).isoformat()
+    conn.executemany(
+        """INSERT INTO timings (run_id, timestamp, kind, name, calls,
+           total_sec, max_sec, errors) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        [(run_id, ts, *r) for r in rows]
+    )
+    conn.commit()
+    conn.close()
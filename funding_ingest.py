@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+펀딩비 수집기 - linear USDT 퍼페추얼 펀딩 기록 → 펀딩비 저장소 (bt_engine.funding)
+================================================================================
+get_funding_rate_history는 endTime 이전 최신 200건을 최신순으로 준다 → 지금부터 거꾸로 페이징.
+  - 증분 동기화: 종목별 저장된 마지막 시각에 닿으면 멈춤 (다시 실행하면 새 기록만)
+  - 처음 받는 종목은 --start까지 (상장 전이면 기록이 끝나는 곳까지)
+  - 여러 종목을 --workers 스레드로, 요청 속도는 --rate로 공용 제한 (minute_ingest와 같은 방식)
+  - 다 받은 뒤 한 번에 병합 저장 (중단되면 받은 종목까지 저장)
+
+종목: 기본은 거래 중인 USDT 퍼페추얼 전체 (백테스트 유니버스 후보 전부), --symbols로 지정 가능.
+크기: 종목당 하루 3건 × 8바이트 → 400종목 × 5년 ≈ 18MB.
+
+사용법:
+  python funding_ingest.py [--root funding_store] [--symbols BTCUSDT ETHUSDT ...]
+                           [--start 2021-01-01] [--workers 4] [--rate 20]
+  python funding_ingest.py --status [--root funding_store]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from bt_engine.data import list_symbols
+from bt_engine.funding import load_funding, merge, save_funding
+from minute_ingest import RateLimit, http_session
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "funding_store")
+PAGE = 200                        # get_funding_rate_history 최대 limit
+EXCLUDE = {"USDCUSDT"}
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                    handlers=[logging.StreamHandler(sys.stdout)])
+log = logging.getLogger(__name__)
+
+
+# ─── 조회 ────────────────────────────────────────────────────
+def fetch_page(session, symbol, end_ms, limiter, retries=3):
+    """end_ms 이전 최대 PAGE건 → (ts int64 초, rate float64) 오름차순"""
+    for attempt in range(retries):
+        limiter.wait()
+        try:
+            r = session.get_funding_rate_history(category="linear", symbol=symbol,
+                                                 endTime=end_ms, limit=PAGE)
+            rows = r["result"]["list"]
+            break
+        except Exception as e:
+            if attempt == retries - 1:
+                raise
+            log.warning(f"  {symbol} 재시도 {attempt + 1}: {e}")
+            time.sleep(2 ** attempt)
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    ts = np.array([int(x["fundingRateTimestamp"]) // 1000 for x in rows], dtype=np.int64)
+    rate = np.array([float(x["fundingRate"]) for x in rows])
+    order = np.argsort(ts)
+    return ts[order], rate[order]
+
+
+def sync_symbol(session, symbol, since_sec, limiter):
+    """since_sec 이후 기록 전부 → (ts, rate) 오름차순 (since_sec 자체는 제외)"""
+    end_ms = int(time.time() * 1000)
+    parts = []
+    while True:
+        ts, rate = fetch_page(session, symbol, end_ms, limiter)
+        if not len(ts):
+            break
+        keep = ts > since_sec
+        parts.append((ts[keep], rate[keep]))
+        if not keep.all() or len(ts) < PAGE:
+            break
+        end_ms = int(ts[0]) * 1000 - 1
+    if not parts:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+# ─── 현황 ────────────────────────────────────────────────────
+def print_status(root):
+    fr = load_funding(root)
+    if fr is None:
+        print(f"저장소 없음: {root}")
+        return
+    fmt = lambda t: str(np.datetime64(int(t), "s")).replace("T", " ")[:16]
+    print(f"{'종목':<14} {'건수':>6} {'첫 기록':>17} {'마지막 기록':>17} {'평균(%/8h)':>11}")
+    for sym in fr.symbols:
+        ts, rate = fr.series(sym)
+        if not len(ts):
+            continue
+        print(f"{sym:<14} {len(ts):>6} {fmt(ts[0]):>17} {fmt(ts[-1]):>17} {rate.mean() * 100:>11.4f}")
+    print(f"합계: {len(fr.symbols)}종목, 시각 {len(fr)}개")
+
+
+# ─── 메인 ────────────────────────────────────────────────────
+def main(argv=None):
+    p = argparse.ArgumentParser(description="펀딩비 수집 → 펀딩비 저장소 (증분)")
+    p.add_argument("--root", default=ROOT)
+    p.add_argument("--symbols", nargs="+", help="종목 직접 지정 (기본: 거래 중인 USDT 퍼페추얼 전체)")
+    p.add_argument("--start", default="2021-01-01", help="처음 받는 종목의 시작일 (UTC)")
+    p.add_argument("--workers", type=int, default=4, help="동시 종목 수")
+    p.add_argument("--rate", type=float, default=20, help="초당 요청 수 (전 스레드 합계)")
+    p.add_argument("--status", action="store_true", help="저장소 현황만 출력")
+    args = p.parse_args(argv)
+
+    if args.status:
+        print_status(args.root)
+        return
+
+    session = http_session()
+    symbols = args.symbols or list_symbols(session, exclude=EXCLUDE)
+    old = load_funding(args.root, mmap=False)
+    start_sec = int(np.datetime64(args.start, "s").astype(np.int64))
+    limiter = RateLimit(args.rate)
+    log.info(f"펀딩비 동기화: {len(symbols)}종목, {args.start}~ → {args.root}")
+
+    def job(sym):
+        last = old.last_ts(sym) if old is not None else None
+        since = start_sec - 1 if last is None else last
+        return sync_symbol(http_session(), sym, since, limiter)
+
+    t0 = time.time()
+    new = {}
+    failed = []
+    ex = ThreadPoolExecutor(max_workers=args.workers)
+    futures = {ex.submit(job, s): s for s in symbols}
+    try:
+        for k, fut in enumerate(as_completed(futures), 1):
+            sym = futures[fut]
+            try:
+                ts, rate = fut.result()
+            except Exception as e:
+                failed.append(sym)
+                log.error(f"[{k}/{len(symbols)}] {sym} 실패: {e}")
+                continue
+            if len(ts):
+                new[sym] = (ts, rate)
+            if k % 50 == 0 or k == len(symbols):
+                log.info(f"[{k}/{len(symbols)}] 새 기록 {sum(len(v[0]) for v in new.values()):,}건")
+    except KeyboardInterrupt:
+        log.warning("중단 — 받은 종목까지 저장")
+        ex.shutdown(wait=False, cancel_futures=True)
+    else:
+        ex.shutdown(wait=True)
+
+    if new:
+        save_funding(merge(old, new), args.root)
+    log.info(f"완료: {len(new)}종목 +{sum(len(v[0]) for v in new.values()):,}건, {time.time() - t0:.0f}초"
+             + (f", 실패 {len(failed)}종목 {failed}" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
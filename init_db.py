@@ -55,6 +55,17 @@ CREATE TABLE IF NOT EXISTS alert_log (
     message TEXT,
     sent INTEGER DEFAULT 0
 );
+CREATE TABLE IF NOT EXISTS timings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    calls INTEGER,
+    total_sec REAL,
+    max_sec REAL,
+    errors INTEGER DEFAULT 0
+);
 ''')
 cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
 tables = cursor.fetchall()
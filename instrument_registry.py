@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+종목 레지스트리 동기화 / 조회 (bt_engine.instruments)
+=====================================================
+동기화: get_instruments_info를 상태별(PreLaunch / Trading / Delivering / Closed)로 페이징해 받아
+        오늘 날짜 스냅샷으로 기록 → 상장 / 상장폐지일, 최소수량 / 틱사이즈 변경 이력이 쌓인다.
+        라이브 봇(bybit_main_v2)도 유니버스 갱신 때 받은 목록을 같은 레지스트리에 기록한다.
+보충:   --seed-cache bt_cache.pkl → 레지스트리에 없는 과거 종목(이미 목록에서 사라진 상장폐지 종목)을
+        첫 / 마지막 일봉으로 채운다.
+조회:   --tradable 2024-01-01 → 그날 거래 가능 종목 (API 없이)
+
+사용법:
+  python instrument_registry.py [--db instruments.db]                  # 동기화
+  python instrument_registry.py --seed-cache bt_cache.pkl [--db ...]
+  python instrument_registry.py --tradable 2024-01-01 [--min-days 150]
+  python instrument_registry.py --symbol SOLUSDT [--day 2024-01-01]
+  python instrument_registry.py --status
+"""
+import os
+import sys
+import argparse
+from datetime import datetime, timezone
+
+from bt_engine.instruments import InstrumentRegistry
+
+DB_FILE = os.environ.get("BT_INSTRUMENTS_DB",
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "instruments.db"))
+STATUSES = ("PreLaunch", "Trading", "Delivering", "Closed")
+
+
+def fetch_all(session, category="linear"):
+    """상태별 전체 종목 (cursor 페이징) → instruments-info list
+    한 페이지라도 실패하면 예외 그대로 → 일부 목록을 전체로 기록해 상장폐지로 잘못 남기지 않는다"""
+    items = {}
+    for status in STATUSES:
+        cursor = ""
+        while True:
+            try:
+                r = session.get_instruments_info(category=category, status=status,
+                                                 limit=1000, cursor=cursor)
+            except Exception as e:
+                raise RuntimeError(f"{status} 조회 실패 (cursor={cursor or '-'}): {e}") from e
+            for it in r["result"]["list"]:
+                items[it["symbol"]] = it
+            cursor = r["result"].get("nextPageCursor") or ""
+            if not cursor:
+                break
+    return list(items.values())
+
+
+def print_status(reg):
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    n = reg.conn.execute("SELECT COUNT(*), SUM(delist_day IS NOT NULL), SUM(source='bars') "
+                         "FROM instruments").fetchone()
+    versions = reg.conn.execute("SELECT COUNT(*) FROM specs").fetchone()[0]
+    last = reg.conn.execute("SELECT MAX(last_seen) FROM instruments WHERE source='api'").fetchone()[0]
+    print(f"레지스트리: {reg.path}")
+    print(f"  종목 {n[0] or 0}개 (상장폐지 {n[1] or 0}, 일봉 보충 {n[2] or 0}), 사양 버전 {versions}개")
+    print(f"  마지막 스냅샷: {last or '-'}, 오늘 거래 가능: {len(reg.tradable(today))}종목")
+    for y in range(2021, int(today[:4]) + 1):
+        d = f"{y}-01-01"
+        print(f"  {d}: 거래 가능 {len(reg.tradable(d)):>4}종목")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="종목 레지스트리 (상장 / 상장폐지 / 사양 이력)")
+    p.add_argument("--db", default=DB_FILE)
+    p.add_argument("--seed-cache", metavar="PKL", help="bt_cache.pkl 일봉으로 없는 종목 보충")
+    p.add_argument("--tradable", metavar="YYYY-MM-DD", help="그날 거래 가능 종목 출력")
+    p.add_argument("--min-days", type=int, default=0, help="--tradable 상장 최소 일수")
+    p.add_argument("--symbol", help="종목 정보 / 사양 출력")
+    p.add_argument("--day", help="--symbol 사양 기준일 (기본 오늘)")
+    p.add_argument("--status", action="store_true", help="현황만 출력")
+    args = p.parse_args(argv)
+
+    reg = InstrumentRegistry(args.db)
+    try:
+        if args.status:
+            print_status(reg)
+        elif args.tradable:
+            syms = reg.tradable(args.tradable, args.min_days)
+            print(f"{args.tradable}: {len(syms)}종목")
+            print(" ".join(syms))
+        elif args.symbol:
+            day = args.day or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            info = reg.info(args.symbol)
+            if info is None:
+                sys.exit(f"레지스트리에 없음: {args.symbol}")
+            print(info)
+            print(f"{day} 사양: {reg.spec(args.symbol, day)}")
+        elif args.seed_cache:
+            import bt_engine
+            n = reg.seed_from_bars(bt_engine.load_api_cache(args.seed_cache))
+            print(f"일봉 보충: {n}종목")
+        else:
+            from pybit.unified_trading import HTTP
+            try:
+                items = fetch_all(HTTP())
+            except RuntimeError as e:
+                sys.exit(f"동기화 중단 (기록 안 함): {e}")
+            day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+            n = reg.record(items, day)
+            print(f"스냅샷 {day}: {len(items)}종목, 변경 {n}건")
+            print_status(reg)
+    finally:
+        reg.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+성과 지표 - NumPy 벡터화
+========================
+자산곡선(1차원 또는 [곡선 수, 일수] 2차원)과 구조화 거래 배열(TRADE_DTYPE)에서
+CAGR / MDD / Sharpe / Calmar, 연도별·월별 수익률, 전략별·청산사유별 통계를
+루프 없이 계산한다. 2차원 입력이면 곡선마다 한 번에 계산 (배치 스윕용).
+
+  equity_stats(eq)             → {"cagr", "mdd", "sharpe", "calmar", "final_mult"}
+  period_table(eq, dates, "Y") → 연도별 (라벨, 구간수익률%, 구간MDD%)
+  monthly_returns(eq, dates)   → 월말 기준 월별 수익률%
+  as_trade_array(trade_log)    → 기존 dict 리스트를 TRADE_DTYPE 배열로 변환
+  trade_stats(trades)          → 전체/전략별/사유별 통계
+"""
+import numpy as np
+
+# 거래 기록 (pnl은 비율: 0.05 = +5%)
+TRADE_DTYPE = np.dtype([
+    ("coin", "U24"),
+    ("strat", "U1"),
+    ("direction", "i1"),     # 1 = 롱, -1 = 숏
+    ("reason", "U24"),
+    ("pnl", "f8"),
+    ("held", "i4"),
+    ("entry_idx", "i4"),
+    ("exit_idx", "i4"),
+    ("entry_price", "f8"),
+    ("exit_price", "f8"),
+    ("entry_date", "M8[D]"),
+    ("exit_date", "M8[D]"),
+    ("n_pos", "i2"),
+    ("funding", "f8"),       # 보유 중 낸 펀딩 (진입 금액 대비 비율, 받았으면 음수)
+])
+
+
+# ─── 자산곡선 지표 ───────────────────────────────────────────
+def equity_stats(eq, initial=None, years=None, periods=365, ddof=0):
+    """
+    eq: [일수] 또는 [곡선 수, 일수]
+    initial: 기준 자산 (기본: 곡선 첫 값)
+    years: 연수 (기본: 일수 / periods)
+    ddof: Sharpe 표준편차 자유도 (pandas 기반 출력과 맞출 때 1)
+    1차원 입력이면 float, 2차원이면 곡선별 배열을 돌려준다.
+    """
+    eq = np.asarray(eq, dtype=float)
+    single = eq.ndim == 1
+    eq2 = np.atleast_2d(eq)
+    n_days = eq2.shape[1]
+
+    base = eq2[:, 0] if initial is None else np.broadcast_to(np.asarray(initial, float), eq2.shape[:1])
+    mult = eq2[:, -1] / base
+    yrs = n_days / periods if years is None else years
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.where((mult > 0) & (yrs > 0), (np.abs(mult) ** (1.0 / yrs) - 1.0) * 100, -999.0)
+
+        peak = np.maximum.accumulate(eq2, axis=1)
+        mdd = (eq2 / peak - 1).min(axis=1) * 100
+
+        if n_days > 1:
+            dr = np.diff(eq2, axis=1) / eq2[:, :-1]
+            sd = dr.std(axis=1, ddof=ddof) if n_days - 1 > ddof else np.zeros(len(eq2))
+            sharpe = np.where(sd > 0, dr.mean(axis=1) / np.where(sd > 0, sd, 1) * np.sqrt(periods), 0.0)
+        else:
+            sharpe = np.zeros(len(eq2))
+        calmar = np.where(mdd != 0, cagr / np.abs(np.where(mdd != 0, mdd, 1)), 0.0)
+
+    out = {"cagr": cagr, "mdd": mdd, "sharpe": sharpe, "calmar": calmar, "final_mult": mult}
+    if single:
+        return {k: float(v[0]) for k, v in out.items()}
+    return out
+
+
+def drawdown(eq):
+    """낙폭 곡선 (eq / 누적최고 - 1), 마지막 축 기준"""
+    eq = np.asarray(eq, dtype=float)
+    return eq / np.maximum.accumulate(eq, axis=-1) - 1
+
+
+def _group_starts(keys):
+    """정렬된 그룹 키 → (고유 키, 그룹 시작 인덱스)"""
+    uniq, starts = np.unique(keys, return_index=True)
+    order = np.argsort(starts)
+    return uniq[order], starts[order]
+
+
+def _segmented_cummax(values, group_id):
+    """그룹별 누적최고 (양수 값). 로그 + 그룹 오프셋으로 한 번의 accumulate로 계산"""
+    lv = np.log(values)
+    span = np.nanmax(lv) - np.nanmin(lv) + 1.0
+    shifted = lv + group_id * span
+    return np.exp(np.maximum.accumulate(shifted) - group_id * span)
+
+
+def period_table(eq, dates, freq="Y"):
+    """
+    기간별 (라벨, 수익률%, 구간 MDD%).
+    구간 수익률 = 구간 마지막 / 구간 첫 값 - 1 (print_performance 연도별과 동일)
+    2일 미만 구간은 제외.
+    """
+    eq = np.asarray(eq, dtype=float)
+    d = np.asarray(dates, dtype="M8[D]")
+    keys = d.astype("M8[Y]") if freq == "Y" else d.astype("M8[M]")
+    labels, starts = _group_starts(keys)
+    ends = np.append(starts[1:], len(eq)) - 1
+    group_id = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(eq))))
+
+    ret = (eq[ends] / eq[starts] - 1) * 100
+    dd = eq / _segmented_cummax(eq, group_id) - 1
+    mdd = np.minimum.reduceat(dd, starts) * 100
+
+    keep = (ends - starts) >= 1
+    return labels[keep], ret[keep], mdd[keep]
+
+
+def monthly_returns(eq, dates):
+    """월말 자산 기준 월별 수익률% (첫 달은 NaN) → (라벨, 수익률)"""
+    eq = np.asarray(eq, dtype=float)
+    keys = np.asarray(dates, dtype="M8[D]").astype("M8[M]")
+    labels, starts = _group_starts(keys)
+    last = eq[np.append(starts[1:], len(eq)) - 1]
+    ret = np.full(len(last), np.nan)
+    ret[1:] = (last[1:] / last[:-1] - 1) * 100
+    return labels, ret
+
+
+# ─── 거래 통계 ───────────────────────────────────────────────
+def as_trade_array(trade_log, pnl_scale=1.0):
+    """
+    dict 리스트 거래기록 → TRADE_DTYPE 배열.
+    pnl_scale: 기록의 pnl 단위 (퍼센트로 저장된 경우 100)
+    키 이름은 기존 스크립트들의 변형을 모두 받는다 (coin/symbol, dir/direction, ...).
+    """
+    if isinstance(trade_log, np.ndarray):
+        return trade_log
+    out = np.zeros(len(trade_log), dtype=TRADE_DTYPE)
+    if len(trade_log) == 0:
+        return out
+    out["entry_date"] = np.datetime64("NaT")
+    out["exit_date"] = np.datetime64("NaT")
+    for k, t in enumerate(trade_log):
+        d = t.get("direction", t.get("dir", "long"))
+        out[k]["coin"] = t.get("coin", t.get("symbol", ""))
+        out[k]["strat"] = t.get("strat", "")
+        out[k]["direction"] = -1 if d == "short" else 1
+        out[k]["reason"] = t.get("reason", "")
+        out[k]["pnl"] = t.get("pnl", 0.0) / pnl_scale
+        out[k]["held"] = t.get("held", 0)
+        out[k]["entry_price"] = t.get("entry_price", t.get("entry", np.nan))
+        out[k]["exit_price"] = t.get("exit_price", t.get("exit", np.nan))
+        out[k]["n_pos"] = t.get("n_pos", 0)
+        if t.get("entry_date"):
+            out[k]["entry_date"] = np.datetime64(t["entry_date"], "D")
+        if t.get("exit_date", t.get("date")):
+            out[k]["exit_date"] = np.datetime64(t.get("exit_date", t.get("date")), "D")
+    return out
+
+
+def _group_stats(codes, n_groups, pnl, win, held):
+    """그룹 코드별 건수/승수/평균손익/평균이익/평균손실/평균보유 (bincount 한 번씩)"""
+    cnt = np.bincount(codes, minlength=n_groups)
+    n_win = np.bincount(codes, weights=win, minlength=n_groups)
+    s_pnl = np.bincount(codes, weights=pnl, minlength=n_groups)
+    s_win = np.bincount(codes, weights=pnl * win, minlength=n_groups)
+    s_held = np.bincount(codes, weights=held, minlength=n_groups)
+    n_loss = cnt - n_win
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "count": cnt,
+            "wins": n_win.astype(int),
+            "win_rate": np.where(cnt > 0, n_win / cnt * 100, 0.0),
+            "pnl_sum": s_pnl,
+            "avg_pnl": s_pnl / cnt,
+            "avg_win": s_win / n_win,
+            "avg_loss": (s_pnl - s_win) / n_loss,
+            "avg_held": s_held / cnt,
+        }
+
+
+def trade_stats(trades, strat_keys=("A", "B", "C"), win_if_zero=False, reason_prefix=False):
+    """
+    trades: TRADE_DTYPE 배열 (또는 dict 리스트 → as_trade_array 변환)
+    win_if_zero: pnl == 0 을 승으로 셀지 (backtest.py는 >=, 동적 스크립트는 >)
+    reason_prefix: 청산사유를 첫 단어로 묶을지 ("SL -5.0%" → "SL")
+    반환 pnl 관련 값은 비율 단위. 해당 그룹에 거래가 없으면 평균은 NaN.
+    """
+    tr = as_trade_array(trades)
+    n = len(tr)
+    pnl = tr["pnl"].astype(float)
+    win = (pnl >= 0) if win_if_zero else (pnl > 0)
+    win = win.astype(float)
+    held = tr["held"].astype(float)
+
+    total = _group_stats(np.zeros(n, dtype=np.intp), 1, pnl, win, held)
+    out = {k: v[0] for k, v in total.items()}
+    out["n"] = n
+
+    strat_code = np.full(n, -1, dtype=np.intp)
+    for j, sk in enumerate(strat_keys):
+        strat_code[tr["strat"] == sk] = j
+    valid = strat_code >= 0
+    per = _group_stats(strat_code[valid], len(strat_keys), pnl[valid], win[valid], held[valid])
+    out["by_strat"] = {
+        sk: {k: v[j] for k, v in per.items()}
+        for j, sk in enumerate(strat_keys) if per["count"][j] > 0
+    }
+
+    reasons = tr["reason"]
+    if reason_prefix and n:
+        reasons = np.char.partition(reasons, " ")[:, 0]
+    r_keys, r_codes = np.unique(reasons, return_inverse=True) if n else (np.array([]), np.zeros(0, np.intp))
+    per_r = _group_stats(r_codes, len(r_keys), pnl, win, held)
+    out["by_reason"] = {str(r): {k: v[j] for k, v in per_r.items()} for j, r in enumerate(r_keys)}
+
+    # 전략 × 사유 건수 (건수 내림차순, 동률은 첫 등장 순)
+    for sk, st in out["by_strat"].items():
+        m = tr["strat"] == sk
+        rk, first, cnt = np.unique(tr["reason"][m], return_index=True, return_counts=True)
+        order = np.lexsort((first, -cnt))
+        st["reasons"] = {str(rk[j]): int(cnt[j]) for j in order}
+    return out
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+분봉 수집기 - linear USDT 종목 1m/5m 봉 → 분봉 저장소 (bt_engine.minute)
+====================================================================
+종목 × 월 청크로 쓴다. 끝난 달은 압축 청크(.npz), 진행 중인 달은 원본 열(.npy, mmap).
+  - 증분 동기화: 종목별 마지막 저장 봉 다음부터 이어 받는다 (중단 후 다시 실행하면 그대로 재개)
+  - 진행 중인 봉은 받지 않는다 (마지막 완결 봉까지)
+  - 페이지(1000봉)를 정방향으로 받아 달이 넘어갈 때마다 그 달을 저장 → 메모리는 종목당 한 달분
+  - 상장 전 구간은 launchTime으로 건너뜀, 여러 종목을 --workers 스레드로 (요청 속도는 --rate로 공용 제한)
+
+크기 (1m, 압축 청크): 종목-년당 약 525,600봉 × 가격/거래량 float32 5열.
+ts는 차분 압축으로 거의 0, float은 바이트 셔플 + deflate → 60종목 × 수년이 수 GB 안쪽.
+
+사용법:
+  python minute_ingest.py [--root minute_store] [--top 60 | --symbols BTCUSDT ETHUSDT ...]
+                          [--start 2023-01-01] [--interval 1] [--workers 4] [--rate 20]
+                          [--no-compress]
+  python minute_ingest.py --status [--root minute_store]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from bt_engine.minute import COLUMNS, month_key, month_names, read_month, write_month
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "minute_store")
+PAGE = 1000                       # get_kline 최대 limit
+EXCLUDE = {"USDCUSDT"}
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                    handlers=[logging.StreamHandler(sys.stdout)])
+log = logging.getLogger(__name__)
+
+
+# ─── 요청 속도 / 세션 ─────────────────────────────────────────
+class RateLimit:
+    """스레드 공용 초당 요청 수 제한"""
+
+    def __init__(self, per_sec):
+        self.interval = 1.0 / per_sec if per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            t = max(now, self._next)
+            self._next = t + self.interval
+        if t > now:
+            time.sleep(t - now)
+
+
+_local = threading.local()
+_stop = threading.Event()          # Ctrl+C → 작업 중인 종목은 받은 데까지 저장하고 멈춤
+
+
+def http_session():
+    """스레드별 pybit HTTP (공개 시세만, 인증 불필요)"""
+    s = getattr(_local, "session", None)
+    if s is None:
+        from pybit.unified_trading import HTTP
+        s = _local.session = HTTP()
+    return s
+
+
+# ─── 조회 ────────────────────────────────────────────────────
+def pick_symbols(session, top):
+    """24h 거래대금 상위 top개 USDT 퍼페추얼"""
+    tickers = session.get_tickers(category="linear")["result"]["list"]
+    usdt = [t for t in tickers if t["symbol"].endswith("USDT") and t["symbol"] not in EXCLUDE]
+    usdt.sort(key=lambda t: float(t.get("turnover24h", 0) or 0), reverse=True)
+    return [t["symbol"] for t in usdt[:top]]
+
+
+def launch_times(session):
+    """{종목: 상장 ms} — 상장 전 구간은 요청하지 않는다"""
+    items = session.get_instruments_info(category="linear")["result"]["list"]
+    return {it["symbol"]: int(it.get("launchTime", "0") or "0") for it in items}
+
+
+def fetch_page(session, symbol, interval, start_sec, limiter, retries=3):
+    """start_sec부터 최대 PAGE봉 → (ts int64 초, [open, high, low, close, volume] float64) 오름차순"""
+    step = interval * 60
+    for attempt in range(retries):
+        limiter.wait()
+        try:
+            r = session.get_kline(category="linear", symbol=symbol, interval=str(interval),
+                                  start=start_sec * 1000, end=(start_sec + PAGE * step) * 1000 - 1,
+                                  limit=PAGE)
+            rows = r["result"]["list"]
+            break
+        except Exception as e:
+            if attempt == retries - 1:
+                raise
+            log.warning(f"  {symbol} 재시도 {attempt + 1}: {e}")
+            time.sleep(2 ** attempt)
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty((0, 5))
+    arr = np.array(rows, dtype=np.float64)[::-1]   # 최신순 → 오름차순, 문자열 → float 한 번에
+    return (arr[:, 0] // 1000).astype(np.int64), arr[:, 1:6]
+
+
+# ─── 동기화 ──────────────────────────────────────────────────
+def last_ts(root, symbol):
+    """저장된 마지막 봉 ts (초) / None"""
+    for ym in reversed(month_names(root, symbol)):
+        cols = read_month(root, symbol, ym)
+        if cols is not None and len(cols["ts"]):
+            return int(cols["ts"][-1])
+    return None
+
+
+def _month_end(ym):
+    return int((np.datetime64(ym, "M") + 1).astype("M8[s]").astype(np.int64))
+
+
+def flush_month(root, symbol, ym, parts, complete, compress):
+    """받은 페이지 + 기존 원본(이전 실행의 진행 중인 달) 병합 → 끝난 달이면 압축 청크로"""
+    ts = np.concatenate([p[0] for p in parts])
+    vals = np.concatenate([p[1] for p in parts])
+    old = read_month(root, symbol, ym, mmap=False)
+    if old is not None and len(old["ts"]):
+        ts = np.concatenate([old["ts"], ts])
+        vals = np.concatenate([np.column_stack([old[k] for k in COLUMNS[1:]]), vals])
+    ts, idx = np.unique(ts[::-1], return_index=True)   # 같은 ts면 새로 받은 쪽
+    vals = vals[::-1][idx]
+    cols = {"ts": ts, **{k: vals[:, j] for j, k in enumerate(COLUMNS[1:])}}
+    write_month(root, symbol, ym, cols, compress=compress and complete)
+    return len(ts)
+
+
+def sync_symbol(session, root, symbol, start_sec, interval, limiter, launch_ms=0, compress=True):
+    """종목 1개 증분 동기화 → (새 봉 수, 저장한 달 수)"""
+    step = interval * 60
+    end = int(time.time()) // step * step          # 진행 중인 봉 시작 = 받을 구간 끝 (제외)
+    last = last_ts(root, symbol)
+    cursor = max(start_sec, launch_ms // 1000 // step * step)
+    if last is not None:
+        cursor = max(cursor, last + step)
+    n_new = n_months = 0
+    cur_ym, parts = None, []
+    try:
+        while cursor < end and not _stop.is_set():
+            ts, vals = fetch_page(session, symbol, interval, cursor, limiter)
+            keep = ts < end
+            ts, vals = ts[keep], vals[keep]
+            if not len(ts):
+                cursor += PAGE * step                # 빈 구간 (거래 중단 등) → 다음 페이지
+                continue
+            months = np.array([month_key(t) for t in ts[[0, -1]]])
+            for ym in np.unique(months):
+                if cur_ym is not None and ym != cur_ym:
+                    flush_month(root, symbol, cur_ym, parts, True, compress)
+                    n_months += 1
+                    parts = []
+                cur_ym = ym
+                sel = (ts >= np.datetime64(ym, "M").astype("M8[s]").astype(np.int64)) & (ts < _month_end(ym))
+                parts.append((ts[sel], vals[sel]))
+                n_new += int(sel.sum())
+            cursor = int(ts[-1]) + step
+    finally:
+        # 중단 / 오류여도 받은 만큼은 저장 → 다음 실행이 이어 받는다
+        if parts:
+            flush_month(root, symbol, cur_ym, parts, _month_end(cur_ym) <= end, compress)
+            n_months += 1
+    return n_new, n_months
+
+
+# ─── 현황 ────────────────────────────────────────────────────
+def _dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(path) for f in fs)
+
+
+def print_status(root):
+    if not os.path.isdir(root):
+        print(f"저장소 없음: {root}")
+        return
+    total = 0
+    rows = 0
+    print(f"{'종목':<14} {'달':>4} {'첫 봉':>17} {'마지막 봉':>17} {'MB':>8}")
+    for sym in sorted(os.listdir(root)):
+        months = month_names(root, sym)
+        if not months:
+            continue
+        first = read_month(root, sym, months[0])
+        last = read_month(root, sym, months[-1])
+        n = sum(len(read_month(root, sym, ym)["ts"]) for ym in months)
+        size = _dir_bytes(os.path.join(root, sym))
+        total += size
+        rows += n
+        fmt = lambda t: str(np.datetime64(int(t), "s")).replace("T", " ")[:16]
+        print(f"{sym:<14} {len(months):>4} {fmt(first['ts'][0]):>17} {fmt(last['ts'][-1]):>17} "
+              f"{size / 1e6:>8.1f}")
+    if rows:
+        print(f"합계: {rows:,}봉, {total / 1e9:.2f} GB ({total / rows:.1f} 바이트/봉)")
+
+
+# ─── 메인 ────────────────────────────────────────────────────
+def main(argv=None):
+    p = argparse.ArgumentParser(description="분봉 수집 → 분봉 저장소 (증분 / 재개 가능)")
+    p.add_argument("--root", default=ROOT)
+    p.add_argument("--symbols", nargs="+", help="종목 직접 지정 (기본: 거래대금 상위 --top)")
+    p.add_argument("--top", type=int, default=60)
+    p.add_argument("--start", default="2023-01-01", help="처음 받을 때 시작일 (UTC)")
+    p.add_argument("--interval", type=int, choices=(1, 5), default=1, help="분봉 간격")
+    p.add_argument("--workers", type=int, default=4, help="동시 종목 수")
+    p.add_argument("--rate", type=float, default=20, help="초당 요청 수 (전 스레드 합계)")
+    p.add_argument("--no-compress", action="store_true", help="끝난 달도 원본 열로 (전부 mmap)")
+    p.add_argument("--status", action="store_true", help="저장소 현황만 출력")
+    args = p.parse_args(argv)
+
+    if args.status:
+        print_status(args.root)
+        return
+
+    session = http_session()
+    symbols = args.symbols or pick_symbols(session, args.top)
+    launch = launch_times(session)
+    start_sec = int(np.datetime64(args.start, "s").astype(np.int64))
+    limiter = RateLimit(args.rate)
+    os.makedirs(args.root, exist_ok=True)
+    log.info(f"분봉 동기화: {len(symbols)}종목, {args.interval}분봉, {args.start}~ → {args.root}")
+
+    def job(sym):
+        t0 = time.time()
+        n, m = sync_symbol(http_session(), args.root, sym, start_sec, args.interval, limiter,
+                           launch.get(sym, 0), compress=not args.no_compress)
+        return sym, n, m, time.time() - t0
+
+    t0 = time.time()
+    total = 0
+    failed = []
+    ex = ThreadPoolExecutor(max_workers=args.workers)
+    futures = {ex.submit(job, s): s for s in symbols}
+    try:
+        for k, fut in enumerate(as_completed(futures), 1):
+            sym = futures[fut]
+            try:
+                _, n, m, sec = fut.result()
+            except Exception as e:
+                failed.append(sym)
+                log.error(f"[{k}/{len(symbols)}] {sym} 실패: {e} (다시 실행하면 이어 받음)")
+                continue
+            total += n
+            log.info(f"[{k}/{len(symbols)}] {sym}: +{n:,}봉 ({m}개월 저장) {sec:.0f}초")
+    except KeyboardInterrupt:
+        _stop.set()
+        log.warning("중단 — 받은 데까지 저장 후 종료 (다시 실행하면 이어 받음)")
+    finally:
+        ex.shutdown(wait=True, cancel_futures=True)
+    log.info(f"완료: +{total:,}봉, {time.time() - t0:.0f}초"
+             + (f", 실패 {len(failed)}종목 {failed}" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
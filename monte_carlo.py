@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+몬테카를로 강건성 - 백테스트 거래로 수만 개 경로를 만들어 CAGR / MDD / 회복기간 분포
+===================================================================================
+역사적 경로 하나로 라이브 파라미터를 정하면 거래 순서의 운까지 같이 고른 셈이다.
+bt_engine.run의 거래 배열(TRADE_DTYPE)을 거래당 자산 수익률(동적 1/n 복리)로 바꾼 뒤
+  bootstrap  거래 복원 추출 (거래 수 동일)
+  shuffle    순서만 섞기 (최종 수익 동일 → MDD / 회복기간만 달라짐)
+  block      블록 부트스트랩 (연속 block개 묶음 복원 추출 → 연속 손실 군집 보존)
+으로 [경로 수, 거래 수] 인덱스 행렬을 배치 단위로 만들어 로그 누적합 한 번에 계산한다.
+배치는 셀 MAX_CELLS개 이하, workers > 1이면 배치를 프로세스로 나눈다 (배치별 독립 시드).
+
+거래당 수익률 r = (pnl - 2·cost - funding) × leverage × (1 - cash_ratio) / n_pos
+  n_pos = 청산 시점 보유 수 (bt_engine 기록) → 라이브 일간 리포트 가상 NAV와 같은 1/n 복리
+  엔진 자산곡선이 있으면 scale_to로 배율 k를 맞춰 역사적 경로 최종 자산 = 엔진 최종 자산
+기간: 원래 거래 기간(첫 진입 ~ 마지막 청산)을 모든 경로에 그대로 써서 CAGR 연율화
+회복기간: 고점 이후 새 고점까지 가장 긴 구간 (거래 수 × 평균 거래 간격 = 일수).
+  끝까지 회복 못 한 경로는 끝까지의 길이, 비율은 underwater로 따로
+
+  r = trade_returns(trades, leverage=3, cash_ratio=0.5, cost=0.001)
+  res = simulate(r, trade_years(trades), n=20000, method="block")
+  summary(res) → {"cagr": {5: .., 50: .., 95: ..}, "mdd": ..., "recovery_days": ..., "p_loss", "underwater"}
+
+사용법:
+  python monte_carlo.py [--result bt_result.pkl | --synthetic 60x3] [--n 20000]
+                        [--method all|bootstrap|shuffle|block] [--block 10]
+                        [--leverage 3] [--cash 0.3] [--cost 0] [--workers 4] [--seed 42]
+"""
+import os
+import sys
+import time
+import pickle
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
+import metrics
+
+METHODS = ("bootstrap", "shuffle", "block")
+MAX_CELLS = 4_000_000          # 배치당 [경로 × 거래] 셀 수 (float64 기준 약 32MB씩 몇 개)
+QUANTILES = (5, 50, 95)
+RESULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bt_result.pkl")
+
+
+# ─── 입력 ────────────────────────────────────────────────────
+def trade_returns(trades, leverage=1.0, cash_ratio=0.0, cost=0.0):
+    """거래 배열 (또는 dict 리스트, pnl 비율) → 거래당 자산 수익률 (청산 순서)"""
+    t = metrics.as_trade_array(trades)
+    n_pos = np.maximum(t["n_pos"].astype(float), 1.0)
+    funding = t["funding"] if "funding" in t.dtype.names else 0.0   # 펀딩 필드 이전 결과 파일
+    r = (t["pnl"] - 2 * cost - funding) * leverage * (1 - cash_ratio) / n_pos
+    return np.maximum(r, -0.999999)   # 한 거래로 전액 손실은 log 불가 → 하한
+
+
+def scale_to(r, final_mult, iters=50):
+    """
+    엔진 자산곡선과 맞추기: prod(1 + k·r) = final_mult 인 가장 작은 k > 0 → (k·r, k)
+    n_pos 근사로 빠지는 것들 (진입 시점 보유 수, MDD 투입 시 현금 비율 0, 동시 보유 복리)을
+    배율 하나로 흡수 → 역사적 경로의 최종 자산이 엔진과 같아진다. 해가 없으면 (r, 1.0)
+    """
+    r = np.asarray(r, dtype=float)
+    target = np.log(final_mult) if final_mult > 0 else -np.inf
+    k_max = min(64.0, 0.999999 / -r.min()) if r.min() < 0 else 64.0   # 1 + k·r > 0 유지
+    grid = np.geomspace(1e-3, k_max, 400)
+    gap = np.log1p(grid[:, None] * r).sum(axis=1) - target   # log 성장은 k에 대해 오목
+    cross = np.flatnonzero(np.sign(gap[1:]) != np.sign(gap[:-1]))
+    if not np.isfinite(target) or not len(cross):
+        return r, 1.0
+    lo, hi = grid[cross[0]], grid[cross[0] + 1]
+    s_lo = np.sign(gap[cross[0]])
+    for _ in range(iters):
+        mid = (lo + hi) / 2
+        if np.sign(np.log1p(mid * r).sum() - target) == s_lo:
+            lo = mid
+        else:
+            hi = mid
+    k = (lo + hi) / 2
+    return r * k, float(k)
+
+
+def trade_years(trades):
+    """첫 진입 ~ 마지막 청산 (년, 365일 기준 - metrics.equity_stats와 동일)"""
+    t = metrics.as_trade_array(trades)
+    if not len(t):
+        return 0.0
+    days = (t["exit_date"].max() - t["entry_date"].min()).astype(int)
+    return max(int(days), 1) / 365
+
+
+# ─── 시뮬레이션 ──────────────────────────────────────────────
+def _indices(method, rng, n_paths, n, block):
+    if method == "shuffle":
+        return rng.permuted(np.broadcast_to(np.arange(n), (n_paths, n)), axis=1)
+    if method == "bootstrap":
+        return rng.integers(0, n, size=(n_paths, n))
+    if method == "block":
+        k = -(-n // block)
+        starts = rng.integers(0, n, size=(n_paths, k, 1))
+        return ((starts + np.arange(block)) % n).reshape(n_paths, -1)[:, :n]  # 원형 블록
+    raise ValueError(f"method: {method} (허용: {METHODS})")
+
+
+def path_stats(r, years):
+    """r: [경로, 거래] 거래당 수익률 → {"cagr", "mdd", "recovery", "underwater"} (경로별)"""
+    log_eq = np.cumsum(np.log1p(r), axis=1)
+    log_eq = np.concatenate([np.zeros((len(r), 1)), log_eq], axis=1)  # 시작 자산 1
+    peak = np.maximum.accumulate(log_eq, axis=1)
+    mdd = np.expm1((log_eq - peak).min(axis=1)) * 100
+    step = np.arange(log_eq.shape[1])
+    last_peak = np.maximum.accumulate(np.where(log_eq >= peak, step, 0), axis=1)
+    under = step - last_peak
+    cagr = np.expm1(log_eq[:, -1] / years) * 100 if years > 0 else np.full(len(r), np.nan)
+    return {"cagr": cagr, "mdd": mdd, "recovery": under.max(axis=1), "underwater": under[:, -1] > 0}
+
+
+def _run_batch(task):
+    method, r, years, n_paths, block, seed = task
+    rng = np.random.default_rng(seed)
+    return path_stats(r[_indices(method, rng, n_paths, len(r), block)], years)
+
+
+def simulate(r, years, n=20000, method="bootstrap", block=10, seed=42, workers=1, pool=None):
+    """
+    거래당 수익률 r로 n개 경로 → {"cagr", "mdd", "recovery_days", "underwater"} (길이 n 배열)
+    pool: 외부 multiprocessing Pool 재사용 (없으면 workers > 1일 때 생성)
+    """
+    r = np.asarray(r, dtype=float)
+    if len(r) == 0:
+        raise ValueError("거래 없음")
+    per = max(1, MAX_CELLS // len(r))
+    sizes = [min(per, n - s) for s in range(0, n, per)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(method, r, years, k, block, s) for k, s in zip(sizes, seeds)]
+    own_pool = None
+    if pool is None and workers > 1 and len(tasks) > 1:
+        pool = own_pool = mp.Pool(min(workers, len(tasks)))
+    try:
+        parts = pool.map(_run_batch, tasks) if pool is not None else [_run_batch(t) for t in tasks]
+    finally:
+        if own_pool is not None:
+            own_pool.close()
+            own_pool.join()
+    res = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    days_per_trade = years * 365 / len(r)
+    res["recovery_days"] = res.pop("recovery") * days_per_trade
+    return res
+
+
+def historical(r, years):
+    """원래 거래 순서 1개 경로 (비교 기준)"""
+    res = path_stats(np.asarray(r, dtype=float)[None, :], years)
+    res["recovery_days"] = res.pop("recovery") * years * 365 / len(r)
+    return {k: float(v[0]) for k, v in res.items()}
+
+
+def summary(res, q=QUANTILES):
+    """분위수 {지표: {분위: 값}} + 손실 확률 / 끝까지 미회복 비율 (%)"""
+    out = {k: dict(zip(q, np.percentile(res[k], q))) for k in ("cagr", "mdd", "recovery_days")}
+    out["p_loss"] = float((res["cagr"] < 0).mean() * 100)
+    out["underwater"] = float(res["underwater"].mean() * 100)
+    return out
+
+
+def robustness(trades, leverage=1.0, cash_ratio=0.0, cost=0.0, n=5000, method="block",
+               block=10, seed=42, final_mult=None):
+    """최적화 후보용 한 줄 요약: 블록 부트스트랩 CAGR p5 / MDD p5(나쁜 쪽) / 회복 p95 (일)"""
+    r = trade_returns(trades, leverage, cash_ratio, cost)
+    if final_mult is not None and len(r):
+        r, _ = scale_to(r, final_mult)
+    if len(r) < 2:
+        return {"mc_cagr_p5": np.nan, "mc_mdd_p5": np.nan, "mc_recovery_p95": np.nan}
+    res = simulate(r, trade_years(trades), n=n, method=method, block=block, seed=seed)
+    return {"mc_cagr_p5": float(np.percentile(res["cagr"], 5)),
+            "mc_mdd_p5": float(np.percentile(res["mdd"], 5)),
+            "mc_recovery_p95": float(np.percentile(res["recovery_days"], 95))}
+
+
+# ─── 출력 ────────────────────────────────────────────────────
+def print_report(results, hist, n_trades, years, k=None):
+    print("=" * 78)
+    print(f"  몬테카를로 강건성 — 거래 {n_trades}건, {years:.2f}년")
+    print("=" * 78)
+    if k is not None:
+        print(f"  자산곡선 보정 배율 k = {k:.3f} (역사적 경로 최종 자산 = 엔진)")
+    print(f"  역사적 경로: CAGR {hist['cagr']:+.1f}%  MDD {hist['mdd']:.1f}%  "
+          f"최장 회복 {hist['recovery_days']:.0f}일{' (미회복)' if hist['underwater'] else ''}")
+    print(f"\n  {'방법':<10} {'경로':>7} {'CAGR p5/p50/p95 (%)':>24} {'MDD p5/p50/p95 (%)':>24} "
+          f"{'회복 p50/p95 (일)':>18} {'손실%':>6} {'미회복%':>7}")
+    for method, (s, n, sec) in results.items():
+        c, m, rd = s["cagr"], s["mdd"], s["recovery_days"]
+        print(f"  {method:<10} {n:>7} {c[5]:>8.1f}{c[50]:>8.1f}{c[95]:>8.1f} "
+              f"{m[5]:>8.1f}{m[50]:>8.1f}{m[95]:>8.1f} {rd[50]:>9.0f}{rd[95]:>9.0f} "
+              f"{s['p_loss']:>6.1f} {s['underwater']:>7.1f}   ({sec:.2f}초)")
+
+
+def _synthetic_trades(spec, seed):
+    """--synthetic NxY: 합성 시장 + backtest_dynamic_v2 설정으로 거래 생성"""
+    import bt_engine
+    import backtest_dynamic_v2 as bv2
+    from bench.synth import make_market
+    n_sym, years = (int(x) for x in spec.lower().split("x"))
+    md = make_market(n_sym, years, seed)
+    y1 = md.dates[-1].year
+    universe, _ = bt_engine.annual_universe(md.close, md.volume, y1 - years + 1, y1,
+                                            top_n=60, exclude={"BTCUSDT", "ETHUSDT"})
+    sig = bt_engine.Signals(md, bt_engine.universe_coins(universe, md.close.columns))
+    _, equity, trades = bt_engine.run(sig, universe, bv2.STRATS, max_pos=bv2.MAX_POS,
+                                 leverage=bv2.LEVERAGE, cash_ratio=bv2.CASH_RATIO,
+                                 mdd_thresh=bv2.MDD_DEPLOY_THRESH, cost=bv2.COST_PER_SIDE,
+                                 initial_capital=bv2.INITIAL_CAPITAL, sizing="dynamic",
+                                 start=f"{y1 - years + 1}-01-01")
+    return trades, equity[-1] / bv2.INITIAL_CAPITAL
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="백테스트 거래 몬테카를로 (부트스트랩 / 셔플 / 블록)")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--result", default=RESULT_FILE, help="backtest*.py가 저장한 bt_result.pkl")
+    src.add_argument("--synthetic", metavar="NxY", help="합성 데이터로 거래 생성 (예: 60x3)")
+    ap.add_argument("--n", type=int, default=20000, help="방법별 경로 수")
+    ap.add_argument("--method", default="all", choices=("all",) + METHODS)
+    ap.add_argument("--block", type=int, default=10, help="블록 부트스트랩 블록 길이 (거래)")
+    ap.add_argument("--leverage", type=float, default=3)
+    ap.add_argument("--cash", type=float, default=0.30, help="현금 비율")
+    ap.add_argument("--cost", type=float, default=0.0, help="편도 비용 (비율)")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--no-calibrate", action="store_true", help="자산곡선 배율 보정 안 함 (n_pos 근사 그대로)")
+    args = ap.parse_args(argv)
+
+    if args.synthetic:
+        trades, final_mult = _synthetic_trades(args.synthetic, args.seed)
+    else:
+        if not os.path.exists(args.result):
+            sys.exit(f"결과 파일 없음: {args.result} (backtest.py / backtest_dynamic.py 먼저 실행)")
+        with open(args.result, "rb") as f:
+            saved = pickle.load(f)
+        trades = saved["trades"]
+        eq = [e["equity"] for e in saved.get("equity", [])]
+        final_mult = eq[-1] / eq[0] if len(eq) > 1 and eq[0] > 0 else None
+    r = trade_returns(trades, args.leverage, args.cash, args.cost)
+    k = None
+    if final_mult is not None and not args.no_calibrate and len(r):
+        r, k = scale_to(r, final_mult)
+    years = trade_years(trades)
+    if len(r) < 2:
+        sys.exit("거래 2건 미만 → 시뮬레이션 불가")
+
+    methods = METHODS if args.method == "all" else (args.method,)
+    results = {}
+    for method in methods:
+        t0 = time.perf_counter()
+        res = simulate(r, years, n=args.n, method=method, block=args.block, seed=args.seed,
+                       workers=args.workers)
+        results[method] = (summary(res), args.n, time.perf_counter() - t0)
+    print_report(results, historical(r, years), len(r), years, k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+멀티 계정 러너 - 여러 설정(서브계정 / 파라미터 세트)을 시세 조회 하나로 같이 돌린다
+================================================================================
+bybit_main_v2.py를 계정마다 따로 띄우면 같은 유니버스 일봉 / 티커 / 종목정보를 계정 수만큼 받는다.
+여기서는 봇 모듈을 계정마다 따로 로드하되 (상태 / 주문 / 리포트 / DB는 계정별)
+시세 조회는 SharedMarket 하나로 모아서 계정이 늘어도 API 호출 수가 거의 그대로다.
+
+  SharedMarket   공용 시세 세션: 회차(new_round) 안에서 get_kline / get_instruments_info는
+                 같은 조회 1번, get_tickers는 전 종목 스냅샷 1번 (TICKER_TTL초마다 갱신),
+                 scan_features(채널 계산)도 종목별 1번
+  AccountSession 계정 세션: 시세 메서드는 SharedMarket, 잔고 / 포지션 / 주문은 계정 자신의 키로
+
+설정 (JSON):
+  {
+    "base_dir": "/root/bybit_multi",          러너 로그 / schedule.json (계정 기본 디렉터리의 부모)
+    "accounts": [
+      {"name": "main", "base_dir": "/root/bybit_strategy",
+       "api_key_env": "BYBIT_API_KEY", "api_secret_env": "BYBIT_API_SECRET"},
+      {"name": "sub1", "api_key_env": "SUB1_KEY", "api_secret_env": "SUB1_SECRET",
+       "leverage": 3, "max_pos": 6, "cash_ratio": 0.3, "mdd_deploy_thresh": -0.3,
+       "strats": {"A": {"sl": 0.08}, "C": null},     전략별 덮어쓰기 (null = 전략 끔)
+       "tg_chat": "-100123", "db": "/root/bybit_multi/sub1/trading.db", "dry_run": false}
+    ]
+  }
+  키는 api_key / api_secret로 직접 넣을 수도 있다. 계정 base_dir 기본값 = {base_dir}/{name}
+  (state.json 위치). db: create_db.py 스키마로 만든 계정별 SQLite (없으면 DB 기록 안 함).
+  TESTNET / ENDPOINT는 환경변수로 전 계정 공통.
+
+사용법:
+  python multi_runner.py accounts.json              스케줄 실행 (봇과 같은 시각, UTC)
+  python multi_runner.py accounts.json --once       일간 체크 1회 후 종료
+  python multi_runner.py accounts.json --dry        드라이런 1회 (주문 없음)
+  python multi_runner.py accounts.json --status     계정별 보유 포지션
+"""
+import os
+import sys
+import copy
+import json
+import time
+import types
+import logging
+import argparse
+import threading
+import importlib.util
+from concurrent.futures import Future
+
+import bot_metrics
+import scheduler
+import timing
+from bybit_api import BybitAPI, HookedSession
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BOT_FILE = os.path.join(HERE, "bybit_main_v2.py")
+DB_FILE = os.path.join(HERE, "db_logger.py")
+
+TESTNET = os.environ.get("BYBIT_TESTNET", "0") == "1"
+ENDPOINT = os.environ.get("BYBIT_ENDPOINT", "")
+METRICS_PORT = int(os.environ.get("BYBIT_METRICS_PORT", "9108"))
+TICKER_TTL = 30  # 티커 스냅샷 유효 (초) — 리사이즈 대기 등으로 회차가 길어지면 다시 받는다
+
+MARKET_METHODS = ("get_kline", "get_tickers", "get_instruments_info")
+STRAT_FIELDS = ("name", "signal", "direction", "btc_filter", "sl", "tp", "hold_days",
+                "r2_thresh", "vol_mult")
+OVERRIDES = {"leverage": "LEVERAGE", "max_pos": "MAX_POS", "cash_ratio": "CASH_RATIO",
+             "mdd_deploy_thresh": "MDD_DEPLOY_THRESH"}
+
+log = logging.getLogger("multi_runner")
+
+_MISS = object()
+
+
+# ─── 공용 시세 ───────────────────────────────────────────────
+class SharedMarket:
+    """계정 공용 시세 세션 (pybit HTTP의 시세 메서드만). 한 회차 안에서 같은 조회는 한 번"""
+
+    def __init__(self, session, ticker_ttl=TICKER_TTL, clock=time.time):
+        self.session = session
+        self.ticker_ttl = ticker_ttl
+        self.clock = clock
+        self._lock = threading.RLock()
+        self.fetches = {}   # 메서드 → 실제 호출 수 (러너 시작 후 누적)
+        self.hits = 0       # 캐시 적중 수
+        self.new_round()
+
+    @property
+    def n_fetch(self):
+        with self._lock:
+            return sum(self.fetches.values())
+
+    def new_round(self):
+        """회차 시작 (워밍업 / 일간 체크) — 일봉 / 종목정보 / 채널 캐시 비움"""
+        with self._lock:
+            self._klines = {}    # (종목, interval) → (limit, 응답)  최신순이라 앞에서 자르면 된다
+            self._exact = {}     # (메서드, 파라미터) → 응답 (기간 지정 kline, 종목정보)
+            self._tickers = {}   # category → (시각, 응답, {종목: 티커})
+            self._memo = {}
+            self._inflight = {}  # key → Future (조회 중)
+
+    def _fetch(self, name, **kw):
+        with self._lock:
+            self.fetches[name] = self.fetches.get(name, 0) + 1
+        return getattr(self.session, name)(**kw)
+
+    def _once(self, key, table, fetch, lookup=None, store=None):
+        """
+        캐시 조회 → 없으면 fetch() 한 번. 락은 dict 조회 / 저장에만 잡고 fetch()는 락 밖에서
+        → 종목이 다른 조회는 동시에 진행, 같은 key를 동시에 놓친 호출은 먼저 시작한 조회를 기다린다.
+        lookup() / store(v): 락 안에서 실행 (기본: table[key]). 예외는 저장 안 함 (기다리던 호출도 같은 예외)
+        """
+        lookup = lookup or (lambda: table.get(key, _MISS))
+        store = store or (lambda v: table.__setitem__(key, v))
+        with self._lock:
+            v = lookup()
+            if v is not _MISS:
+                self.hits += 1
+                return v
+            inflight = self._inflight
+            fut = inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = inflight[key] = Future()
+        if not owner:
+            v = fut.result()
+            with self._lock:
+                self.hits += 1
+            return v
+        try:
+            v = fetch()
+        except BaseException as e:
+            with self._lock:
+                if inflight.get(key) is fut:
+                    del inflight[key]
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            store(v)
+            if inflight.get(key) is fut:
+                del inflight[key]
+        fut.set_result(v)
+        return v
+
+    def _cached(self, name, kw):
+        key = (name, tuple(sorted(kw.items())))
+        return self._once(key, self._exact, lambda: self._fetch(name, **kw))
+
+    def get_kline(self, **kw):
+        if "start" in kw or "end" in kw:
+            return self._cached("get_kline", kw)
+        key = (kw.get("symbol"), str(kw.get("interval", "D")))
+        limit = int(kw.get("limit", 200))
+        table = self._klines
+
+        def lookup():
+            have = table.get(key)
+            if have is None or have[0] < limit:
+                return _MISS
+            r = have[1]
+            return {**r, "result": {**r["result"], "list": r["result"]["list"][:limit]}}
+
+        def store(r):
+            have = table.get(key)
+            if have is None or have[0] < limit:
+                table[key] = (limit, r)
+
+        return self._once(("get_kline", *key, limit), table,
+                          lambda: self._fetch("get_kline", **kw), lookup, store)
+
+    def get_tickers(self, category="linear", symbol=None, **kw):
+        table = self._tickers
+
+        def lookup():
+            snap = table.get(category)
+            return snap if snap is not None and self.clock() - snap[0] <= self.ticker_ttl else _MISS
+
+        def fetch():
+            now = self.clock()
+            r = self._fetch("get_tickers", category=category, **kw)
+            return now, r, {t["symbol"]: t for t in r["result"]["list"]}
+
+        _, r, by_sym = self._once(("get_tickers", category), table, fetch, lookup,
+                                  lambda snap: table.__setitem__(category, snap))
+        if symbol is None:
+            return r
+        t = by_sym.get(symbol)
+        if t is None:  # 스냅샷 이후 상장 등 → 단건 조회
+            return self._fetch("get_tickers", category=category, symbol=symbol, **kw)
+        return {**r, "result": {**r["result"], "list": [t]}}
+
+    def get_instruments_info(self, **kw):
+        return self._cached("get_instruments_info", kw)
+
+    def memo(self, key, fn):
+        """회차 안에서 key별 fn() 결과 공유 (None도 저장, 예외는 저장 안 함). fn()은 락 밖에서"""
+        return self._once(("memo", key), self._memo, fn)
+
+    def summary(self):
+        calls = " · ".join(f"{k.replace('get_', '')} {v}" for k, v in sorted(self.fetches.items()))
+        return f"공용 시세: 실제 호출 {self.n_fetch}회 ({calls or '-'}) | 캐시 적중 {self.hits}회"
+
+
+class AccountSession:
+    """계정 세션: 시세 메서드는 SharedMarket으로, 나머지는 계정 자신의 pybit 세션으로"""
+
+    def __init__(self, own, shared):
+        self._own = own
+        self._shared = shared
+
+    def __getattr__(self, name):
+        if name in MARKET_METHODS:
+            return getattr(self._shared, name)
+        return getattr(self._own, name)
+
+
+class _Pacer:
+    """계정별 time 대용: 직전 sleep 이후 실제 시세 조회가 없었으면 1초 미만 대기(레이트리밋용)는 생략"""
+
+    def __init__(self, shared):
+        self.shared = shared
+        self._seen = -1
+        self.time = time.time
+        self.perf_counter = time.perf_counter
+        self.monotonic = time.monotonic
+
+    def sleep(self, sec):
+        n = self.shared.n_fetch
+        if sec < 1 and n == self._seen:
+            return
+        self._seen = n
+        time.sleep(sec)
+
+
+# ─── 계정 로드 ───────────────────────────────────────────────
+def _api_hook(endpoint, sec, error):
+    """실제 API 호출만 (캐시 적중 제외): 단계 타이밍 + Prometheus 메트릭"""
+    timing.api_call(endpoint, sec, error)
+    bot_metrics.api_call(endpoint, sec, error)
+
+
+def http_session(api_key="", api_secret=""):
+    """pybit HTTP (TESTNET / ENDPOINT 환경변수 반영)"""
+    from pybit.unified_trading import HTTP
+    session = HTTP(api_key=api_key, api_secret=api_secret, testnet=TESTNET)
+    if ENDPOINT:
+        session.endpoint = ENDPOINT.rstrip("/")
+    return session
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def merge_strats(base, overrides):
+    """기본 STRATS + 계정별 덮어쓰기 (None = 전략 제거, 새 전략은 필드 전부 필요)"""
+    strats = copy.deepcopy(base)
+    for sk, cfg in (overrides or {}).items():
+        if cfg is None:
+            strats.pop(sk, None)
+            continue
+        strats[sk] = {**strats.get(sk, {}), **cfg}
+        missing = [f for f in STRAT_FIELDS if f not in strats[sk]]
+        if missing:
+            raise ValueError(f"전략 {sk}: 필드 누락 {missing}")
+    return strats
+
+
+def load_account(cfg, shared, run_dir, session=None):
+    """
+    계정 설정 1개 → 봇 모듈 (bot_{name}, 자기 state.json / DB / 텔레그램 접두어)
+    session: 계정 세션 직접 지정 (기본: 설정의 키로 pybit HTTP)
+    """
+    name = cfg["name"]
+    base_dir = cfg.get("base_dir") or os.path.join(run_dir, name)
+    dry_run = bool(cfg.get("dry_run", False))
+    if session is None:
+        key = cfg.get("api_key") or os.environ.get(cfg.get("api_key_env", ""), "")
+        secret = cfg.get("api_secret") or os.environ.get(cfg.get("api_secret_env", ""), "")
+        if not (key and secret) and not dry_run:
+            raise ValueError(f"계정 {name}: API 키 없음 (api_key_env / api_secret_env 확인)")
+        session = http_session(key, secret)
+    session = HookedSession(session, _api_hook)
+
+    # 봇 상수(STATE_F 등)가 import 시점 환경변수로 정해지므로 계정마다 설정 후 로드
+    os.environ["BYBIT_BASE_DIR"] = base_dir
+    os.environ["BYBIT_DRY_RUN"] = "1" if dry_run else "0"
+    os.makedirs(base_dir, exist_ok=True)
+    bot = _load_module(f"bot_{name}", BOT_FILE)
+    if cfg.get("db"):
+        db = _load_module(f"db_logger_{name}", DB_FILE)
+        db.DB_PATH = cfg["db"]
+        bot.db_logger = db
+    else:  # 계정끼리 같은 DB를 쓰면 positions(종목 유일)가 섞이므로 지정한 계정만 기록
+        bot.db_logger = types.SimpleNamespace(
+            log_trade=lambda **k: None, upsert_position=lambda **k: None,
+            remove_position=lambda *a: None, log_timings=lambda *a: None)
+    bot.api = BybitAPI.from_session(AccountSession(session, shared))
+    bot.TURNOVER_F = os.path.join(run_dir, "turnover.npz")   # 시세 데이터 → 계정 공용
+    bot.INSTRUMENTS_DB = os.path.join(run_dir, "instruments.db")
+    bot.time = _Pacer(shared)
+    bot.DRY_RUN = dry_run
+    for k, attr in OVERRIDES.items():
+        if k in cfg:
+            setattr(bot, attr, type(getattr(bot, attr))(cfg[k]))
+    bot.STRATS = merge_strats(bot.STRATS, cfg.get("strats"))
+    if "tg_chat" in cfg:
+        bot.TG_GROUP_ID = str(cfg["tg_chat"])
+    send = bot.tg_send
+    bot.tg_send = lambda msg: send(f"[{name}] {msg}")
+
+    # 채널 계산은 시세만의 함수 → 계정 간 공유 (워밍업 부분합 경로도 결과는 같다)
+    scan = bot.scan_features
+    bot.scan_features = lambda sym, pre=None: shared.memo(("scan", sym), lambda: scan(sym, pre))
+    return bot
+
+
+def load_config(path):
+    with open(path, encoding="utf-8") as f:
+        conf = json.load(f)
+    names = [a["name"] for a in conf.get("accounts", [])]
+    if not names:
+        raise ValueError(f"{path}: accounts 비어있음")
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path}: 계정 이름 중복 {names}")
+    return conf
+
+
+# ─── 러너 ────────────────────────────────────────────────────
+class Runner:
+    def __init__(self, conf, public_session=None, sessions=None, dry_run=False):
+        """public_session: 공용 시세 세션 (기본 키 없는 pybit HTTP), sessions: {계정: 세션} 직접 지정"""
+        self.run_dir = conf.get("base_dir", "/root/bybit_multi")
+        os.makedirs(self.run_dir, exist_ok=True)
+        self.shared = SharedMarket(HookedSession(public_session or http_session(), _api_hook))
+        self.lock = threading.Lock()
+        self.bots = {}
+        sessions = sessions or {}
+        for cfg in conf["accounts"]:
+            if dry_run:
+                cfg = {**cfg, "dry_run": True}
+            bot = load_account(cfg, self.shared, self.run_dir, sessions.get(cfg["name"]))
+            self.bots[cfg["name"]] = bot
+            log.info(f"계정 {cfg['name']}: 레버리지={bot.LEVERAGE}x 슬롯={bot.MAX_POS} "
+                     f"현금={bot.CASH_RATIO*100:.0f}% 전략={','.join(bot.STRATS)} "
+                     f"{'드라이런 ' if bot.DRY_RUN else ''}→ {bot.STATE_F}")
+
+    def _each(self, job, new_round=False):
+        """계정마다 순서대로 job (한 계정 오류는 로그만 남기고 다음 계정 진행)"""
+        if new_round:
+            self.shared.new_round()
+        n0, h0 = self.shared.n_fetch, self.shared.hits
+        for name, bot in self.bots.items():
+            try:
+                getattr(bot, job)()
+            except Exception as e:
+                log.error(f"[{name}] {job} 오류: {e}", exc_info=True)
+        log.info(f"{job} {len(self.bots)}계정: 시세 호출 {self.shared.n_fetch - n0}회, "
+                 f"캐시 적중 {self.shared.hits - h0}회")
+
+    def warmup(self):
+        self._each("warmup", new_round=True)
+
+    def daily_check(self):
+        self._each("daily_check", new_round=True)
+
+    def monitor(self):
+        self._each("monitor")
+
+    def print_status(self):
+        for name, bot in self.bots.items():
+            log.info(f"[{name}]")
+            bot.print_status()
+
+    def run(self):
+        """봇 main()과 같은 스케줄 (시각은 첫 계정 봇 설정 = 환경변수 BYBIT_DAILY_AT 등)"""
+        first = next(iter(self.bots.values()))
+        if METRICS_PORT > 0:
+            try:
+                bot_metrics.start_server(METRICS_PORT)
+            except OSError as e:
+                log.warning(f"메트릭 서버 시작 실패 (port={METRICS_PORT}): {e}")
+        sched = scheduler.Scheduler(state_file=os.path.join(self.run_dir, "schedule.json"),
+                                    hook=first._job_hook)  # 로그 + 메트릭 (모듈 공용)
+        sched.daily("warmup", first.WARMUP_AT, self.warmup, lock=self.lock)
+        sched.daily("daily_check", first.DAILY_AT, self.daily_check, catch_up=True, lock=self.lock)
+        sched.daily("print_status", "00:10", self.print_status)
+        if first.MONITOR_MIN > 0:  # daily_check/warmup이 self.lock을 쥔 동안엔 회차를 건너뛴다
+            sched.every("monitor", first.MONITOR_MIN * 60, self.monitor, lock=self.lock,
+                        wait_lock=False)
+        self.print_status()
+        log.info("스케줄:")
+        for line in sched.summary():
+            log.info(f"  {line}")
+        try:
+            sched.run()
+        except KeyboardInterrupt:
+            sched.stop()
+            log.info(self.shared.summary())
+            log.info("종료")
+
+
+def setup_logging(run_dir, to_file=True):
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if to_file:
+        os.makedirs(run_dir, exist_ok=True)
+        handlers.insert(0, logging.FileHandler(os.path.join(run_dir, "multi.log"), encoding="utf-8"))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+                        handlers=handlers)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="멀티 계정 러너 (공용 시세 파이프라인)")
+    p.add_argument("config", help="계정 설정 JSON")
+    g = p.add_mutually_exclusive_group()
+    g.add_argument("--once", action="store_true", help="일간 체크 1회 후 종료")
+    g.add_argument("--dry", action="store_true", help="전 계정 드라이런 1회 (주문 없음)")
+    g.add_argument("--status", action="store_true", help="계정별 보유 포지션")
+    args = p.parse_args(argv)
+
+    conf = load_config(args.config)
+    setup_logging(conf.get("base_dir", "/root/bybit_multi"), to_file=not args.status)
+    runner = Runner(conf, dry_run=args.dry or args.status)  # --status는 키 없이도
+    if args.status:
+        runner.print_status()
+    elif args.once or args.dry:
+        runner.daily_check()
+        runner.print_status()
+        log.info(runner.shared.summary())
+    else:
+        runner.run()
+
+
+if __name__ == "__main__":
+    main()
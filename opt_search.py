@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+적응형 파라미터 탐색 - Successive Halving (vbt_optimize.run_opt 기반)
+====================================================================
+6단계 순차 스윕은 단계마다 이전 최적값을 고정하는 탐욕 탐색이라
+파라미터 간 상호작용을 놓친다. 여기서는 전체 결합 공간에서 무작위 샘플링 후
+짧은 기간 구간으로 싸게 평가 → 상위 1/eta만 남기고 구간을 늘려가며 재평가.
+
+  라운드 r: n_r = n // eta^r 개 설정, 평가 구간 비율 f_r = eta^(r-R+1)
+  R (라운드 수, 정수 연산) = n을 eta로 나눠 1개 이상 남는 동안, 단 첫 구간비율 ≥ 1/MIN_FRAC_DIV (27)
+  f_r < 1 이면 전체 기간에 고르게 배치한 SEGMENTS개 부분구간 평균 Calmar로 순위
+  마지막 라운드는 전체 기간 (staged 결과와 직접 비교 가능)
+
+기본값 (n=243, eta=3): 243@1/27 → 81@1/9 → 27@1/3 → 9@1
+  = 전체기간 실행 36회 분량 (6단계 스윕 ≈ 111회). 부분구간은 최소 MIN_SEG_DAYS일이라
+    기간이 짧으면 앞 라운드 구간비율이 실제로는 더 커진다 (3년 데이터 ≈ 55회 분량)
+현재 라이브 설정은 모든 라운드에 유지 → 1위는 항상 기준선 이상 (Calmar)
+--mc N: 상위 후보마다 거래 N경로 블록 부트스트랩 (monte_carlo) → CAGR p5 / MDD p5 / 회복 p95
+
+사용법:
+  python opt_search.py [--n 243] [--eta 3] [--workers 4] [--seed 42] [--pkl 경로] [--mc 5000]
+                       [--profile [접두어]] [--precision float32]
+"""
+import sys
+import math
+import time
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
+import profiling
+import monte_carlo
+import vbt_optimize as vo
+
+# ─── 탐색 공간 (6단계 스윕 그리드의 합집합) ──────────────────
+PARAM_SPACE = {
+    "a_sl": [-0.05, -0.07, -0.10, -0.12],
+    "a_tp": [0.15, 0.20, 0.25, 0.30, 0.40],
+    "a_hd": [3, 5, 7, 10, 14],
+    "a_vm": [1.0, 1.5, 2.0, 2.5, 3.0],
+    "b_sl": [-0.03, -0.05, -0.07, -0.10],
+    "b_tp": [0.10, 0.15, 0.20, 0.25],
+    "b_hd": [7, 10, 14, 20, 30],
+    "c_sl": [-0.08, -0.10, -0.12, -0.15, -0.20],
+    "c_tp": [0.15, 0.20, 0.25, 0.30],
+    "c_hd": [5, 7, 10, 14, 20],
+    "ab_r2": [0.3, 0.4, 0.5, 0.6, 0.7],
+    "max_pos": [3, 4, 5, 6],
+    "cash_ratio": [0.30, 0.40, 0.50, 0.60],
+    "leverage": [1, 2, 3, 4, 5],
+    "mdd_thresh": [-0.20, -0.25, -0.30, -0.35, -0.40, -0.50, None],
+}
+
+LIVE_PARAMS = {
+    "a_sl": -0.07, "a_tp": 0.25, "a_hd": 7, "a_vm": 1.5,
+    "b_sl": -0.05, "b_tp": 0.15, "b_hd": 14,
+    "c_sl": -0.15, "c_tp": 0.20, "c_hd": 10,
+    "ab_r2": 0.5,
+    "max_pos": 4, "cash_ratio": 0.50, "leverage": 3, "mdd_thresh": -0.35,
+}
+
+PORTFOLIO_KEYS = ("max_pos", "cash_ratio", "leverage", "mdd_thresh")
+SEGMENTS = 2       # 부분구간 평가 시 구간 수
+MIN_SEG_DAYS = 60  # 부분구간 최소 길이 (일)
+MIN_FRAC_DIV = 27  # 첫 라운드 구간비율 하한 1/27 (더 짧으면 Calmar가 잡음이라 순위가 무의미)
+
+
+# ─── 설정 → run_opt 호출 ─────────────────────────────────────
+def to_run_args(params):
+    """params(PARAM_SPACE 키) → (strats, run_opt 포트폴리오 kwargs)"""
+    strat_kw = {k: v for k, v in params.items()
+                if k not in PORTFOLIO_KEYS and k != "ab_r2"}
+    strat_kw["a_r2"] = params["ab_r2"]
+    strat_kw["b_r2"] = params["ab_r2"]
+    return vo.make_strats(**strat_kw), {k: params[k] for k in PORTFOLIO_KEYS}
+
+
+def evaluate(params, i_start=None, i_end=None, return_equity=False, return_trades=False):
+    """params(PARAM_SPACE 키) → run_opt 결과 dict"""
+    strats, kw = to_run_args(params)
+    return vo.run_opt(strats, i_start=i_start, i_end=i_end, return_equity=return_equity,
+                      return_trades=return_trades, **kw)
+
+
+def sample_configs(n, rng, space=PARAM_SPACE, seed_configs=(LIVE_PARAMS,)):
+    """결합 공간에서 중복 없이 n개 샘플 (seed_configs는 항상 포함)"""
+    configs = [dict(c) for c in seed_configs]
+    seen = {tuple(sorted(c.items(), key=lambda kv: kv[0])) for c in configs}
+    total = math.prod(len(v) for v in space.values())
+    n = min(n, total)
+    while len(configs) < n:
+        c = {k: vals[rng.integers(len(vals))] for k, vals in space.items()}
+        key = tuple(sorted(c.items(), key=lambda kv: kv[0]))
+        if key in seen:
+            continue
+        seen.add(key)
+        configs.append(c)
+    return configs
+
+
+def segment_windows(frac, first, last, n_seg=SEGMENTS):
+    """[first, last) 전체 기간 중 frac 비율을 n_seg개 부분구간으로 고르게 배치"""
+    total = last - first
+    if frac >= 1.0:
+        return [(first, last)]
+    seg_len = max(MIN_SEG_DAYS, int(total * frac / n_seg))
+    if seg_len * n_seg >= total:
+        return [(first, last)]
+    step = (total - seg_len) / (n_seg - 1) if n_seg > 1 else 0
+    return [(first + int(round(j * step)), first + int(round(j * step)) + seg_len)
+            for j in range(n_seg)]
+
+
+def _score_task(task):
+    """워커: (config idx, params, windows) → (idx, score, 마지막 구간 결과)"""
+    idx, params, windows = task
+    results = [evaluate(params, s, e) for s, e in windows]
+    score = float(np.mean([r["calmar"] for r in results]))
+    return idx, score, results[-1] if len(results) == 1 else None
+
+
+def _init_worker(pkl_file):
+    vo.prepare_data(pkl_file, verbose=False)
+
+
+# ─── Successive Halving ──────────────────────────────────────
+def n_rounds_for(n, eta, max_div=MIN_FRAC_DIV):
+    """라운드 수 (정수 연산, log 반올림 오차 없음): 243, 3 → 4 (243 → 81 → 27 → 9, 1/27 → 1)"""
+    rounds, k, div = 1, n, 1
+    while k // eta >= 1 and div * eta <= max_div:
+        k //= eta
+        div *= eta
+        rounds += 1
+    return rounds
+
+
+def successive_halving(n=243, eta=3, workers=1, seed=42, pkl_file=vo.PKL_FILE,
+                       i_start=None, i_end=None, space=PARAM_SPACE, verbose=True,
+                       pool=None):
+    """
+    결합 공간 Successive Halving.
+    i_start/i_end: 탐색 대상 기간 (워크포워드 학습구간 등). 기본 = 전체.
+    pool: 외부에서 만든 multiprocessing Pool 재사용 (없으면 workers>1일 때 생성)
+    반환: [(score, params, full_result), ...] 마지막 라운드 Calmar 내림차순
+    """
+    say = print if verbose else (lambda *a, **k: None)
+    vo.prepare_data(pkl_file, verbose=False)
+    first = max(80, vo.start_idx if i_start is None else i_start)
+    last = len(vo.dates) if i_end is None else min(i_end, len(vo.dates))
+
+    rng = np.random.default_rng(seed)
+    configs = sample_configs(n, rng, space)
+    n_seed = 1
+    n_rounds = n_rounds_for(len(configs), eta)
+    survivors = list(range(len(configs)))
+
+    own_pool = None
+    if pool is None and workers > 1:
+        own_pool = mp.Pool(workers, initializer=_init_worker, initargs=(pkl_file,))
+        pool = own_pool
+
+    full_results = {}
+    scores = {}
+    n_evals = 0.0
+    try:
+        for r in range(n_rounds):
+            frac = float(eta) ** (r - n_rounds + 1)
+            windows = segment_windows(frac, first, last)
+            tasks = [(ci, configs[ci], windows) for ci in survivors]
+            t0 = time.time()
+            out = pool.map(_score_task, tasks) if pool else [_score_task(t) for t in tasks]
+            for ci, score, full in out:
+                scores[ci] = score
+                if full is not None and windows == [(first, last)]:
+                    full_results[ci] = full
+            n_evals += len(tasks) * sum(e - s for s, e in windows) / (last - first)
+            survivors.sort(key=lambda ci: -scores[ci])
+            say(f"  라운드 {r+1}/{n_rounds}: {len(tasks)}개 × 구간비율 {frac:.3f} "
+                f"({len(windows)}구간) → 최고 Calmar {scores[survivors[0]]:.2f} "
+                f"({time.time()-t0:.1f}초)")
+            if r < n_rounds - 1:
+                kept = survivors[:max(1, len(survivors) // eta)]
+                # 기준 설정(seed)은 매 라운드 유지 → 최종 순위에 항상 비교 대상으로 남음
+                survivors = kept + [ci for ci in range(n_seed) if ci not in kept]
+    finally:
+        if own_pool is not None:
+            own_pool.close()
+            own_pool.join()
+
+    say(f"  총 평가량: 전체기간 실행 {n_evals:.1f}회 분량")
+    return [(scores[ci], configs[ci], full_results.get(ci)) for ci in survivors]
+
+
+# ─── 출력 ────────────────────────────────────────────────────
+def fmt_params(p):
+    mdd = "없음" if p["mdd_thresh"] is None else f"{p['mdd_thresh']:.0%}"
+    return (f"A SL{-p['a_sl']:.0%}/TP{p['a_tp']:.0%}/{p['a_hd']}일/vol{p['a_vm']:.1f}x | "
+            f"B SL{-p['b_sl']:.0%}/TP{p['b_tp']:.0%}/{p['b_hd']}일 | "
+            f"C SL{-p['c_sl']:.0%}/TP{p['c_tp']:.0%}/{p['c_hd']}일 | "
+            f"R²>{p['ab_r2']:.1f} | {p['max_pos']}슬롯/{p['cash_ratio']:.0%}현금/"
+            f"{p['leverage']}x/MDD {mdd}")
+
+
+def print_ranking(ranked, top=5):
+    print(f"\n{'순위':>4} {'CAGR':>9} {'MDD':>8} {'Sharpe':>8} {'Calmar':>8} {'거래':>5} {'승률':>5}")
+    print("-" * 70)
+    for k, (_, p, r) in enumerate(ranked[:top]):
+        print(f"{k+1:>4} {r['cagr']:>+8.1f}% {r['mdd']:>7.1f}% {r['sharpe']:>8.2f} "
+              f"{r['calmar']:>8.2f} {r['trades']:>5} {r['winrate']:>4.0f}%")
+        print(f"     {fmt_params(p)}")
+
+
+def print_robustness(ranked, n_paths, top=5, seed=42):
+    """상위 후보 몬테카를로 (거래 블록 부트스트랩, 엔진 최종 자산으로 배율 보정)"""
+    print(f"\n  ── 몬테카를로 강건성 (블록 부트스트랩 {n_paths}경로) ──")
+    print(f"{'순위':>4} {'CAGR':>9} {'CAGR p5':>9} {'MDD':>8} {'MDD p5':>8} {'회복 p95':>9}")
+    for k, (_, p, _) in enumerate(ranked[:top]):
+        t0 = time.time()
+        r = evaluate(p, return_equity=True, return_trades=True)
+        eq = r["equity"]
+        final_mult = eq[-1] / eq[0] if len(eq) > 1 and eq[0] > 0 else None
+        mc = monte_carlo.robustness(r["trade_log"], p["leverage"], p["cash_ratio"],
+                                    0.001, n=n_paths, seed=seed,      # run_opt 기본 편도 비용
+                                    final_mult=final_mult)
+        print(f"{k+1:>4} {r['cagr']:>+8.1f}% {mc['mc_cagr_p5']:>+8.1f}% {r['mdd']:>7.1f}% "
+              f"{mc['mc_mdd_p5']:>7.1f}% {mc['mc_recovery_p95']:>7.0f}일  ({time.time()-t0:.1f}초)")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Successive Halving 파라미터 탐색")
+    ap.add_argument("--n", type=int, default=243, help="초기 샘플 수")
+    ap.add_argument("--eta", type=int, default=3, help="라운드당 축소 배수")
+    ap.add_argument("--workers", type=int, default=max(1, mp.cpu_count() - 1))
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--pkl", default=vo.PKL_FILE)
+    ap.add_argument("--precision", choices=("float64", "float32"), default=vo.PRECISION,
+                    help="데이터 / 지표 보관 정밀도 (float32 = 메모리 약 절반)")
+    ap.add_argument("--mc", type=int, default=0, metavar="경로",
+                    help="상위 후보 몬테카를로 경로 수 (0이면 생략)")
+    ap.add_argument("--profile", nargs="?", const="opt_search", metavar="접두어",
+                    help="cProfile + 샘플링 스택 저장 (--workers 1 권장)")
+    args = ap.parse_args(argv)
+    prof = profiling.Profiler(args.profile).start() if args.profile else None
+
+    t0 = time.time()
+    print("=" * 70)
+    print("  Successive Halving 파라미터 탐색 - 바이비트 채널 돌파 전략")
+    print(f"  n={args.n}, eta={args.eta}, workers={args.workers}, seed={args.seed}")
+    print("=" * 70)
+    vo.set_precision(args.precision)
+    vo.prepare_data(args.pkl)
+
+    print("\n4. 기준선 (현재 라이브 설정)...")
+    profiling.phase("simulation")
+    baseline = evaluate(LIVE_PARAMS)
+    print(f"  CAGR: {baseline['cagr']:+.1f}%, MDD: {baseline['mdd']:.1f}%, "
+          f"Calmar: {baseline['calmar']:.2f}, Sharpe: {baseline['sharpe']:.2f}")
+
+    print("\n5. Successive Halving...")
+    ranked = successive_halving(args.n, args.eta, args.workers, args.seed, args.pkl)
+    profiling.phase("report")
+    print_ranking(ranked)
+    if args.mc:
+        print_robustness(ranked, args.mc, seed=args.seed)
+
+    best = ranked[0][2]
+    print(f"\n  ── 개선 (1위 vs 기준선) ──")
+    print(f"  CAGR:   {best['cagr'] - baseline['cagr']:+.1f}%p")
+    print(f"  MDD:    {best['mdd'] - baseline['mdd']:+.1f}%p")
+    print(f"  Calmar: {best['calmar'] - baseline['calmar']:+.2f}")
+    print(f"  Sharpe: {best['sharpe'] - baseline['sharpe']:+.2f}")
+    print("\n" + "=" * 70)
+    print(f"  완료! ({time.time()-t0:.1f}초)")
+    if prof:
+        prof.stop()
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    main()
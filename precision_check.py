@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+정밀도 점검 - float32 저메모리 모드가 float64와 같은 거래를 내는지 확인
+=====================================================================
+같은 데이터를 float64 / float32로 각각 올려 유니버스 → Signals → bt_engine.run을 돌리고
+  유니버스     연도별 종목 / 순서 동일
+  돌파 신호    raw 행렬 동일 (회귀 합산은 두 모드 모두 float64)
+  거래         종목 / 전략 / 사유 / 진입·청산 인덱스 동일, pnl / 최종 자산 차이는 float32 반올림 수준
+  메모리       데이터 + 지표 행렬 보관 바이트 (float32 ≈ 절반)
+을 비교한다. 라이브 설정 + 탐색 공간(opt_search.PARAM_SPACE) 무작위 --n개 설정.
+하나라도 거래가 다르면 종료 코드 1 (어느 설정 / 몇 번째 거래부터인지 출력).
+
+사용법:
+  python precision_check.py [--pkl 경로 | --synthetic 150x4] [--n 20] [--seed 42]
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+
+import bt_engine
+import vbt_optimize as vo
+from bt_engine import Signals, annual_universe, universe_coins
+from opt_search import LIVE_PARAMS, sample_configs, to_run_args
+
+MATCH_FIELDS = ("coin", "strat", "direction", "reason", "entry_idx", "exit_idx")
+PNL_TOL = 1e-5          # 거래당 pnl 절대 차이 허용 (float32 가격 반올림 ≈ 1e-7 상대)
+
+
+# ─── 준비 ────────────────────────────────────────────────────
+def prepare(md, dtype, start_year, end_year):
+    """MarketData → (md, universe, Signals, 준비 초) — prepare_data와 같은 순서"""
+    t0 = time.perf_counter()
+    md = md.astype(dtype)
+    universe, _ = annual_universe(md.close, md.volume, start_year, end_year,
+                                  top_n=vo.TOP_N, exclude=vo.EXCLUDE)
+    sig = Signals(md, universe_coins(universe, md.close.columns), dtype=dtype)
+    return md, universe, sig, time.perf_counter() - t0
+
+
+def backtest(sig, universe, params, start):
+    strats, kw = to_run_args(params)
+    _, equity, trades = bt_engine.run(sig, universe, strats, cost=0.001,
+                                      initial_capital=vo.INITIAL_CAPITAL, sizing="dynamic",
+                                      start=start, **kw)
+    return equity, trades
+
+
+# ─── 비교 ────────────────────────────────────────────────────
+def first_mismatch(a, b):
+    """거래 배열 두 개 → 처음 다른 거래 번호 / None (건수 다르면 짧은 쪽 길이)"""
+    n = min(len(a), len(b))
+    same = np.ones(n, dtype=bool)
+    for f in MATCH_FIELDS:
+        same &= a[f][:n] == b[f][:n]
+    same &= np.abs(a["pnl"][:n] - b["pnl"][:n]) <= PNL_TOL
+    bad = np.flatnonzero(~same)
+    if len(bad):
+        return int(bad[0])
+    return None if len(a) == len(b) else n
+
+
+def compare(ref, low, params, start):
+    eq64, tr64 = backtest(ref[2], ref[1], params, start)
+    eq32, tr32 = backtest(low[2], low[1], params, start)
+    k = first_mismatch(tr64, tr32)
+    n = min(len(tr64), len(tr32))
+    return {
+        "trades": len(tr64), "trades32": len(tr32), "mismatch": k,
+        "pnl_diff": float(np.abs(tr64["pnl"][:n] - tr32["pnl"][:n]).max()) if n else 0.0,
+        "final_diff": float(abs(eq32[-1] / eq64[-1] - 1)) if len(eq64) and eq64[-1] else 0.0,
+        "first": (tr64[k] if k is not None and k < len(tr64) else None,
+                  tr32[k] if k is not None and k < len(tr32) else None),
+    }
+
+
+# ─── 메인 ────────────────────────────────────────────────────
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="float32 저메모리 모드 거래 일치 점검")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--pkl", default=vo.PKL_FILE, help="mcap pickle (prepare_data와 같은 데이터)")
+    src.add_argument("--synthetic", metavar="NxY", help="합성 데이터 (예: 150x4)")
+    ap.add_argument("--n", type=int, default=20, help="비교할 설정 수 (라이브 설정 포함)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--start", default=vo.START_DATE, help="평가 시작일")
+    args = ap.parse_args(argv)
+
+    if args.synthetic:
+        from bench.synth import make_market
+        n_sym, years = (int(x) for x in args.synthetic.lower().split("x"))
+        md = make_market(n_sym, years, args.seed)
+        start = f"{md.dates[-1].year - years + 1}-01-01"
+    else:
+        md = bt_engine.load_mcap_pkl(args.pkl)
+        start = args.start
+    y0, y1 = int(start[:4]), md.dates[-1].year
+
+    print("=" * 70)
+    print(f"  정밀도 점검: float64 vs float32, {len(md)}종목 × {len(md.dates)}일, 설정 {args.n}개")
+    print("=" * 70)
+    ref = prepare(md, np.float64, y0, y1)
+    low = prepare(md, np.float32, y0, y1)
+    del md
+
+    ok = True
+    print(f"\n{'':<10} {'데이터':>10} {'지표':>10} {'합계':>10} {'준비':>8}")
+    for name, (m, _, s, sec) in (("float64", ref), ("float32", low)):
+        print(f"{name:<10} {m.nbytes / 1e6:>8.1f}MB {s.nbytes / 1e6:>8.1f}MB "
+              f"{(m.nbytes + s.nbytes) / 1e6:>8.1f}MB {sec:>7.2f}초")
+    ratio = (low[0].nbytes + low[2].nbytes) / (ref[0].nbytes + ref[2].nbytes)
+    print(f"float32 / float64 = {ratio * 100:.0f}%")
+
+    same_univ = ref[1] == low[1]
+    same_raw = all(np.array_equal(ref[2].raw[k], low[2].raw[k]) for k in ref[2].raw)
+    print(f"\n유니버스 동일: {'예' if same_univ else '아니오'}, 돌파 신호 동일: {'예' if same_raw else '아니오'}")
+    ok &= same_univ and same_raw
+
+    configs = sample_configs(args.n, np.random.default_rng(args.seed), seed_configs=(LIVE_PARAMS,))
+    print(f"\n{'설정':>4} {'거래':>6} {'일치':>6} {'pnl 최대차':>11} {'최종자산 차':>11}")
+    worst_pnl = worst_final = 0.0
+    for i, params in enumerate(configs):
+        r = compare(ref, low, params, start)
+        match = r["mismatch"] is None
+        ok &= match
+        worst_pnl = max(worst_pnl, r["pnl_diff"])
+        worst_final = max(worst_final, r["final_diff"])
+        label = "라이브" if i == 0 else str(i)
+        print(f"{label:>4} {r['trades']:>6} {'예' if match else '아니오':>6} "
+              f"{r['pnl_diff']:>11.2e} {r['final_diff']:>11.2e}")
+        if not match:
+            a, b = r["first"]
+            print(f"     {r['mismatch'] + 1}번째 거래부터 다름 (float64 {r['trades']}건 / float32 {r['trades32']}건)")
+            print(f"       float64: {a}")
+            print(f"       float32: {b}")
+
+    print(f"\n결과: {'거래 일치' if ok else '불일치 있음'} — pnl 최대 차이 {worst_pnl:.2e}, "
+          f"최종 자산 최대 상대 차이 {worst_final:.2e}, 메모리 {ratio * 100:.0f}%")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+프로파일링 - 백테스트 / 최적화 진입점의 --profile 옵션
+=====================================================
+결정적 프로파일(cProfile) + 샘플링 스택(메인 스레드, 기본 5ms 간격)을 함께 수집하고
+단계 타이머(timing.phase: data / universe / indicators / simulation / report)를 묶어 출력한다.
+
+  python backtest_dynamic_v2.py --profile            → ./backtest_dynamic_v2.prof / .collapsed
+  python backtest_dynamic_v2.py --profile=out/run1   → out/run1.prof / out/run1.collapsed
+  python opt_search.py --profile [접두어]
+
+  <접두어>.prof       pstats (python -m pstats, snakeviz)
+  <접두어>.collapsed  "f1;f2;f3 샘플수" 줄 형식 (flamegraph.pl, speedscope, inferno)
+
+워커 프로세스(opt_search / walk_forward의 --workers > 1)는 수집 대상이 아니다
+→ 최적화 경로를 보려면 --workers 1로 실행.
+"""
+import os
+import sys
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+import timing
+
+PHASE_LABELS = {
+    "data": "데이터 로드", "universe": "유니버스", "indicators": "지표",
+    "simulation": "시뮬레이션", "report": "리포트",
+}
+
+
+class Profiler:
+    def __init__(self, prefix, interval=0.005, top=25):
+        self.prefix = prefix
+        self.name = os.path.basename(prefix)
+        self.interval = interval
+        self.top = top
+        self.samples = Counter()
+        self._cp = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    # ── 수집 ──
+    def start(self):
+        self._tid = threading.get_ident()
+        timing.start(self.name, force=True)
+        self._thread = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self._thread.start()
+        self._cp = cProfile.Profile()
+        self._cp.enable()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._tid)
+            stack = []
+            while frame is not None:
+                co = frame.f_code
+                stack.append(f"{co.co_name} ({os.path.basename(co.co_filename)}:{co.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._cp.disable()
+        self._stop.set()
+        self._thread.join()
+        run = timing.finish()
+        self.report(run)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # ── 출력 ──
+    def report(self, run):
+        out_dir = os.path.dirname(os.path.abspath(self.prefix))
+        os.makedirs(out_dir, exist_ok=True)
+        prof_file = f"{self.prefix}.prof"
+        stack_file = f"{self.prefix}.collapsed"
+        self._cp.dump_stats(prof_file)
+        with open(stack_file, "w", encoding="utf-8") as f:
+            for stack, n in self.samples.most_common():
+                f.write(f"{stack} {n}\n")
+
+        print("\n" + "=" * 70)
+        print(f"  프로파일: {self.name}")
+        print("=" * 70)
+        if run is not None:
+            total = run.elapsed or 0.0
+            print(f"\n  단계별 (총 {total:.2f}초):")
+            for (kind, name), (calls, sec, _, _) in run.stats.items():  # 실행 순서
+                if kind != "phase":
+                    continue
+                pct = sec / total * 100 if total > 0 else 0
+                print(f"    {PHASE_LABELS.get(name, name):<10} {sec:9.2f}초  {pct:5.1f}%")
+
+        print(f"\n  상위 {self.top}개 함수 (누적 시간):")
+        pstats.Stats(self._cp, stream=sys.stdout).strip_dirs().sort_stats("cumulative").print_stats(self.top)
+        print(f"  샘플: {sum(self.samples.values())}개 ({self.interval*1000:.0f}ms 간격)")
+        print(f"  저장: {prof_file} (pstats), {stack_file} (flame graph)")
+
+
+def from_argv(name, argv=None):
+    """sys.argv에서 --profile[=접두어]를 꺼내 Profiler 반환 (없으면 None)"""
+    argv = sys.argv if argv is None else argv
+    for k, a in enumerate(argv):
+        if a == "--profile" or a.startswith("--profile="):
+            del argv[k]
+            return Profiler(a.split("=", 1)[1] if "=" in a else name)
+    return None
+
+
+def phase(name):
+    timing.phase(name)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+라이브 로직 리플레이 - 실제 daily_check를 가상 시계로 과거 구간에 돌려 백테스트와 비교
+====================================================================================
+백테스트 docstring의 "100% 동일 로직"을 라이브 코드 그대로 확인한다.
+  - 매일 봇의 DAILY_AT (가상 시계, UTC)에 bybit_main_v2.daily_check 실행
+    → close_pos / resize_positions / 진입 주문까지 실제 코드 경로
+  - 거래소는 sim.Exchange + LocalSession (네트워크 없음), 시장가는 직전 완결 봉 종가 체결
+  - time.sleep은 가상 시계만 전진, 텔레그램 / DB 기록은 끔, state.json은 임시 디렉터리
+  - 같은 데이터 + 봇 상수(레버리지/슬롯/현금비율/MDD, sizing="dynamic_resize")로
+    bt_engine.run을 돌려 거래 단위로 비교
+
+거래 키: (종목, 진입 봉 날짜). 라이브의 D일 DAILY_AT 진입 = 봉 D-1 종가 체결이므로
+라이브 기록 날짜를 하루 당겨 봉 날짜로 맞춘다. 비교 항목: 전략, 청산 봉, 청산 사유, 진입/청산가.
+거래가 하나라도 다르면 종료 코드 1 → 코드 변경마다 돌리는 회귀 확인용.
+
+알려진 차이 원인 (숨기지 않고 리포트에 그대로 나온다):
+  - 라이브 유니버스: 상장 150일 필터, 1월 1일 실행(봉 12/31)에서 새 해 유니버스로 교체
+  - 수량 단위 내림 / 최소수량 / $5 미만 리사이즈 생략 / 월간 리밸런싱 → 자산만 차이
+  - --partial-bar: 실거래소처럼 진행 중인 당일 봉이 kline 맨 끝에 붙는다 (봇은 완결 봉만 사용)
+--warmup: 매일 전날 WARMUP_AT에 워밍업도 실행 → 마감 봉 1개 + 부분합 경로를 검증 (워밍업 예외는 리플레이 실패)
+
+사용법:
+  python replay.py [--cache bt_cache.pkl | --columnar 디렉터리 | --mcap pkl | --synthetic 60x3]
+                   [--start 2024-01-01] [--end 2025-12-31] [--equity 10000] [--fee 0.00055]
+                   [--partial-bar] [--warmup] [--out replay_diff.csv] [--show 20] [--verbose]
+"""
+import os
+import sys
+import time
+import types
+import logging
+import argparse
+import tempfile
+import importlib
+
+import numpy as np
+import pandas as pd
+
+import bt_engine
+import metrics
+from bt_engine import Signals, annual_universe, universe_coins
+from bybit_api import BybitAPI
+import scheduler
+from sim import Exchange, LocalSession, VirtualClock
+from sim.server import load_market
+
+PRICE_TOL = 1e-9             # 진입/청산가 상대 오차 허용
+ONE_DAY = np.timedelta64(1, "D")
+
+
+# ─── 봇 로드 (가상 시계 / 시뮬레이터 API) ───────────────────
+def load_bot(base_dir, api, clock, verbose=False):
+    """bybit_main_v2를 임시 디렉터리로 import 후 시계/API/알림/DB를 교체"""
+    os.environ["BYBIT_BASE_DIR"] = base_dir
+    os.environ["BYBIT_DRY_RUN"] = "0"
+    sys.modules.pop("bybit_main_v2", None)
+    bot = importlib.import_module("bybit_main_v2")
+    bot.api = api
+    bot.DRY_RUN = False
+    bot.now_utc = clock.utc
+    bot.time = types.SimpleNamespace(time=clock.time, sleep=clock.sleep,
+                                     perf_counter=time.perf_counter, monotonic=time.monotonic)
+    bot.tg_send = lambda msg: None
+    bot.db_logger = types.SimpleNamespace(
+        log_trade=lambda **k: None, upsert_position=lambda **k: None,
+        remove_position=lambda *a: None, log_timings=lambda *a: None)
+    level = logging.INFO if verbose else logging.ERROR
+    bot.log.setLevel(level)
+    logging.getLogger("bybit_api").setLevel(level)
+    return bot
+
+
+def run_live(md, start, end, equity=10000.0, fee=0.00055, partial_bar=False,
+             verbose=False, warmup=False, say=print):
+    """
+    봉 [start, end] 각각에 대해 다음날 DAILY_AT에 daily_check 실행
+    → (봇 모듈, 봉 날짜, 자산 ndarray, 거래 TRADE_DTYPE, {연도: 유니버스}, 일평균 초)
+    """
+    clock = VirtualClock()
+    ex = Exchange(md, equity=equity, fee=fee, partial_bar=partial_bar, clock=clock.now_ms)
+    api = BybitAPI.from_session(LocalSession(ex))
+    bars = md.dates[(md.dates >= pd.Timestamp(start)) & (md.dates <= pd.Timestamp(end))]
+    eq = np.empty(len(bars))
+    universes = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bot = load_bot(tmp, api, clock, verbose)
+        update_universe = bot.update_universe
+
+        def record_universe(state, day=None):
+            u = update_universe(state, day)
+            universes.setdefault(int((day or bot.today_str())[:4]), list(u))
+            return u
+        bot.update_universe = record_universe
+        run_at = scheduler.parse_at(bot.DAILY_AT)
+        warm_at = scheduler.parse_at(bot.WARMUP_AT)
+
+        t0 = time.perf_counter()
+        for k, bar in enumerate(bars):
+            if warmup:
+                clock.set_day(bar, warm_at)
+                # warmup()은 예외를 삼키고 전체 조회로 넘어가므로 직접 호출 → 실패하면 리플레이 중단
+                bot._warm = bot._warmup()
+            clock.set_day(bar + pd.Timedelta(days=1), run_at)
+            bot.daily_check()
+            eq[k] = ex.equity()
+            if bar.day == 1 and bar.month == 1 and k:
+                say(f"  [{bar.date()}] 자산 ${eq[k]:,.0f} 주문 {len(ex.orders)}건")
+        per_day = (time.perf_counter() - t0) / max(1, len(bars))
+        state = bot.load_state()
+
+    trades = metrics.as_trade_array(state.get("trade_log", []), pnl_scale=100)
+    # 기록 날짜(실행일) → 봉 날짜
+    trades["exit_date"] -= ONE_DAY
+    trades["entry_date"] = trades["exit_date"] - trades["held"].astype("m8[D]")
+    return bot, bars, eq, trades, universes, per_day
+
+
+def run_backtest(md, bot, start, end, equity=10000.0, fee=0.00055):
+    """봇 상수 그대로 bt_engine.run → (날짜, 자산, 거래, 유니버스)"""
+    start_year, end_year = pd.Timestamp(start).year, pd.Timestamp(end).year
+    universe, _ = annual_universe(md.close, md.volume, start_year, end_year,
+                                  top_n=bot.TOP_N, exclude=bot.EXCLUDE)
+    sig = Signals(md, universe_coins(universe, md.close.columns))
+    dates, eq, trades = bt_engine.run(
+        sig, universe, bot.STRATS, max_pos=bot.MAX_POS, leverage=bot.LEVERAGE,
+        cash_ratio=bot.CASH_RATIO, mdd_thresh=bot.MDD_DEPLOY_THRESH, cost=fee,
+        initial_capital=equity, sizing="dynamic_resize", start=start, end=end,
+        btc_reason="BTC필터({filter})")
+    return dates, eq, trades, universe
+
+
+# ─── 비교 ────────────────────────────────────────────────────
+def _reason(r):
+    """"SL -7.2%" / "TIME 7일" → "SL" / "TIME" (BTC필터(bull)은 그대로)"""
+    return str(r).split(" ")[0]
+
+
+def _desc(t):
+    return (f"{t['strat']} {str(t['exit_date'])} {_reason(t['reason'])} "
+            f"{t['entry_price']:.6g}→{t['exit_price']:.6g}")
+
+
+def diff_trades(live, bt):
+    """(종목, 진입 봉) 기준 비교 → [{status, coin, entry_date, live, backtest, fields}]"""
+    def index(arr):
+        return {(str(t["coin"]), str(t["entry_date"])): t for t in arr}
+    L, B = index(live), index(bt)
+    rows = []
+    for key in sorted(set(L) | set(B), key=lambda k: (k[1], k[0])):
+        a, b = L.get(key), B.get(key)
+        fields = []
+        if a is None:
+            status = "백테스트만"
+        elif b is None:
+            status = "라이브만"
+        else:
+            if a["strat"] != b["strat"]:
+                fields.append("전략")
+            if a["exit_date"] != b["exit_date"]:
+                fields.append("청산일")
+            if _reason(a["reason"]) != _reason(b["reason"]):
+                fields.append("사유")
+            for f, name in (("entry_price", "진입가"), ("exit_price", "청산가")):
+                if abs(a[f] / b[f] - 1) > PRICE_TOL:
+                    fields.append(name)
+            status = "불일치" if fields else "일치"
+        rows.append({"status": status, "coin": key[0], "entry_date": key[1],
+                     "live": _desc(a) if a is not None else "",
+                     "backtest": _desc(b) if b is not None else "",
+                     "fields": ",".join(fields)})
+    return rows
+
+
+def diff_universe(live_u, bt_u):
+    """{연도: (라이브만, 백테스트만)} - 백테스트 연도 중 차이 있는 것만
+    (마지막 봉 12/31의 라이브 실행은 이미 다음 해 유니버스를 만들지만 비교 대상이 없다)"""
+    out = {}
+    for y in sorted(bt_u):
+        a, b = set(live_u.get(y, [])), set(bt_u.get(y, []))
+        if a != b:
+            out[y] = (sorted(a - b), sorted(b - a))
+    return out
+
+
+def print_report(rows, uni_diff, bars, live_eq, bt_dates, bt_eq, per_day, show=20):
+    counts = {}
+    for r in rows:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    n_live = sum(1 for r in rows if r["live"])
+    n_bt = sum(1 for r in rows if r["backtest"])
+
+    print("\n" + "=" * 70)
+    print("  리플레이 (라이브 daily_check) vs 백테스트 (bt_engine.run)")
+    print("=" * 70)
+    print(f"  기간: {bars[0].date()} ~ {bars[-1].date()} ({len(bars)}일), "
+          f"daily_check 평균 {per_day*1000:.1f}ms")
+    print(f"  거래: 라이브 {n_live}건 / 백테스트 {n_bt}건 → "
+          + " / ".join(f"{k} {counts.get(k, 0)}" for k in ("일치", "불일치", "라이브만", "백테스트만")))
+
+    k = np.searchsorted(bt_dates.values, bars.values)
+    ok = (k < len(bt_dates)) & (bt_dates.values[np.minimum(k, len(bt_dates) - 1)] == bars.values)
+    if ok.any():
+        dev = np.abs(live_eq[ok] / bt_eq[k[ok]] - 1)
+        print(f"  자산: 라이브 ${live_eq[-1]:,.0f} / 백테스트 ${bt_eq[-1]:,.0f} "
+              f"(최대 괴리 {dev.max()*100:.1f}%)")
+
+    if uni_diff:
+        print("\n  유니버스 차이 (연도: 라이브만 | 백테스트만)")
+        for y, (a, b) in uni_diff.items():
+            print(f"    {y}: {', '.join(a[:6]) or '-'}{' …' if len(a) > 6 else ''} | "
+                  f"{', '.join(b[:6]) or '-'}{' …' if len(b) > 6 else ''}")
+
+    bad = [r for r in rows if r["status"] != "일치"]
+    if bad:
+        # 한 번 어긋나면 슬롯/자산 경로가 달라져 이후 거래가 연쇄로 갈린다 → 첫 차이가 핵심
+        print(f"  첫 차이: {bad[0]['entry_date']} {bad[0]['coin']} ({bad[0]['status']})")
+        print(f"\n  차이 (처음 {min(show, len(bad))}/{len(bad)}건)")
+        print(f"    {'상태':<6} {'종목':<14} {'진입봉':<11} {'라이브':<40} 백테스트")
+        for r in bad[:show]:
+            print(f"    {r['status']:<6} {r['coin']:<14} {r['entry_date']:<11} "
+                  f"{r['live'] or '-':<40} {r['backtest'] or '-'}"
+                  + (f"  [{r['fields']}]" if r["fields"] else ""))
+    else:
+        print("\n  ✅ 거래 전부 일치")
+    print("=" * 70)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="라이브 daily_check 리플레이 + 백테스트 비교")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--columnar", help="save_columnar 디렉터리")
+    src.add_argument("--cache", help="bt_cache.pkl")
+    src.add_argument("--mcap", help="mcap pickle")
+    src.add_argument("--synthetic", default="60x3", help="합성 데이터 종목수x연수 (기본 60x3)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--start", help="첫 봉 (기본: 데이터 둘째 해 1월 1일)")
+    ap.add_argument("--end", help="마지막 봉 (기본: 데이터 끝)")
+    ap.add_argument("--equity", type=float, default=10000.0)
+    ap.add_argument("--fee", type=float, default=0.00055, help="편도 수수료 (양쪽 동일 적용)")
+    ap.add_argument("--partial-bar", action="store_true", help="진행 중인 당일 봉 포함 (실거래소 형태)")
+    ap.add_argument("--warmup", action="store_true", help="전날 워밍업 후 daily_check (선행 경로 검증)")
+    ap.add_argument("--out", help="거래 비교 CSV")
+    ap.add_argument("--show", type=int, default=20, help="출력할 차이 건수")
+    ap.add_argument("--verbose", action="store_true", help="봇 로그 INFO 출력")
+    args = ap.parse_args(argv)
+
+    md = load_market(args)
+    start = args.start or f"{md.dates[0].year + 1}-01-01"
+    end = args.end or str(md.dates[-1].date())
+    print(f"데이터: {len(md)}종목 × {len(md.dates)}일, 리플레이 {start} ~ {end}")
+
+    t0 = time.perf_counter()
+    bot, bars, live_eq, live_trades, live_u, per_day = run_live(
+        md, start, end, args.equity, args.fee, args.partial_bar, args.verbose, args.warmup)
+    print(f"  리플레이 완료: {time.perf_counter() - t0:.1f}초")
+
+    bt_dates, bt_eq, bt_trades, bt_u = run_backtest(md, bot, start, end, args.equity, args.fee)
+    rows = diff_trades(live_trades, bt_trades)
+    print_report(rows, diff_universe(live_u, bt_u), bars, live_eq, bt_dates, bt_eq,
+                 per_day, args.show)
+
+    if args.out:
+        pd.DataFrame(rows).to_csv(args.out, index=False, encoding="utf-8-sig")
+        print(f"비교 CSV: {args.out}")
+    return 0 if all(r["status"] == "일치" for r in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
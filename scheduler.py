@@ -0,0 +1,213 @@
+"""
+정시 스케줄러 - 힙 기반 이벤트 루프 (schedule 10초 폴링 대체)
+============================================================
+다음 실행 시각을 힙에 두고 그 시각까지 정확히 잠든다 (Event.wait → 초 단위 오차 없음).
+작업은 각자 스레드에서 돌고, 같은 작업은 겹쳐 실행하지 않는다 (실행 중이면 이번 회차 건너뜀)
+→ 긴 daily_check 도중에도 락 없는 작업(print_status)은 제시각에 돈다.
+  같은 락을 쓰는 monitor는 daily_check가 도는 동안 회차를 건너뛴다 (동시 감시 아님).
+
+  sched = Scheduler(state_file="schedule.json", hook=on_job)
+  sched.daily("daily_check", "00:00:15", daily_check, catch_up=True, lock=STATE_LOCK)
+  sched.every("monitor", 300, monitor, lock=STATE_LOCK, wait_lock=False)
+  sched.run()                     # 블로킹 (stop()으로 종료)
+
+시각은 모두 UTC. catch_up=True인 일간 작업은 마지막 정상 실행 시각을 state_file에 남기고,
+재시작 시 놓친 회차(가장 최근 예정 시각 > 마지막 실행)가 있으면 바로 한 번 실행한다.
+lock: 같은 락을 쓰는 작업끼리는 동시에 돌지 않는다 (state.json 공유 작업용).
+  wait_lock=False면 락이 잡혀 있을 때 기다리지 않고 이번 회차를 건너뛴다.
+  (예: daily_check가 STATE_LOCK을 쥔 동안의 monitor 틱은 전부 건너뜀 → 다음 주기에 다시 시도)
+hook(이름, 시작지연초, 소요초, 결과): 실행마다 콜백 ("ok" | "error" | "skipped")
+"""
+import json
+import time
+import heapq
+import logging
+import threading
+
+DAY = 86400
+
+log = logging.getLogger(__name__)
+
+
+def parse_at(at):
+    """"HH:MM" / "HH:MM:SS" → 자정 기준 초"""
+    parts = [int(p) for p in at.split(":")]
+    if len(parts) == 2:
+        parts.append(0)
+    h, m, s = parts
+    if not (0 <= h < 24 and 0 <= m < 60 and 0 <= s < 60):
+        raise ValueError(f"시각 형식 오류: {at}")
+    return h * 3600 + m * 60 + s
+
+
+class Job:
+    def __init__(self, name, fn, period, offset=0, catch_up=False, lock=None, wait_lock=True):
+        self.name = name
+        self.fn = fn
+        self.period = period      # 초 (일간 = DAY)
+        self.offset = offset      # 주기 내 위치 (일간: 자정 기준 초)
+        self.catch_up = catch_up
+        self.lock = lock
+        self.wait_lock = wait_lock
+        self.next_run = None
+        self.running = False
+        # 통계
+        self.runs = 0
+        self.errors = 0
+        self.skipped = 0
+        self.last_duration = None
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+
+    def due_after(self, t):
+        """t 이후 (t 제외) 첫 예정 시각"""
+        k = (t - self.offset) // self.period + 1
+        return k * self.period + self.offset
+
+    def due_before(self, t):
+        """t 이하 가장 최근 예정 시각"""
+        return (t - self.offset) // self.period * self.period + self.offset
+
+
+class Scheduler:
+    def __init__(self, state_file=None, hook=None, clock=time.time):
+        self.state_file = state_file
+        self.hook = hook
+        self.clock = clock
+        self.jobs = {}
+        self._heap = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = False
+        self._last = self._load()
+
+    # ─── 등록 ────────────────────────────────────────────────
+    def daily(self, name, at, fn, catch_up=False, lock=None, wait_lock=True):
+        """매일 UTC at ("HH:MM[:SS]")"""
+        job = Job(name, fn, DAY, parse_at(at), catch_up, lock, wait_lock)
+        now = self.clock()
+        first = job.due_after(now)
+        if catch_up:
+            missed = job.due_before(now)
+            last = self._last.get(name)
+            if last is None or last < missed:
+                first = now
+                log.info(f"스케줄 {name}: 놓친 회차 "
+                         f"{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(missed))} UTC → 즉시 실행")
+        return self._add(job, first)
+
+    def every(self, name, seconds, fn, lock=None, wait_lock=True):
+        """seconds 간격 (UTC 자정 기준 정렬: 300초면 :00, :05, ...)"""
+        job = Job(name, fn, seconds, 0, False, lock, wait_lock)
+        return self._add(job, job.due_after(self.clock()))
+
+    def _add(self, job, first):
+        with self._lock:
+            self.jobs[job.name] = job
+            self._push(job, first)
+        self._wake.set()
+        return job
+
+    def _push(self, job, t):
+        job.next_run = t
+        self._seq += 1
+        heapq.heappush(self._heap, (t, self._seq, job))
+
+    # ─── 루프 ────────────────────────────────────────────────
+    def run(self):
+        while not self._stop:
+            self._wake.clear()
+            with self._lock:
+                due_t = self._heap[0][0] if self._heap else None
+            now = self.clock()
+            if due_t is None or due_t > now:
+                self._wake.wait(None if due_t is None else due_t - now)
+                continue
+            with self._lock:
+                t, _, job = heapq.heappop(self._heap)
+                # 루프가 한참 밀렸으면 (절전 등) 밀린 회차는 몰아서 돌리지 않고 다음 정시로
+                self._push(job, job.due_after(now))
+            self._dispatch(job, t)
+
+    def stop(self):
+        self._stop = True
+        self._wake.set()
+
+    def _dispatch(self, job, due):
+        if job.running:
+            job.skipped += 1
+            log.warning(f"스케줄 {job.name}: 이전 실행 진행 중 → 이번 회차 건너뜀")
+            self._notify(job, 0.0, 0.0, "skipped")
+            return
+        job.running = True
+        threading.Thread(target=self._run_job, args=(job, due), name=f"job-{job.name}",
+                         daemon=True).start()
+
+    def _run_job(self, job, due):
+        t_start = self.clock()
+        lock = job.lock
+        try:
+            if lock is not None and not lock.acquire(blocking=job.wait_lock):
+                job.skipped += 1
+                log.info(f"스케줄 {job.name}: 공유 작업 실행 중 → 이번 회차 건너뜀")
+                self._notify(job, t_start - due, 0.0, "skipped")
+                return
+            t0 = time.perf_counter()
+            result = "ok"
+            try:
+                job.fn()
+            except Exception as e:
+                result = "error"
+                job.errors += 1
+                log.error(f"스케줄 {job.name} 오류: {e}", exc_info=True)
+            finally:
+                if lock is not None:
+                    lock.release()
+            dur = time.perf_counter() - t0
+            job.runs += 1
+            job.last_duration = dur
+            job.total_duration += dur
+            job.max_duration = max(job.max_duration, dur)
+            if job.catch_up and result == "ok":
+                self._last[job.name] = due
+                self._save()
+            self._notify(job, max(0.0, t_start - due), dur, result)
+        finally:
+            job.running = False
+
+    def _notify(self, job, delay, dur, result):
+        if self.hook is not None:
+            try:
+                self.hook(job.name, delay, dur, result)
+            except Exception as e:
+                log.warning(f"스케줄 hook 오류: {e}")
+
+    # ─── 상태 ────────────────────────────────────────────────
+    def _load(self):
+        if not self.state_file:
+            return {}
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                return {k: float(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        if not self.state_file:
+            return
+        try:
+            with open(self.state_file, "w", encoding="utf-8") as f:
+                json.dump(self._last, f)
+        except OSError as e:
+            log.warning(f"스케줄 상태 저장 실패: {e}")
+
+    def summary(self):
+        """작업별 한 줄: 다음 실행 / 실행 수 / 평균·최대 소요 / 오류·건너뜀"""
+        lines = []
+        for job in sorted(self.jobs.values(), key=lambda j: j.next_run or 0):
+            avg = job.total_duration / job.runs if job.runs else 0.0
+            nxt = time.strftime("%m-%d %H:%M:%S", time.gmtime(job.next_run)) if job.next_run else "-"
+            lines.append(f"{job.name}: 다음 {nxt} UTC | {job.runs}회 평균 {avg:.1f}초 최대 "
+                         f"{job.max_duration:.1f}초 | 오류 {job.errors} 건너뜀 {job.skipped}")
+        return lines
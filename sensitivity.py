@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+파라미터 민감도 히트맵 - 임의의 두 파라미터 2차원 격자 병렬 평가
+================================================================
+vbt_optimize의 1차원 표로는 고른 점이 고원(plateau) 위인지 뾰족한 봉우리(spike)인지 알 수 없다.
+두 파라미터를 격자로 훑어 지표 면(surface)을 파일로 남기고, 기준점 주변 안정성을 요약한다.
+
+파라미터 이름 (나머지는 기준값 고정):
+  전략 필드  {a,b,c}_{sl,tp,hd,r2,vm}   (vbt_optimize.make_strats 인자 = STRATS의 sl / tp /
+                                         hold_days / r2_thresh / vol_mult)
+  포트폴리오  max_pos, cash_ratio, leverage, mdd_thresh ("none" = MDD 투입 안 함)
+격자 지정:  이름=시작:끝:개수 (등간격)  또는  이름=v1,v2,...  (정수 파라미터는 반올림 후 중복 제거)
+
+- 지표/유니버스/신호는 vbt_optimize.prepare_data()로 워커당 한 번 (opt_search와 같은 초기화)
+- 격자 칸 하나 = run_opt 1회 (60종목 × 3년 기준 약 0.1초) → 50×50 = 2,500회, 워커 4개면 1~2분
+- 출력 ({out}/{x}__{y}.*):
+    .npz  x, y 값 + 지표별 [len(y), len(x)] 면 (cagr, mdd, calmar, sharpe, trades, winrate)
+    .csv  칸마다 한 줄 (x, y, 지표들)
+    _{지표}.png  히트맵 + 기준점 표시 (matplotlib 있을 때만)
+- 고원 판정: 기준점 값 vs 주변 (±radius칸) 평균/최솟값, 면 전체에서의 백분위
+
+사용법:
+  python sensitivity.py --x a_sl=-0.15:-0.03:25 --y a_tp=0.10:0.50:25
+                        [--set c_hd=14 max_pos=5] [--metric calmar] [--radius 2]
+                        [--start 2023-01-01] [--workers 4] [--pkl 경로] [--out sensitivity]
+                        [--precision float32]
+"""
+import os
+import sys
+import csv
+import time
+import inspect
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
+import vbt_optimize as vo
+import opt_search
+
+METRICS = ("cagr", "mdd", "calmar", "sharpe", "trades", "winrate")
+STRAT_KEYS = tuple(inspect.signature(vo.make_strats).parameters)
+# 라이브 운용값 (bybit_main_v2의 MAX_POS / CASH_RATIO / LEVERAGE / MDD_DEPLOY_THRESH — 봇은 import 시
+# pybit 연결 / 디렉터리 생성이 있어 직접 가져오지 않는다). 전략 필드 기본값은 make_strats = 봇 STRATS
+PORTFOLIO_BASE = {"max_pos": 4, "cash_ratio": 0.40, "leverage": 2, "mdd_thresh": -0.35}
+BASE_PARAMS = {**{k: p.default for k, p in inspect.signature(vo.make_strats).parameters.items()},
+               **PORTFOLIO_BASE}
+INT_KEYS = {"a_hd", "b_hd", "c_hd", "max_pos"}
+
+
+# ─── 격자 지정 ───────────────────────────────────────────────
+def _value(name, v):
+    if name == "mdd_thresh" and str(v).lower() == "none":
+        return None
+    return int(round(float(v))) if name in INT_KEYS else round(float(v), 10)
+
+
+def parse_axis(spec):
+    """"a_sl=-0.15:-0.03:25" / "max_pos=3,4,5" → (이름, 값 리스트)"""
+    name, _, body = spec.partition("=")
+    if name not in BASE_PARAMS:
+        raise ValueError(f"알 수 없는 파라미터: {name} (허용: {', '.join(BASE_PARAMS)})")
+    if not body:
+        raise ValueError(f"값 없음: {spec} (이름=시작:끝:개수 또는 이름=v1,v2,...)")
+    if ":" in body:
+        lo, hi, n = body.split(":")
+        vals = [_value(name, v) for v in np.linspace(float(lo), float(hi), int(n))]
+    else:
+        vals = [_value(name, v) for v in body.split(",")]
+    out = []
+    for v in vals:                       # 정수 반올림으로 생긴 중복 제거 (순서 유지)
+        if v not in out:
+            out.append(v)
+    return name, out
+
+
+def parse_sets(items):
+    """["c_hd=14", "mdd_thresh=none"] → {이름: 값}"""
+    out = {}
+    for it in items or ():
+        name, _, v = it.partition("=")
+        if name not in BASE_PARAMS:
+            raise ValueError(f"알 수 없는 파라미터: {name}")
+        out[name] = _value(name, v)
+    return out
+
+
+# ─── 평가 ────────────────────────────────────────────────────
+def evaluate(params):
+    """평면 파라미터 dict → run_opt 결과"""
+    strats = vo.make_strats(**{k: params[k] for k in STRAT_KEYS})
+    return vo.run_opt(strats, **{k: params[k] for k in PORTFOLIO_BASE})
+
+
+def _cell_task(task):
+    iy, ix, params = task
+    r = evaluate(params)
+    return iy, ix, [float(r[m]) for m in METRICS]
+
+
+def run_grid(x_name, xs, y_name, ys, base, workers=1, pkl_file=vo.PKL_FILE, say=print):
+    """격자 평가 → {지표: [len(ys), len(xs)] 배열}"""
+    vo.prepare_data(pkl_file, verbose=False)
+    tasks = [(iy, ix, {**base, x_name: x, y_name: y})
+             for iy, y in enumerate(ys) for ix, x in enumerate(xs)]
+    surf = np.full((len(METRICS), len(ys), len(xs)), np.nan)
+    t0 = time.time()
+    step = max(1, len(tasks) // 10)
+
+    def collect(it):
+        for k, (iy, ix, vals) in enumerate(it, 1):
+            surf[:, iy, ix] = vals
+            if k % step == 0 or k == len(tasks):
+                el = time.time() - t0
+                say(f"  {k}/{len(tasks)}칸 ({el:.0f}초, 남은 예상 {el / k * (len(tasks) - k):.0f}초)")
+
+    if workers > 1:
+        with mp.Pool(workers, initializer=opt_search._init_worker, initargs=(pkl_file,)) as pool:
+            chunk = max(1, len(tasks) // (workers * 16))
+            collect(pool.imap_unordered(_cell_task, tasks, chunksize=chunk))
+    else:
+        collect(map(_cell_task, tasks))
+    return {m: surf[j] for j, m in enumerate(METRICS)}
+
+
+# ─── 고원 판정 ───────────────────────────────────────────────
+def nearest(vals, v):
+    """축 값 리스트에서 v에 가장 가까운 칸 (None은 None끼리)"""
+    if v is None or None in vals:
+        return vals.index(v) if v in vals else None
+    return int(np.argmin([abs(a - v) for a in vals]))
+
+
+def plateau(z, iy, ix, radius=2):
+    """기준 칸 값 / 주변 (±radius칸, 기준 제외) 평균·최솟값 / 면 전체 백분위"""
+    v = z[iy, ix]
+    win = z[max(0, iy - radius):iy + radius + 1, max(0, ix - radius):ix + radius + 1].copy()
+    win[min(iy, radius), min(ix, radius)] = np.nan
+    finite = z[np.isfinite(z)]
+    return {"value": float(v),
+            "nbr_mean": float(np.nanmean(win)) if np.isfinite(win).any() else np.nan,
+            "nbr_min": float(np.nanmin(win)) if np.isfinite(win).any() else np.nan,
+            "pct": float((finite <= v).mean() * 100) if len(finite) else np.nan}
+
+
+# ─── 출력 ────────────────────────────────────────────────────
+def _fmt(v):
+    return "none" if v is None else f"{v:g}"
+
+
+def _axis_arr(vals):
+    return np.array([np.nan if v is None else v for v in vals], dtype=float)
+
+
+def save(out, x_name, xs, y_name, ys, surf):
+    """NPZ (면) + CSV (칸별) → 파일 경로 prefix"""
+    os.makedirs(out, exist_ok=True)
+    prefix = os.path.join(out, f"{x_name}__{y_name}")
+    np.savez(prefix + ".npz", x=_axis_arr(xs), y=_axis_arr(ys), x_name=x_name, y_name=y_name,
+             **surf)
+    with open(prefix + ".csv", "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow([x_name, y_name, *METRICS])
+        for iy, y in enumerate(ys):
+            for ix, x in enumerate(xs):
+                w.writerow(["none" if x is None else x, "none" if y is None else y,
+                            *(f"{surf[m][iy, ix]:.6g}" for m in METRICS)])
+    return prefix
+
+
+def plot(prefix, x_name, xs, y_name, ys, surf, metrics, base_cell=None):
+    """지표별 히트맵 PNG. matplotlib 없으면 건너뜀 → 만든 파일 목록"""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("  matplotlib 없음 → PNG 생략 (NPZ / CSV만)")
+        return []
+    files = []
+    for m in metrics:
+        z = surf[m]
+        fig, ax = plt.subplots(figsize=(max(6, len(xs) * 0.22 + 3), max(5, len(ys) * 0.2 + 2)))
+        lim = np.nanpercentile(z, [2, 98]) if np.isfinite(z).any() else (0, 1)
+        im = ax.imshow(z, origin="lower", aspect="auto", vmin=lim[0], vmax=lim[1],
+                       cmap="viridis" if m == "trades" else "RdYlGn")
+        fig.colorbar(im, ax=ax, label=m)
+        step_x = max(1, len(xs) // 12)
+        step_y = max(1, len(ys) // 12)
+        ax.set_xticks(range(0, len(xs), step_x), [_fmt(v) for v in xs[::step_x]], rotation=45)
+        ax.set_yticks(range(0, len(ys), step_y), [_fmt(v) for v in ys[::step_y]])
+        ax.set_xlabel(x_name)
+        ax.set_ylabel(y_name)
+        if base_cell is not None:
+            ax.plot(base_cell[1], base_cell[0], marker="*", color="black", markersize=14)
+        ax.set_title(f"{m}: {y_name} × {x_name}")
+        fig.tight_layout()
+        fp = f"{prefix}_{m}.png"
+        fig.savefig(fp, dpi=110)
+        plt.close(fig)
+        files.append(fp)
+    return files
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="2차원 파라미터 민감도 히트맵")
+    ap.add_argument("--x", required=True, help="가로축: 이름=시작:끝:개수 또는 이름=v1,v2,...")
+    ap.add_argument("--y", required=True, help="세로축 (형식 동일)")
+    ap.add_argument("--set", nargs="*", metavar="이름=값", help="고정 파라미터 변경 (기본: 라이브 설정 = bybit_main_v2 운용값)")
+    ap.add_argument("--metric", nargs="+", default=["calmar", "cagr", "mdd"], choices=METRICS,
+                    help="PNG로 그릴 지표")
+    ap.add_argument("--radius", type=int, default=2, help="고원 판정 주변 칸 수")
+    ap.add_argument("--start", default=vo.START_DATE, help="평가 시작일")
+    ap.add_argument("--workers", type=int, default=max(1, mp.cpu_count() - 1))
+    ap.add_argument("--pkl", default=vo.PKL_FILE)
+    ap.add_argument("--precision", choices=("float64", "float32"), default=vo.PRECISION,
+                    help="데이터 / 지표 보관 정밀도 (float32 = 메모리 약 절반)")
+    ap.add_argument("--out", default="sensitivity", help="출력 디렉터리")
+    args = ap.parse_args(argv)
+
+    try:
+        x_name, xs = parse_axis(args.x)
+        y_name, ys = parse_axis(args.y)
+        base = {**BASE_PARAMS, **parse_sets(args.set)}
+    except ValueError as e:
+        ap.error(str(e))
+    if x_name == y_name:
+        ap.error("--x와 --y는 서로 다른 파라미터여야 합니다")
+    vo.START_DATE = args.start   # 워커는 fork 시 그대로 물려받는다
+
+    t0 = time.time()
+    print("=" * 70)
+    print(f"  파라미터 민감도: {y_name}({len(ys)}) × {x_name}({len(xs)}) = {len(xs) * len(ys)}칸, "
+          f"workers={args.workers}")
+    print("=" * 70)
+    vo.set_precision(args.precision)
+    vo.prepare_data(args.pkl)
+    surf = run_grid(x_name, xs, y_name, ys, base, args.workers, args.pkl)
+    prefix = save(args.out, x_name, xs, y_name, ys, surf)
+
+    ix, iy = nearest(xs, base[x_name]), nearest(ys, base[y_name])
+    base_cell = (iy, ix) if ix is not None and iy is not None else None
+    files = plot(prefix, x_name, xs, y_name, ys, surf, args.metric, base_cell)
+
+    print(f"\n  ── 기준점 ({x_name}={base[x_name]}, {y_name}={base[y_name]}) 주변 ±{args.radius}칸 ──")
+    if base_cell is None:
+        print("  기준값이 격자 밖 → 생략")
+    else:
+        print(f"  (가장 가까운 칸: {x_name}={_fmt(xs[ix])}, {y_name}={_fmt(ys[iy])})")
+        print(f"  {'지표':<8} {'기준':>9} {'주변 평균':>10} {'주변 최소':>10} {'백분위':>7}")
+        for m in ("calmar", "cagr", "mdd", "sharpe"):
+            p = plateau(surf[m], iy, ix, args.radius)
+            print(f"  {m:<8} {p['value']:>9.2f} {p['nbr_mean']:>10.2f} {p['nbr_min']:>10.2f} "
+                  f"{p['pct']:>6.0f}%")
+    z = surf["calmar"]
+    if np.isfinite(z).any():
+        by, bx = np.unravel_index(np.nanargmax(z), z.shape)
+        p = plateau(z, by, bx, args.radius)
+        print(f"  격자 최고 Calmar {p['value']:.2f} @ {x_name}={_fmt(xs[bx])}, {y_name}={_fmt(ys[by])} "
+              f"(주변 평균 {p['nbr_mean']:.2f})")
+
+    print(f"\n  저장: {prefix}.npz, {prefix}.csv" + "".join(f", {os.path.basename(f)}" for f in files))
+    print(f"  완료! ({time.time() - t0:.1f}초)")
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    main()
@@ -0,0 +1,16 @@
+"""
+로컬 바이비트 거래소 시뮬레이터
+==============================
+  Exchange      가상 계정 + 일봉 시세 (시계 기반), 시장가 체결
+  LocalSession  pybit HTTP 대체 (프로세스 내 호출)
+  SimServer     V5 HTTP 서버 (python -m sim), Faults로 지연/레이트리밋/오류 주입
+  VirtualClock  리플레이용 가상 시계 (sleep = 시각만 전진)
+"""
+from sim.exchange import Exchange, SimError
+from sim.faults import Faults
+from sim.session import LocalSession, ENDPOINTS
+from sim.server import SimServer, start
+from sim.clock import VirtualClock
+
+__all__ = ["Exchange", "SimError", "Faults", "LocalSession", "ENDPOINTS", "SimServer", "start",
+           "VirtualClock"]
@@ -0,0 +1,28 @@
+"""
+가상 시계 - 리플레이용 (Exchange(clock=clock.now_ms) + 봇의 time/now_utc 대체)
+sleep()은 기다리지 않고 시각만 앞으로 민다 → 주문 간 60초 대기도 순식간.
+"""
+from datetime import datetime, timezone
+
+DAY_MS = 86400 * 1000
+
+
+class VirtualClock:
+    def __init__(self, ms=0):
+        self.ms = int(ms)
+
+    def now_ms(self):
+        return self.ms
+
+    def time(self):
+        return self.ms / 1000.0
+
+    def sleep(self, sec):
+        self.ms += int(sec * 1000)
+
+    def utc(self):
+        return datetime.fromtimestamp(self.ms / 1000.0, timezone.utc)
+
+    def set_day(self, ts, offset_sec=0):
+        """ts(pd.Timestamp, UTC 자정) + offset_sec 로 이동"""
+        self.ms = int(ts.value // 1_000_000) + int(offset_sec * 1000)
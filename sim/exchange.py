@@ -0,0 +1,284 @@
+"""
+가상 거래소 코어 - 바이비트 V5 linear 계정 1개 (단방향 모드, 시장가)
+==================================================================
+MarketData 일봉을 시계(now_ms)에 맞춰 보여주고, 시장가 주문을 마지막 종가에 체결한다.
+HTTP 서버(sim.server)와 프로세스 내 세션(sim.session)이 같은 코어를 쓴다.
+
+시계:
+  now_ms()가 가리키는 시각에 "완결된" 일봉만 보인다 (시가 + 1일 <= now).
+  partial_bar=True면 진행 중인 당일 봉(시가=고가=저가=종가=전일 종가, 거래량 0)도 포함
+  → 실거래소의 마감 직후 조회와 같은 형태.
+  shift_days: 데이터 날짜를 밀어서 제공 (예: 마지막 봉을 어제로 맞춰 실시간 봇에 물림)
+
+결과는 V5 응답의 result 부분 (dict), 실패는 SimError(retCode, retMsg).
+"""
+import math
+import time
+import uuid
+import threading
+
+import numpy as np
+
+DAY_MS = 86400 * 1000
+
+
+class SimError(Exception):
+    def __init__(self, code, msg):
+        super().__init__(f"{msg} (ErrCode: {code})")
+        self.code = code
+        self.msg = msg
+
+
+def _num(v):
+    return repr(float(v))
+
+
+def _qty_step(price):
+    """주문 단위: 1단위 명목가가 대략 $1~10이 되도록"""
+    return 10.0 ** math.floor(math.log10(10.0 / price)) if price > 0 else 1.0
+
+
+class Exchange:
+    def __init__(self, md, equity=10000.0, fee=0.00055, default_leverage=10,
+                 shift_days=0, partial_bar=False, clock=None):
+        self.symbols = [s for s in md.symbols if md.close[s].notna().any()]
+        self.col_of = {s: j for j, s in enumerate(self.symbols)}
+        self.open_ts = (md.dates.as_unit("ms").asi8 + shift_days * DAY_MS).astype(np.int64)
+        self.close = md.close[self.symbols].to_numpy(dtype=float)
+        self.volume = md.volume[self.symbols].to_numpy(dtype=float)
+        self.high = md.high[self.symbols].to_numpy(dtype=float) if md.high is not None else self.close
+        self.low = md.low[self.symbols].to_numpy(dtype=float) if md.low is not None else self.close
+        valid = ~np.isnan(self.close)
+        self.first = valid.argmax(axis=0)
+        self.partial_bar = partial_bar
+        self.fee = fee
+        self.default_leverage = default_leverage
+        self.clock = clock or (lambda: int(time.time() * 1000))
+
+        self.wallet = float(equity)
+        self.positions = {}   # sym → {"side", "size", "avg", "leverage"}
+        self.leverage = {}
+        self.orders = []      # 체결 기록
+        self.lock = threading.RLock()
+
+    # ─── 시계 / 가격 ─────────────────────────────────────────
+    def now_ms(self):
+        return self.clock()
+
+    def n_done(self, now=None):
+        """now 시점에 완결된 봉 수"""
+        now = self.now_ms() if now is None else now
+        return int(np.searchsorted(self.open_ts, now - DAY_MS, side="right"))
+
+    def last_price(self, sym):
+        """마지막 완결 봉 종가 (NaN 구간이면 직전 유효 종가)"""
+        j = self.col_of[sym]
+        n = self.n_done()
+        col = self.close[:n, j]
+        ok = np.flatnonzero(~np.isnan(col))
+        if not len(ok):
+            raise SimError(10001, f"symbol not listed yet: {sym}")
+        return float(col[ok[-1]])
+
+    def _col(self, sym):
+        j = self.col_of.get(sym)
+        if j is None:
+            raise SimError(10001, f"params error: symbol invalid ({sym})")
+        return j
+
+    def _listed(self, j, now):
+        return self.open_ts[self.first[j]] <= now
+
+    # ─── 시세 ────────────────────────────────────────────────
+    def kline(self, symbol, interval="D", limit=200, start=None, end=None, category="linear"):
+        if str(interval) != "D":
+            raise SimError(10001, f"params error: interval {interval} not supported (D only)")
+        j = self._col(symbol)
+        limit = max(1, min(int(limit or 200), 1000))
+        now = self.now_ms()
+        n = self.n_done(now)
+        c = self.close[:n, j]
+        idx = np.flatnonzero(~np.isnan(c))
+        opens = np.concatenate([c[idx[:1]], c[idx[:-1]]])  # 시가 = 전일 종가
+        ts = self.open_ts[idx]
+        keep = np.ones(len(idx), dtype=bool)
+        if start is not None:
+            keep &= ts >= int(start)
+        if end is not None:
+            keep &= ts <= int(end)
+        idx, opens = idx[keep][-limit:], opens[keep][-limit:]
+        rows = [(int(self.open_ts[k]), o, self.high[k, j], self.low[k, j], c[k], self.volume[k, j])
+                for k, o in zip(idx, opens)]
+        if (self.partial_bar and rows and n < len(self.open_ts) and self.open_ts[n] <= now
+                and (end is None or self.open_ts[n] <= int(end))):
+            p = c[idx[-1]]
+            rows.append((int(self.open_ts[n]), p, p, p, p, 0.0))
+        rows = rows[-limit:][::-1]  # 최신순
+        return {"symbol": symbol, "category": category, "list": [
+            [str(t), _num(o), _num(hi), _num(lo), _num(cl), _num(vol), _num(cl * vol)]
+            for t, o, hi, lo, cl, vol in rows]}
+
+    def tickers(self, symbol=None, category="linear"):
+        syms = [symbol] if symbol else self.symbols
+        now = self.now_ms()
+        out = []
+        for s in syms:
+            j = self._col(s)
+            if not self._listed(j, now):
+                if symbol:
+                    raise SimError(10001, f"params error: symbol invalid ({s})")
+                continue
+            n = self.n_done(now)
+            price = self.last_price(s)
+            vol = self.volume[n - 1, j] if n else 0.0
+            out.append({"symbol": s, "lastPrice": _num(price), "markPrice": _num(price),
+                        "volume24h": _num(0 if np.isnan(vol) else vol),
+                        "turnover24h": _num(0 if np.isnan(vol) else vol * price)})
+        return {"category": category, "list": out}
+
+    def instruments(self, category="linear", symbol=None, limit=500, cursor=None):
+        now = self.now_ms()
+        syms = [symbol] if symbol else self.symbols
+        items = []
+        for s in syms:
+            j = self._col(s)
+            if not self._listed(j, now):
+                continue
+            price = self.close[self.first[j], j]
+            step = _qty_step(price)
+            tick = 10.0 ** (math.floor(math.log10(price)) - 4)
+            items.append({
+                "symbol": s, "status": "Trading", "contractType": "LinearPerpetual",
+                "launchTime": str(int(self.open_ts[self.first[j]])),
+                "lotSizeFilter": {"minOrderQty": _num(step), "qtyStep": _num(step),
+                                  "maxOrderQty": _num(step * 1e7)},
+                "priceFilter": {"tickSize": _num(tick)},
+                "leverageFilter": {"minLeverage": "1", "maxLeverage": "50"},
+            })
+        # 실거래소와 같은 커서 페이징 (기본 500, 최대 1000)
+        limit = max(1, min(int(limit or 500), 1000))
+        off = int(cursor or 0)
+        page = items[off:off + limit]
+        nxt = str(off + limit) if off + limit < len(items) else ""
+        return {"category": category, "list": page, "nextPageCursor": nxt}
+
+    # ─── 계좌 ────────────────────────────────────────────────
+    def _upnl(self, sym, pos):
+        d = 1.0 if pos["side"] == "Buy" else -1.0
+        return d * (self.last_price(sym) - pos["avg"]) * pos["size"]
+
+    def _im(self, sym, pos):
+        return pos["size"] * self.last_price(sym) / pos["leverage"]
+
+    def equity(self):
+        with self.lock:
+            return self.wallet + sum(self._upnl(s, p) for s, p in self.positions.items())
+
+    def wallet_balance(self, accountType="UNIFIED", coin=None):
+        with self.lock:
+            upnl = sum(self._upnl(s, p) for s, p in self.positions.items())
+            im = sum(self._im(s, p) for s, p in self.positions.items())
+            eq = self.wallet + upnl
+            avail = max(0.0, eq - im)
+            return {"list": [{
+                "accountType": accountType,
+                "totalEquity": _num(eq), "totalWalletBalance": _num(self.wallet),
+                "totalMarginBalance": _num(eq), "totalAvailableBalance": _num(avail),
+                "totalPerpUPL": _num(upnl), "totalInitialMargin": _num(im),
+                "coin": [{"coin": "USDT", "equity": _num(eq), "walletBalance": _num(self.wallet),
+                          "availableToWithdraw": _num(avail), "unrealisedPnl": _num(upnl)}],
+            }]}
+
+    def position_list(self, category="linear", symbol=None, settleCoin=None, limit=200, cursor=None):
+        with self.lock:
+            out = []
+            for s, p in self.positions.items():
+                if symbol and s != symbol:
+                    continue
+                price = self.last_price(s)
+                out.append({
+                    "symbol": s, "side": p["side"], "size": _num(p["size"]),
+                    "avgPrice": _num(p["avg"]), "markPrice": _num(price),
+                    "positionValue": _num(p["size"] * price),
+                    "unrealisedPnl": _num(self._upnl(s, p)), "leverage": str(p["leverage"]),
+                })
+            return {"category": category, "list": out, "nextPageCursor": ""}
+
+    # ─── 주문 ────────────────────────────────────────────────
+    def set_leverage(self, symbol, buyLeverage, sellLeverage=None, category="linear"):
+        self._col(symbol)
+        lev = int(float(buyLeverage))
+        with self.lock:
+            if self.leverage.get(symbol, self.default_leverage) == lev:
+                raise SimError(110043, "leverage not modified")
+            self.leverage[symbol] = lev
+            if symbol in self.positions:
+                self.positions[symbol]["leverage"] = lev
+        return {}
+
+    def place_order(self, symbol, side, qty, orderType="Market", reduceOnly=False,
+                    category="linear", **kwargs):
+        if orderType != "Market":
+            raise SimError(10001, "params error: only Market orders are simulated")
+        if side not in ("Buy", "Sell"):
+            raise SimError(10001, f"params error: side invalid ({side})")
+        j = self._col(symbol)
+        if not self._listed(j, self.now_ms()):
+            raise SimError(10001, f"params error: symbol invalid ({symbol})")
+        q = float(qty)
+        step = _qty_step(self.close[self.first[j], j])
+        if q < step * (1 - 1e-9):
+            raise SimError(10001, "The number of contracts exceeds minimum limit allowed")
+        if isinstance(reduceOnly, str):
+            reduceOnly = reduceOnly.lower() == "true"
+
+        with self.lock:
+            price = self.last_price(symbol)
+            pos = self.positions.get(symbol)
+            lev = self.leverage.get(symbol, self.default_leverage)
+            if reduceOnly:
+                if pos is None or pos["side"] == side:
+                    raise SimError(110017, "current position is zero, cannot fix reduce-only order qty")
+                q = min(q, pos["size"])
+            elif pos is None or pos["side"] == side:
+                # 신규/추가 → 증거금 확인
+                im_now = sum(self._im(s, p) for s, p in self.positions.items())
+                if self.equity() - im_now < q * price / lev:
+                    raise SimError(110007, "ab not enough for new order")
+
+            self.wallet -= q * price * self.fee
+            if pos is None:
+                self.positions[symbol] = {"side": side, "size": q, "avg": price, "leverage": lev}
+            elif pos["side"] == side:
+                size = pos["size"] + q
+                pos["avg"] = (pos["avg"] * pos["size"] + price * q) / size
+                pos["size"] = size
+            else:
+                closed = min(q, pos["size"])
+                d = 1.0 if pos["side"] == "Buy" else -1.0
+                self.wallet += d * (price - pos["avg"]) * closed
+                pos["size"] -= closed
+                rest = q - closed
+                if pos["size"] <= 1e-12:
+                    del self.positions[symbol]
+                    if rest > 1e-12:
+                        self.positions[symbol] = {"side": side, "size": rest, "avg": price, "leverage": lev}
+
+            oid = uuid.uuid4().hex
+            self.orders.append({"orderId": oid, "symbol": symbol, "side": side, "qty": q,
+                                "price": price, "reduceOnly": bool(reduceOnly), "time": self.now_ms()})
+        return {"orderId": oid, "orderLinkId": kwargs.get("orderLinkId", "")}
+
+    def place_batch_order(self, request, category="linear"):
+        """→ (result, retExtInfo) 건별 성공/실패"""
+        out, info = [], []
+        for req in request:
+            req = {k: v for k, v in req.items() if k != "category"}
+            try:
+                r = self.place_order(category=category, **req)
+                out.append({"category": category, "symbol": req.get("symbol"), **r})
+                info.append({"code": 0, "msg": "OK"})
+            except SimError as e:
+                out.append({"category": category, "symbol": req.get("symbol"), "orderId": "", "orderLinkId": ""})
+                info.append({"code": e.code, "msg": e.msg})
+        return {"list": out}, {"list": info}
@@ -0,0 +1,63 @@
+"""
+장애 주입 - 지연 / 레이트리밋 / 오류
+====================================
+  Faults(latency_ms=80, jitter_ms=30, rate=10, burst=20, error_rate=0.02,
+         error_endpoints={"place_order"}, seed=1)
+  faults.before("get_kline")  → 지연 후 통과, 또는 SimError(10006 / 10016)
+
+레이트리밋은 엔드포인트별 토큰 버킷 (rate 초당, burst 최대 보유).
+10006 응답에는 실거래소처럼 X-Bapi-Limit-* 헤더 값을 같이 준다 (pybit 재시도용).
+"""
+import time
+import random
+import threading
+
+from sim.exchange import SimError
+
+
+class Faults:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, rate=0.0, burst=None,
+                 error_rate=0.0, error_endpoints=None, seed=None):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.error_rate = error_rate
+        self.error_endpoints = set(error_endpoints) if error_endpoints else None
+        self.rng = random.Random(seed)
+        self._buckets = {}   # endpoint → [토큰, 마지막 갱신 시각]
+        self._lock = threading.Lock()
+        self.injected = {"rate_limited": 0, "errors": 0}
+
+    def limit_status(self, endpoint):
+        """(limit, 남은 토큰, 다음 토큰 시각 ms) - 레이트리밋 없으면 None"""
+        if self.rate <= 0:
+            return None
+        tokens, _ = self._buckets.get(endpoint, (self.burst, 0))
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+        return int(self.burst), int(tokens), int((time.time() + wait) * 1000)
+
+    def _take(self, endpoint):
+        now = time.monotonic()
+        with self._lock:
+            b = self._buckets.get(endpoint)
+            if b is None:
+                b = self._buckets[endpoint] = [self.burst, now]
+            b[0] = min(self.burst, b[0] + (now - b[1]) * self.rate)
+            b[1] = now
+            if b[0] < 1:
+                return False
+            b[0] -= 1
+            return True
+
+    def before(self, endpoint):
+        delay = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if self.rate > 0 and not self._take(endpoint):
+            self.injected["rate_limited"] += 1
+            raise SimError(10006, "Too many visits. Exceeded the API Rate Limit.")
+        if self.error_rate > 0 and (self.error_endpoints is None or endpoint in self.error_endpoints):
+            if self.rng.random() < self.error_rate:
+                self.injected["errors"] += 1
+                raise SimError(10016, "Internal server error (injected)")
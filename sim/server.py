@@ -0,0 +1,169 @@
+"""
+바이비트 V5 HTTP 시뮬레이터 서버
+================================
+BybitAPI가 쓰는 엔드포인트(kline, tickers, instruments-info, wallet-balance,
+position/list, set-leverage, order/create, order/create-batch)를 로컬에서 응답한다.
+서명/키는 검사하지 않는다 (pybit는 비공개 엔드포인트에 키가 있어야 하므로 아무 값이나 설정).
+
+  python -m sim --cache bt_cache.pkl --port 8090 --latency-ms 80 --rate 10 --error-rate 0.02
+  BYBIT_ENDPOINT=http://127.0.0.1:8090 BYBIT_API_KEY=x BYBIT_API_SECRET=x python bybit_main_v2.py --dry
+
+데이터: --columnar 디렉터리 | --cache bt_cache.pkl | --mcap pkl | --synthetic 60x3
+기본으로 마지막 봉이 어제(UTC)가 되도록 날짜를 민다 (--no-shift로 끔).
+"""
+import sys
+import json
+import time
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from sim.exchange import Exchange, SimError
+from sim.faults import Faults
+from sim.session import ENDPOINTS, PATHS, dispatch, envelope
+
+
+class SimServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, exchange, faults=None, verbose=False):
+        super().__init__(addr, _Handler)
+        self.exchange = exchange
+        self.faults = faults
+        self.verbose = verbose
+        self.counts = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _handle(self, method):
+        srv = self.server
+        url = urlsplit(self.path)
+        name = PATHS.get(url.path)
+        if name is None or ENDPOINTS[name][0] != method:
+            self._send(404, {"retCode": 10001, "retMsg": f"unknown endpoint {method} {url.path}",
+                             "result": {}, "retExtInfo": {}, "time": int(time.time() * 1000)})
+            return
+        if method == "GET":
+            params = dict(parse_qsl(url.query))
+        else:
+            n = int(self.headers.get("Content-Length") or 0)
+            params = json.loads(self.rfile.read(n) or b"{}")
+        srv.counts[name] = srv.counts.get(name, 0) + 1
+
+        try:
+            if srv.faults:
+                srv.faults.before(name)
+            result, ext = dispatch(srv.exchange, name, params)
+            body = envelope(srv.exchange, result, ext)
+        except SimError as e:
+            body = envelope(srv.exchange, {}, None, e.code, e.msg)
+        headers = {}
+        status = srv.faults.limit_status(name) if srv.faults else None
+        if status:
+            limit, remaining, reset = status
+            headers = {"X-Bapi-Limit": str(limit), "X-Bapi-Limit-Status": str(remaining),
+                       "X-Bapi-Limit-Reset-Timestamp": str(reset)}
+        self._send(200, body, headers)
+
+    def _send(self, code, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            sys.stderr.write("%s - %s\n" % (self.address_string(), fmt % args))
+
+
+def start(exchange, host="127.0.0.1", port=8090, faults=None, verbose=False):
+    """백그라운드 스레드로 서버 시작 → SimServer (server.shutdown()으로 종료)"""
+    server = SimServer((host, port), exchange, faults, verbose)
+    threading.Thread(target=server.serve_forever, name="bybit-sim", daemon=True).start()
+    return server
+
+
+def load_market(args):
+    import bt_engine
+    if args.columnar:
+        return bt_engine.load_columnar(args.columnar)
+    if args.cache:
+        return bt_engine.load_api_cache(args.cache)
+    if args.mcap:
+        return bt_engine.load_mcap_pkl(args.mcap)
+    from bench.synth import make_market
+    n, y = (int(v) for v in args.synthetic.lower().split("x"))
+    return make_market(n, y, seed=args.seed)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m sim", description="바이비트 V5 로컬 시뮬레이터")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--columnar", help="save_columnar 디렉터리")
+    src.add_argument("--cache", help="bt_cache.pkl")
+    src.add_argument("--mcap", help="mcap pickle")
+    src.add_argument("--synthetic", default="60x3", help="합성 데이터 종목수x연수 (기본 60x3)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8090)
+    ap.add_argument("--equity", type=float, default=10000.0, help="시작 USDT")
+    ap.add_argument("--fee", type=float, default=0.00055, help="테이커 수수료율")
+    ap.add_argument("--no-shift", action="store_true", help="데이터 날짜를 그대로 사용")
+    ap.add_argument("--partial-bar", action="store_true", help="진행 중인 당일 봉 포함")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--rate", type=float, default=0.0, help="엔드포인트별 초당 허용 (0 = 무제한)")
+    ap.add_argument("--burst", type=float, default=None)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="retCode 10016 주입 확률")
+    ap.add_argument("--error-endpoints", nargs="*", help="오류 주입 대상 (기본 전체)")
+    ap.add_argument("--verbose", action="store_true", help="요청 로그")
+    args = ap.parse_args(argv)
+
+    md = load_market(args)
+    shift = 0
+    if not args.no_shift:
+        today = pd.Timestamp(time.time(), unit="s").normalize()
+        shift = (today - pd.Timedelta(days=1) - md.dates[-1]).days
+    ex = Exchange(md, equity=args.equity, fee=args.fee, shift_days=shift,
+                  partial_bar=args.partial_bar)
+    faults = None
+    if args.latency_ms or args.jitter_ms or args.rate or args.error_rate:
+        faults = Faults(args.latency_ms, args.jitter_ms, args.rate, args.burst,
+                        args.error_rate, args.error_endpoints, args.seed)
+
+    server = SimServer((args.host, args.port), ex, faults, args.verbose)
+    last = (md.dates[-1] + pd.Timedelta(days=shift)).date()
+    print(f"바이비트 시뮬레이터: {server.url}  ({len(ex.symbols)}종목, 마지막 봉 {last}, "
+          f"시작자산 ${args.equity:,.0f})")
+    if faults:
+        print(f"  지연 {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms | 레이트 {args.rate or '무제한'}/s | "
+              f"오류 {args.error_rate*100:.1f}%")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n요청 수: {server.counts}")
+        print(f"주문 {len(ex.orders)}건, 최종 자산 ${ex.equity():,.2f}")
+    return 0
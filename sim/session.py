@@ -0,0 +1,78 @@
+"""
+프로세스 내 세션 - pybit HTTP와 같은 메서드로 Exchange를 직접 호출
+================================================================
+HTTP 왕복 없이 BybitAPI(session=LocalSession(...))처럼 붙여 쓰는 용도 (리플레이, 벤치마크).
+응답은 V5 형태 그대로, retCode != 0이면 pybit처럼 예외.
+
+ENDPOINTS는 HTTP 서버와 공유하는 (pybit 메서드 → HTTP 메서드, 경로) 표.
+"""
+from sim.exchange import SimError
+
+ENDPOINTS = {
+    "get_kline":            ("GET",  "/v5/market/kline"),
+    "get_tickers":          ("GET",  "/v5/market/tickers"),
+    "get_instruments_info": ("GET",  "/v5/market/instruments-info"),
+    "get_wallet_balance":   ("GET",  "/v5/account/wallet-balance"),
+    "get_positions":        ("GET",  "/v5/position/list"),
+    "set_leverage":         ("POST", "/v5/position/set-leverage"),
+    "place_order":          ("POST", "/v5/order/create"),
+    "place_batch_order":    ("POST", "/v5/order/create-batch"),
+}
+PATHS = {path: name for name, (_, path) in ENDPOINTS.items()}
+
+_HANDLERS = {
+    "get_kline": "kline", "get_tickers": "tickers", "get_instruments_info": "instruments",
+    "get_wallet_balance": "wallet_balance", "get_positions": "position_list",
+    "set_leverage": "set_leverage", "place_order": "place_order",
+}
+
+
+def dispatch(exchange, name, params):
+    """엔드포인트 이름 + 파라미터 → (result, retExtInfo). 파라미터 오류는 SimError(10001)"""
+    try:
+        if name == "place_batch_order":
+            return exchange.place_batch_order(params["request"], params.get("category", "linear"))
+        return getattr(exchange, _HANDLERS[name])(**params), {}
+    except (TypeError, KeyError, ValueError) as e:
+        raise SimError(10001, f"params error: {e}")
+
+
+def envelope(exchange, result, ext=None, code=0, msg="OK"):
+    return {"retCode": code, "retMsg": msg, "result": result,
+            "retExtInfo": ext or {}, "time": exchange.now_ms()}
+
+
+class LocalSession:
+    def __init__(self, exchange, faults=None):
+        self.exchange = exchange
+        self.faults = faults
+
+    def _call(self, name, params):
+        if self.faults:
+            self.faults.before(name)
+        result, ext = dispatch(self.exchange, name, params)
+        return envelope(self.exchange, result, ext)
+
+    def get_kline(self, **kw):
+        return self._call("get_kline", kw)
+
+    def get_tickers(self, **kw):
+        return self._call("get_tickers", kw)
+
+    def get_instruments_info(self, **kw):
+        return self._call("get_instruments_info", kw)
+
+    def get_wallet_balance(self, **kw):
+        return self._call("get_wallet_balance", kw)
+
+    def get_positions(self, **kw):
+        return self._call("get_positions", kw)
+
+    def set_leverage(self, **kw):
+        return self._call("set_leverage", kw)
+
+    def place_order(self, **kw):
+        return self._call("place_order", kw)
+
+    def place_batch_order(self, **kw):
+        return self._call("place_batch_order", kw)
@@ -0,0 +1,164 @@
+"""
+구간 타이머 - 라이브 봇 단계별 / API 호출별 소요 시간
+====================================================
+daily_check 한 번을 하나의 실행(Run)으로 보고, 그 안의 단계(phase), 함수 구간(span),
+API 호출을 이름별로 집계한다 (호출 수 / 합계 / 최대 / 오류 수).
+
+  timing.start("daily_check")
+  timing.phase("scan")                      # 이전 단계를 닫고 새 단계 시작
+  with timing.span("close_pos"): ...        # 또는 @timing.timed("close_pos")
+  timing.api_call("get_kline", 0.21, False) # BybitAPI(hook=timing.api_call)
+  run = timing.finish()                     # → Run (rows() = DB 기록, summary() = 한 줄 요약)
+
+실행 중이 아니거나 BYBIT_TIMING=0이면 전부 즉시 반환 (span은 공용 nullcontext)
+→ monitor()처럼 실행 밖에서 불리는 close_pos는 집계되지 않는다.
+"""
+import os
+import time
+import uuid
+import functools
+import threading
+from contextlib import contextmanager, nullcontext
+
+ENABLED = os.environ.get("BYBIT_TIMING", "1") != "0"
+
+PHASE_NAMES = {
+    "btc": "BTC필터", "universe": "유니버스", "instruments": "종목정보", "klines": "일봉선행",
+    "close": "청산", "scan": "스캔", "resize": "리사이즈", "entry": "진입",
+    "rebalance": "리밸런싱", "report": "리포트",
+}
+
+_NULL = nullcontext()
+_current = None
+
+
+class Run:
+    """실행 1회의 집계: {(종류, 이름): [호출 수, 합계초, 최대초, 오류 수]}"""
+
+    def __init__(self, name):
+        self.name = name
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.t0 = time.perf_counter()
+        self.elapsed = None
+        self.stats = {}
+        self._phase = None
+        self._phase_t0 = 0.0
+        self._lock = threading.Lock()   # 스캔 스레드들이 API 호출을 동시에 기록
+
+    def add(self, kind, name, sec, error=False):
+        with self._lock:
+            s = self.stats.get((kind, name))
+            if s is None:
+                s = self.stats[(kind, name)] = [0, 0.0, 0.0, 0]
+            s[0] += 1
+            s[1] += sec
+            if sec > s[2]:
+                s[2] = sec
+            if error:
+                s[3] += 1
+
+    def phase(self, name):
+        now = time.perf_counter()
+        if self._phase is not None:
+            self.add("phase", self._phase, now - self._phase_t0)
+        self._phase = name
+        self._phase_t0 = now
+
+    def close(self):
+        self.phase(None)
+        self.elapsed = time.perf_counter() - self.t0
+
+    def total(self, kind):
+        """kind 전체 (호출 수, 합계초, 오류 수)"""
+        n = sec = err = 0
+        for (k, _), s in self.stats.items():
+            if k == kind:
+                n += s[0]
+                sec += s[1]
+                err += s[3]
+        return n, sec, err
+
+    def rows(self):
+        """DB 기록용 [(kind, name, calls, total_sec, max_sec, errors)] (합계 내림차순)"""
+        rows = [(k, n, s[0], s[1], s[2], s[3]) for (k, n), s in self.stats.items()]
+        rows.sort(key=lambda r: (r[0], -r[3]))
+        return [("run", self.name, 1, self.elapsed_now(), self.elapsed_now(), 0)] + rows
+
+    def elapsed_now(self):
+        return self.elapsed if self.elapsed is not None else time.perf_counter() - self.t0
+
+    def summary(self, top=3):
+        """텔레그램용 한 줄: 총 소요 | 상위 단계 | API 호출"""
+        phases = sorted(((s[1], n) for (k, n), s in self.stats.items() if k == "phase"),
+                        reverse=True)[:top]
+        parts = [f"⏱ {self.elapsed_now():.1f}초"]
+        if phases:
+            parts.append(" · ".join(f"{PHASE_NAMES.get(n, n)} {sec:.1f}" for sec, n in phases))
+        n_api, api_sec, api_err = self.total("api")
+        if n_api:
+            parts.append(f"API {n_api}회 {api_sec:.1f}초" + (f" 오류 {api_err}" if api_err else ""))
+        return " | ".join(parts)
+
+
+# ─── 모듈 단위 (현재 실행 하나) ──────────────────────────────
+def start(name, force=False):
+    """새 실행 시작 (force=True면 BYBIT_TIMING=0이어도 기록 - 프로파일러용)"""
+    global _current
+    _current = Run(name) if ENABLED or force else None
+    return _current
+
+
+def finish():
+    """현재 실행 종료 → Run (비활성이면 None)"""
+    global _current
+    run, _current = _current, None
+    if run is not None:
+        run.close()
+    return run
+
+
+def current():
+    return _current
+
+
+def phase(name):
+    if _current is not None:
+        _current.phase(name)
+
+
+def api_call(endpoint, sec, error=False):
+    if _current is not None:
+        _current.add("api", endpoint, sec, error)
+
+
+@contextmanager
+def _span(run, name):
+    t0 = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        run.add("span", name, time.perf_counter() - t0, error)
+
+
+def span(name):
+    run = _current
+    if run is None:
+        return _NULL
+    return _span(run, name)
+
+
+def timed(name):
+    """함수 전체를 span(name)으로 감싸는 데코레이터"""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current is None:
+                return fn(*args, **kwargs)
+            with _span(_current, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
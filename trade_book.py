@@ -0,0 +1,159 @@
+"""
+배열 기반 포지션북 / 거래기록
+=============================
+백테스트 루프용. 코인별 dict/튜플 대신 고정 슬롯 배열로 포지션을 보관하고
+자산 평가는 배열 연산 + 진입 순서 누적 한 번으로 끝낸다. 거래기록은 미리 할당한 구조화 배열
+(metrics.TRADE_DTYPE)에 채우고 부족하면 2배로 늘린다 → 긴 스윕에서도
+거래당 메모리가 고정.
+
+  book = PositionBook(capacity=MAX_POS)
+  slot = book.open(col, price, i, strat_id, direction, notional, margin)
+  eq   = book.equity(cash, price_row)          # price_row: 해당 일 전 종목 종가
+  paid = book.charge_funding(rate_row, price_row)  # 보유 포지션 펀딩 일괄 부과 → 낸 금액
+  for slot in book.slots(): ...                # 진입 순서
+  book.close(slot)
+
+  log = TradeLog()
+  log.append(coin, strat, direction, reason, pnl, held, entry_idx, exit_idx, ...)
+  trades = log.to_array()
+"""
+import numpy as np
+
+from metrics import TRADE_DTYPE
+
+
+class PositionBook:
+    """고정 용량 포지션 배열 (진입가, 진입 인덱스, 전략 id, 방향, 주문금액, 마진)"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.col = np.full(capacity, -1, dtype=np.intp)     # 가격 행렬 열 인덱스
+        self.entry_price = np.zeros(capacity)
+        self.entry_idx = np.zeros(capacity, dtype=np.int64)
+        self.strat = np.zeros(capacity, dtype=np.int8)
+        self.direction = np.zeros(capacity)                  # 1 = 롱, -1 = 숏
+        self.notional = np.zeros(capacity)                   # 주문금액 (레버리지 반영)
+        self.margin = np.zeros(capacity)
+        self.funding = np.zeros(capacity)                    # 누적 펀딩 (진입 금액 대비 비율)
+        self.active = np.zeros(capacity, dtype=bool)
+        self._seq = np.zeros(capacity, dtype=np.int64)       # 진입 순서 (dict 순서 재현)
+        self._next_seq = 0
+        self._slot_of = {}                                   # 열 인덱스 → 슬롯
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def __contains__(self, col):
+        return col in self._slot_of
+
+    def slot_of(self, col):
+        return self._slot_of[col]
+
+    def cols(self):
+        return set(self._slot_of)
+
+    def slots(self):
+        """활성 슬롯 (진입 순서)"""
+        idx = np.flatnonzero(self.active)
+        return idx[np.argsort(self._seq[idx])].tolist()
+
+    def open(self, col, price, idx, strat, direction, notional, margin):
+        if len(self._slot_of) >= self.capacity:
+            self._grow()
+        slot = int(np.flatnonzero(~self.active)[0])
+        self.col[slot] = col
+        self.entry_price[slot] = price
+        self.entry_idx[slot] = idx
+        self.strat[slot] = strat
+        self.direction[slot] = direction
+        self.notional[slot] = notional
+        self.margin[slot] = margin
+        self.funding[slot] = 0.0
+        self.active[slot] = True
+        self._seq[slot] = self._next_seq
+        self._next_seq += 1
+        self._slot_of[col] = slot
+        return slot
+
+    def close(self, slot):
+        self.active[slot] = False
+        del self._slot_of[int(self.col[slot])]
+        self.col[slot] = -1
+
+    def pnl(self, price_row):
+        """활성 슬롯 수익률 배열 (가격 NaN → NaN)"""
+        a = self.active
+        return self.direction[a] * (price_row[self.col[a]] / self.entry_price[a] - 1)
+
+    def equity(self, cash, price_row):
+        """현금 + 마진 + 미실현손익 (가격 NaN이면 마진만)
+        포지션별 (마진 + 손익)을 진입 순서대로 더한다 — dict 루프 스크립트와 반올림까지 같아야
+        전량투입(현금 0%) 때 마지막 슬롯의 cash < margin 판정이 1ulp 차이로 갈리지 않는다"""
+        a = self.active
+        if not a.any():
+            return cash
+        pnl = self.direction[a] * (price_row[self.col[a]] / self.entry_price[a] - 1)
+        pnl = np.where(np.isnan(pnl), 0.0, pnl)
+        v = self.margin[a] + self.notional[a] * pnl
+        eq = cash
+        for x in v[np.argsort(self._seq[a])]:
+            eq += x
+        return eq
+
+    def charge_funding(self, rate_row, price_row):
+        """
+        활성 포지션에 펀딩 부과 → 낸 총액 (받으면 음수). rate_row: 해당 일 전 종목 펀딩비 합
+        포지션 가치 = 진입 금액 × 종가 / 진입가 (가격 NaN이면 진입 금액)
+        """
+        a = np.flatnonzero(self.active)
+        if not len(a):
+            return 0.0
+        cols = self.col[a]
+        rate = rate_row[cols]
+        if not rate.any():
+            return 0.0
+        move = price_row[cols] / self.entry_price[a]
+        frac = self.direction[a] * rate * np.where(np.isnan(move), 1.0, move)
+        self.funding[a] += frac
+        return float(np.dot(self.notional[a], frac))
+
+    def _grow(self):
+        for name in ("col", "entry_price", "entry_idx", "strat", "direction",
+                     "notional", "margin", "funding", "active", "_seq"):
+            arr = getattr(self, name)
+            fill = -1 if name == "col" else 0
+            ext = np.full(self.capacity, fill, dtype=arr.dtype)
+            setattr(self, name, np.concatenate([arr, ext]))
+        self.capacity *= 2
+
+
+class TradeLog:
+    """구조화 배열 거래기록 (미리 할당, 부족 시 2배 확장)"""
+
+    def __init__(self, capacity=1024):
+        self._buf = np.zeros(capacity, dtype=TRADE_DTYPE)
+        self._buf["entry_date"] = np.datetime64("NaT")
+        self._buf["exit_date"] = np.datetime64("NaT")
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def append(self, coin, strat, direction, reason, pnl, held, entry_idx, exit_idx,
+               entry_price=np.nan, exit_price=np.nan, n_pos=0,
+               entry_date=np.datetime64("NaT"), exit_date=np.datetime64("NaT"), funding=0.0):
+        if self.n >= len(self._buf):
+            ext = np.zeros(len(self._buf), dtype=TRADE_DTYPE)
+            ext["entry_date"] = np.datetime64("NaT")
+            ext["exit_date"] = np.datetime64("NaT")
+            self._buf = np.concatenate([self._buf, ext])
+        self._buf[self.n] = (coin, strat, direction, reason, pnl, held, entry_idx, exit_idx,
+                             entry_price, exit_price, entry_date, exit_date, n_pos, funding)
+        self.n += 1
+
+    def clear(self):
+        self.n = 0
+
+    def to_array(self):
+        """기록된 구간 복사본"""
+        return self._buf[:self.n].copy()
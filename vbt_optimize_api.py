@@ -8,13 +8,15 @@ Calmar ratio 기준 최적 선택
 import sys
 sys.stdout.reconfigure(encoding='utf-8')
 
-import numpy as np
-import pandas as pd
-import pickle
 import time
 import warnings
 warnings.filterwarnings('ignore')
 
+import metrics
+import bt_engine
+import profiling
+from bt_engine import Signals, annual_universe, universe_coins
+
 import os
 
 CACHE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -24,6 +26,9 @@ TOP_N = 60
 EXCLUDE = {"BTCUSDT", "ETHUSDT"}
 INITIAL_CAPITAL = 10000.0
 
+prof = profiling.from_argv("vbt_optimize_api")
+if prof:
+    prof.start()
 t0 = time.time()
 
 # ═══════════════════════════════════════════════════════════════
@@ -34,102 +39,27 @@ print("  VBT Pro 파라미터 최적화 - 바이비트 채널 돌파 전략 [API
 print("=" * 70)
 
 print("\n1. 데이터 로드 (bt_cache.pkl)...")
-with open(CACHE_FILE, "rb") as f:
-    cache = pickle.load(f)
-
-close_dict, volume_dict = {}, {}
-for sym, df in cache.items():
-    if df.empty:
-        continue
-    s = df.set_index("date").sort_index()
-    s.index = pd.to_datetime(s.index)
-    close_dict[sym] = s["close"]
-    volume_dict[sym] = s["volume"]
-
-close_all = pd.DataFrame(close_dict).sort_index()
-volume_all = pd.DataFrame(volume_dict).sort_index()
-btc_close = close_all["BTCUSDT"]
+profiling.phase("data")
+md = bt_engine.load_api_cache(CACHE_FILE)
+close_all, volume_all = md.close, md.volume
 print(f"  기간: {close_all.index[0].date()} ~ {close_all.index[-1].date()}")
 print(f"  종목: {len(close_all.columns)}개")
 
-# BTC 시장 필터 사전 계산
-btc_sma20 = btc_close.rolling(20).mean()
-btc_sma50 = btc_close.rolling(50).mean()
-market_bullish = btc_sma20 > btc_sma50
-
 # 유니버스
 print("2. 유니버스 선정...")
-turnover = close_all * volume_all
-start_year = int(START_DATE[:4])
-end_year = close_all.index[-1].year
-universe = {}
-universe_rank = {}
-for y in range(start_year, end_year + 1):
-    prev_year = str(y - 1)
-    if prev_year in turnover.index.year.astype(str).values:
-        tv_prev = turnover.loc[prev_year]
-    else:
-        tv_prev = turnover.loc[:f"{y-1}-12-31"]
-    if len(tv_prev) == 0:
-        universe[y] = []
-        universe_rank[y] = {}
-        continue
-    avg_tv = tv_prev.mean().dropna().sort_values(ascending=False)
-    avg_tv = avg_tv.drop(labels=[s for s in EXCLUDE if s in avg_tv.index], errors="ignore")
-    valid_days = tv_prev.count()
-    valid_coins = valid_days[valid_days >= 100].index
-    avg_tv = avg_tv[avg_tv.index.isin(valid_coins)]
-    coins = list(avg_tv.head(TOP_N).index)
-    universe[y] = coins
-    universe_rank[y] = {c: i for i, c in enumerate(coins)}
+profiling.phase("universe")
+universe, universe_rank = annual_universe(
+    close_all, volume_all, int(START_DATE[:4]), close_all.index[-1].year,
+    top_n=TOP_N, exclude=EXCLUDE)
+for y, coins in universe.items():
     print(f"   {y}: {len(coins)}종목")
 
-# 채널 지표 사전 계산
+# 채널 지표 / 신호 행렬 사전 계산 (BTC 시장 필터 포함)
 print("3. 지표 계산...")
-all_coins = set()
-for coins in universe.values():
-    all_coins.update(coins)
-all_coins = list(all_coins & set(close_all.columns))
-
-def calc_channel_vectorized(prices, period=20, std_mult=2.0):
-    n = len(prices)
-    upper = np.full(n, np.nan)
-    lower = np.full(n, np.nan)
-    r2 = np.full(n, np.nan)
-    x = np.arange(period)
-    x_mean = x.mean()
-    x_var = ((x - x_mean) ** 2).sum()
-    for i in range(period - 1, n):
-        y = prices[i - period + 1 : i + 1]
-        if np.isnan(y).any():
-            continue
-        y_mean = y.mean()
-        slope = ((x - x_mean) * (y - y_mean)).sum() / x_var
-        intercept = y_mean - slope * x_mean
-        trend_vals = slope * x + intercept
-        resid = y - trend_vals
-        std_r = resid.std()
-        ss_res = (resid ** 2).sum()
-        ss_tot = ((y - y_mean) ** 2).sum()
-        upper[i] = trend_vals[-1] + std_mult * std_r
-        lower[i] = trend_vals[-1] - std_mult * std_r
-        r2[i] = 1 - ss_res / ss_tot if ss_tot > 0 else 0
-    return upper, lower, r2
-
-indicators = {}
-for coin in all_coins:
-    upper, lower, r2 = calc_channel_vectorized(close_all[coin].values)
-    indicators[coin] = {
-        "upper": upper,
-        "lower": lower,
-        "r2": r2,
-        "vol_ma": volume_all[coin].rolling(20).mean(),
-        "mom5": close_all[coin].pct_change(5),
-    }
-print(f"   {len(indicators)}종목 완료")
+profiling.phase("indicators")
+sig = Signals(md, universe_coins(universe, close_all.columns))
+print(f"   {len(sig.coins)}종목 완료")
 
-# numpy 배열 사전 변환
-price_np = {c: close_all[c].values for c in all_coins}
 dates = close_all.index
 start_idx = close_all.index.get_loc(close_all.loc[START_DATE:].index[0])
 
@@ -140,183 +70,20 @@ start_idx = close_all.index.get_loc(close_all.loc[START_DATE:].index[0])
 def run_opt(strats, max_pos=4, cash_ratio=0.50, leverage=3,
             mdd_thresh=-0.35, cost=0.001):
     """파라미터 주입 백테스트. strats = {A/B/C: {sl, tp, hold_days, r2_thresh, vol_mult, ...}}"""
-
-    cash = INITIAL_CAPITAL
-    peak_equity = INITIAL_CAPITAL
-    mdd_deployed = False
-    positions = {}
-    trade_count = 0
-    wins = 0
-    current_year = None
-    current_coins = []
-    current_rank = {}
-    equity_list = []
-
-    def get_equity(idx):
-        eq = cash
-        for coin, (ep, eidx, sk, qty_u, margin) in positions.items():
-            cur = price_np[coin][idx]
-            if np.isnan(cur):
-                eq += margin
-                continue
-            is_short = strats[sk]["direction"] == "short"
-            pnl = -(cur / ep - 1) if is_short else (cur / ep - 1)
-            eq += margin + qty_u * pnl
-        return eq
-
-    for i in range(max(80, start_idx), len(dates)):
-        date = dates[i]
-        year = date.year
-
-        if year != current_year:
-            current_year = year
-            current_coins = [c for c in universe.get(year, []) if c in all_coins]
-            current_rank = universe_rank.get(year, {})
-
-        is_bull = bool(market_bullish.iloc[i])
-
-        equity = get_equity(i)
-        if equity > peak_equity:
-            peak_equity = equity
-            mdd_deployed = False
-        current_mdd = equity / peak_equity - 1 if peak_equity > 0 else 0
-        if mdd_thresh is not None and current_mdd <= mdd_thresh and not mdd_deployed:
-            mdd_deployed = True
-        effective_cash_ratio = 0.0 if mdd_deployed else cash_ratio
-
-        # BTC 필터 청산
-        for coin in list(positions.keys()):
-            ep, eidx, sk, qty_u, margin = positions[coin]
-            btcf = strats[sk]["btc_filter"]
-            if (btcf == "bull" and not is_bull) or (btcf == "bear" and is_bull):
-                cur = price_np[coin][i]
-                if np.isnan(cur):
-                    continue
-                is_short = strats[sk]["direction"] == "short"
-                pnl = -(cur / ep - 1) if is_short else (cur / ep - 1)
-                cash += margin + qty_u * pnl
-                cash -= qty_u * cost
-                trade_count += 1
-                if pnl > 0:
-                    wins += 1
-                del positions[coin]
-
-        # SL/TP/TIME 청산
-        for coin in list(positions.keys()):
-            ep, eidx, sk, qty_u, margin = positions[coin]
-            cfg = strats[sk]
-            cur = price_np[coin][i]
-            if np.isnan(cur):
-                continue
-            is_short = cfg["direction"] == "short"
-            pnl = -(cur / ep - 1) if is_short else (cur / ep - 1)
-            held = i - eidx
-            sl_val = cfg["sl"]
-            tp_val = cfg["tp"]
-
-            if held >= cfg["hold_days"] or pnl <= sl_val or pnl >= tp_val:
-                cash += margin + qty_u * pnl
-                cash -= qty_u * cost
-                trade_count += 1
-                if pnl > 0:
-                    wins += 1
-                del positions[coin]
-
-        # 진입
-        equity = get_equity(i)
-        avail_slots = max_pos - len(positions)
-        all_candidates = []
-
-        if avail_slots > 0:
-            for sk, cfg in strats.items():
-                btcf = cfg["btc_filter"]
-                if (btcf == "bull" and not is_bull) or (btcf == "bear" and is_bull):
-                    continue
-                for coin in current_coins:
-                    if coin in positions or coin not in indicators:
-                        continue
-                    ind = indicators[coin]
-                    upper = ind["upper"]
-                    lower = ind["lower"]
-                    r2_vals = ind["r2"]
-                    vol_ma = ind["vol_ma"]
-
-                    if i >= len(upper) or np.isnan(upper[i]) or np.isnan(r2_vals[i]):
-                        continue
-                    prev_c = price_np[coin][i - 1]
-                    curr_c = price_np[coin][i]
-                    if np.isnan(prev_c) or np.isnan(curr_c):
-                        continue
-
-                    vm = vol_ma.iloc[i]
-                    if pd.isna(vm) or vm <= 0:
-                        continue
-                    vr = volume_all[coin].iloc[i] / vm
-
-                    if r2_vals[i] <= cfg["r2_thresh"] or vr <= cfg["vol_mult"]:
-                        continue
-
-                    triggered = False
-                    sig = cfg["signal"]
-                    if sig == "upper_break" and prev_c <= upper[i] and curr_c > upper[i]:
-                        triggered = True
-                    elif sig == "lower_break" and prev_c >= lower[i] and curr_c < lower[i]:
-                        triggered = True
-                    elif sig == "upper_touch" and prev_c < upper[i] and curr_c >= upper[i]:
-                        triggered = True
-
-                    if triggered:
-                        mom5 = ind["mom5"].iloc[i]
-                        mom5 = mom5 if pd.notna(mom5) else 0.01
-                        score = r2_vals[i] * vr * max(mom5, 0.01)
-                        mcap_rank = current_rank.get(coin, 999)
-                        all_candidates.append((coin, sk, score, mcap_rank))
-
-        all_candidates.sort(key=lambda x: (-x[2], x[3]))
-        entered = set(positions.keys())
-
-        if all_candidates:
-            invest_capital = equity * (1 - effective_cash_ratio)
-            new_count = min(avail_slots, len([c for c, _, _, _ in all_candidates if c not in entered]))
-            n_total = len(positions) + new_count
-            if n_total == 0:
-                n_total = 1
-            per_slot = invest_capital / n_total
-            order_usdt = per_slot * leverage
-            margin = per_slot
-
-            for coin, sk, _, _ in all_candidates:
-                if len(positions) >= max_pos:
-                    break
-                if coin in entered:
-                    continue
-                if cash < margin + order_usdt * cost:
-                    break
-                cash -= margin
-                cash -= order_usdt * cost
-                positions[coin] = (price_np[coin][i], i, sk, order_usdt, margin)
-                entered.add(coin)
-
-        equity = get_equity(i)
-        equity_list.append(equity)
+    _, eq_arr, trades = bt_engine.run(
+        sig, universe, strats, max_pos=max_pos, leverage=leverage,
+        cash_ratio=cash_ratio, mdd_thresh=mdd_thresh, cost=cost,
+        initial_capital=INITIAL_CAPITAL, sizing="dynamic", i_start=start_idx,
+    )
+    trade_count = len(trades)
+    wins = int((trades["pnl"] > 0).sum())
 
     # 성과 계산
-    eq_arr = np.array(equity_list)
     if len(eq_arr) < 2 or eq_arr[0] <= 0:
         return {"cagr": -999, "mdd": -100, "calmar": -999, "sharpe": 0, "trades": 0, "winrate": 0, "final": 0}
 
-    final_mult = eq_arr[-1] / eq_arr[0]
-    years = len(eq_arr) / 365.0
-    cagr = (final_mult ** (1.0 / years) - 1.0) * 100 if years > 0 and final_mult > 0 else -999
-
-    peak = np.maximum.accumulate(eq_arr)
-    dd = eq_arr / peak - 1
-    mdd = dd.min() * 100
-
-    dr = np.diff(eq_arr) / eq_arr[:-1]
-    sharpe = dr.mean() / dr.std() * np.sqrt(365) if dr.std() > 0 else 0
-
-    calmar = cagr / abs(mdd) if mdd != 0 else 0
+    st = metrics.equity_stats(eq_arr)
+    cagr, mdd, calmar, sharpe = st["cagr"], st["mdd"], st["calmar"], st["sharpe"]
     winrate = wins / trade_count * 100 if trade_count > 0 else 0
 
     return {
@@ -365,6 +132,7 @@ def print_table(results, key_fmt):
 # 기준선: 현재 설정
 # ═══════════════════════════════════════════════════════════════
 print("\n4. 기준선 (현재 라이브 설정)...")
+profiling.phase("simulation")
 baseline = run_opt(make_strats(), max_pos=4, cash_ratio=0.50, leverage=3, mdd_thresh=-0.35)
 print(f"  CAGR: {baseline['cagr']:+.1f}%, MDD: {baseline['mdd']:.1f}%, "
       f"Calmar: {baseline['calmar']:.2f}, Sharpe: {baseline['sharpe']:.2f}, "
@@ -640,6 +408,7 @@ s_final = make_strats(
 r_final = run_opt(s_final, max_pos=best["max_pos"], cash_ratio=best["cash_ratio"],
                   leverage=best["leverage"], mdd_thresh=best["mdd_thresh"])
 
+profiling.phase("report")
 print(f"\n  ── 최적화 결과 ──")
 print(f"  CAGR:     {r_final['cagr']:+,.1f}%")
 print(f"  MDD:      {r_final['mdd']:.1f}%")
@@ -663,3 +432,5 @@ print(f"  Calmar: {r_final['calmar'] - baseline['calmar']:+.2f}")
 
 print("\n" + "=" * 70)
 print(f"  완료! ({time.time()-t0:.1f}초)")
+if prof:
+    prof.stop()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+워크포워드 최적화 - 롤링 학습/검증 (폴드 병렬)
+==============================================
+전체 기간 최적화 파라미터는 in-sample이다. 여기서는
+  [학습 TRAIN_DAYS] → Successive Halving으로 최적 파라미터 선택
+  [검증 TEST_DAYS]  → 그 파라미터로 다음 구간만 실행 (out-of-sample)
+을 TEST_DAYS씩 밀면서 반복하고, 검증 구간 자산곡선을 이어붙여 OOS 성과를 낸다.
+(끝에 TEST_DAYS를 못 채우는 자투리 구간은 폴드로 쓰지 않는다)
+
+- 지표/유니버스는 vbt_optimize.prepare_data()에서 한 번만 계산 (워커는 fork 시 공유,
+  spawn 환경에서는 워커당 1회 로드)
+- 폴드 단위로 프로세스 병렬, 폴드 내부 탐색은 직렬 (중첩 풀 없음)
+- 유니버스는 전년 거래대금 기준이라 검증 구간에 미래 정보가 섞이지 않는다
+
+사용법:
+  python walk_forward.py [--train 365] [--test 90] [--n 27] [--eta 3] [--workers 4] [--profile [접두어]]
+                         [--precision float32]
+"""
+import sys
+import time
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+import pandas as pd
+
+import metrics
+import profiling
+import vbt_optimize as vo
+import opt_search
+
+TRAIN_DAYS = 365
+TEST_DAYS = 90
+
+
+# ─── 폴드 분할 ───────────────────────────────────────────────
+def make_folds(first, last, train_days=TRAIN_DAYS, test_days=TEST_DAYS):
+    """[(train_start, train_end, test_start, test_end), ...] 인덱스 구간 (끝 미포함)
+    검증 구간이 test_days보다 짧은 마지막 폴드는 버린다 (며칠짜리 구간의 연환산 CAGR은 무의미)"""
+    folds = []
+    s = first
+    while s + train_days + test_days <= last:
+        tr_end = s + train_days
+        folds.append((s, tr_end, tr_end, tr_end + test_days))
+        s += test_days
+    return folds
+
+
+def _run_fold(task):
+    """워커: 학습 구간 탐색 → 검증 구간 실행"""
+    k, (tr_s, tr_e, te_s, te_e), n, eta, seed, pkl_file = task
+    vo.prepare_data(pkl_file, verbose=False)
+    ranked = opt_search.successive_halving(
+        n=n, eta=eta, workers=1, seed=seed + k, pkl_file=pkl_file,
+        i_start=tr_s, i_end=tr_e, verbose=False,
+    )
+    _, params, train_res = ranked[0]
+    test_res = opt_search.evaluate(params, te_s, te_e, return_equity=True)
+    return k, params, train_res, test_res
+
+
+# ─── OOS 자산곡선 연결 ───────────────────────────────────────
+def stitch_equity(fold_results, folds):
+    """검증 구간 자산곡선을 복리로 연결 (각 폴드는 INITIAL_CAPITAL에서 시작)"""
+    level = vo.INITIAL_CAPITAL
+    parts, idx = [], []
+    for (k, _, _, res), (_, _, te_s, te_e) in zip(fold_results, folds):
+        eq = res.get("equity")
+        if eq is None or len(eq) == 0:
+            continue
+        seg = level * eq / vo.INITIAL_CAPITAL
+        parts.append(seg)
+        first = max(80, te_s)
+        idx.append(vo.dates[first:first + len(seg)])
+        level = seg[-1]
+    if not parts:
+        return pd.Series(dtype=float)
+    return pd.Series(np.concatenate(parts), index=idx[0].append(idx[1:]))
+
+
+def curve_stats(eq):
+    """연결 자산곡선 → CAGR/MDD/Sharpe/Calmar (시작자본 포함, 연수 = 일수/365)"""
+    eq = np.asarray(eq, dtype=float)
+    curve = np.concatenate([[vo.INITIAL_CAPITAL], eq])
+    return metrics.equity_stats(curve, years=len(eq) / 365.0)
+
+
+def walk_forward(train_days=TRAIN_DAYS, test_days=TEST_DAYS, n=27, eta=3,
+                 workers=1, seed=42, pkl_file=vo.PKL_FILE):
+    """폴드 병렬 워크포워드 → (folds, fold_results, stitched equity Series)"""
+    vo.prepare_data(pkl_file, verbose=False)
+    first = max(80, vo.start_idx)
+    folds = make_folds(first, len(vo.dates), train_days, test_days)
+    tasks = [(k, f, n, eta, seed, pkl_file) for k, f in enumerate(folds)]
+    if workers > 1 and len(tasks) > 1:
+        with mp.Pool(min(workers, len(tasks)), initializer=opt_search._init_worker,
+                     initargs=(pkl_file,)) as pool:
+            results = pool.map(_run_fold, tasks)
+    else:
+        results = [_run_fold(t) for t in tasks]
+    results.sort(key=lambda r: r[0])
+    return folds, results, stitch_equity(results, folds)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="워크포워드 최적화")
+    ap.add_argument("--train", type=int, default=TRAIN_DAYS, help="학습 구간 (일)")
+    ap.add_argument("--test", type=int, default=TEST_DAYS, help="검증 구간 (일)")
+    ap.add_argument("--n", type=int, default=27, help="폴드당 초기 샘플 수")
+    ap.add_argument("--eta", type=int, default=3)
+    ap.add_argument("--workers", type=int, default=max(1, mp.cpu_count() - 1))
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--pkl", default=vo.PKL_FILE)
+    ap.add_argument("--precision", choices=("float64", "float32"), default=vo.PRECISION,
+                    help="데이터 / 지표 보관 정밀도 (float32 = 메모리 약 절반)")
+    ap.add_argument("--profile", nargs="?", const="walk_forward", metavar="접두어",
+                    help="cProfile + 샘플링 스택 저장 (--workers 1 권장)")
+    ap.add_argument("--out", default="wf_equity.csv", help="OOS 자산곡선 CSV")
+    args = ap.parse_args(argv)
+    prof = profiling.Profiler(args.profile).start() if args.profile else None
+
+    t0 = time.time()
+    print("=" * 70)
+    print("  워크포워드 최적화 - 바이비트 채널 돌파 전략")
+    print(f"  학습 {args.train}일 / 검증 {args.test}일, 폴드당 n={args.n}, workers={args.workers}")
+    print("=" * 70)
+    vo.set_precision(args.precision)
+    vo.prepare_data(args.pkl)
+
+    print("\n4. 폴드 실행...")
+    profiling.phase("simulation")
+    folds, results, oos = walk_forward(args.train, args.test, args.n, args.eta,
+                                       args.workers, args.seed, args.pkl)
+
+    profiling.phase("report")
+    print(f"\n{'폴드':>4} {'검증 기간':>23} {'학습Calmar':>10} {'검증CAGR':>9} {'검증MDD':>8}")
+    print("-" * 70)
+    for (k, params, tr, te), (_, _, te_s, te_e) in zip(results, folds):
+        d0 = vo.dates[max(80, te_s)].date()
+        d1 = vo.dates[te_e - 1].date()
+        print(f"{k+1:>4} {str(d0):>11}~{str(d1):<11} {tr['calmar']:>10.2f} "
+              f"{te['cagr']:>+8.1f}% {te['mdd']:>7.1f}%")
+        print(f"     {opt_search.fmt_params(params)}")
+
+    if len(oos) > 1:
+        st = curve_stats(oos.values)
+        print(f"\n  ── OOS 연결 성과 ({oos.index[0].date()} ~ {oos.index[-1].date()}) ──")
+        print(f"  CAGR:     {st['cagr']:+,.1f}%")
+        print(f"  MDD:      {st['mdd']:.1f}%")
+        print(f"  Calmar:   {st['calmar']:.2f}")
+        print(f"  Sharpe:   {st['sharpe']:.2f}")
+        print(f"  최종자산: ${oos.iloc[-1]:,.0f}")
+        oos.rename("equity").to_csv(args.out, index_label="date")
+        print(f"  저장: {args.out}")
+
+    print("\n" + "=" * 70)
+    print(f"  완료! ({time.time()-t0:.1f}초)")
+    if prof:
+        prof.stop()
+
+
+if __name__ == "__main__":
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8")
+    main()